@@ -12,10 +12,11 @@ import os
 import sys
 import subprocess
 import threading
+import psycopg
 from flask import Flask, render_template, jsonify
 
 # Import will be resolved at runtime - query module uses get_connection from env
-from . import query_data
+from . import load_data, query_data
 
 
 def create_app(
@@ -59,11 +60,22 @@ def create_app(
         clean_script = os.path.join(module_2_dir, 'clean.py')
         cleaned_file = os.path.join(module_2_dir, 'cleaned_applicant_data.json')
         llm_script = os.path.join(llm_dir, 'app.py')
-        llm_output = os.path.join(module_2_dir, 'llm_extend_applicant_data.json')
+        # Each pull gets its own output, removed once it has been loaded
+        llm_output = os.path.join(module_2_dir, 'llm_pull_applicant_data.jsonl')
         load_script = os.path.join(base_dir, 'load_data.py')
+        known_ids_file = os.path.join(module_2_dir, 'known_ids.txt')
+        
+        # Only fetch results we do not have yet: the scraper stops at the first
+        # page whose results are all already in the database.
+        scrape_cmd = [sys.executable, scrape_script, '--pages', '10', '--output', output_file]
+        try:
+            load_data.export_known_ids(known_ids_file)
+            scrape_cmd += ['--known-ids', known_ids_file]
+        except psycopg.Error:
+            pass  # Database unavailable: fall back to scraping the full page budget
         
         result = subprocess.run(
-            [sys.executable, scrape_script, '--pages', '10', '--output', output_file],
+            scrape_cmd,
             capture_output=True, text=True, timeout=600
         )
         if result.returncode != 0:
@@ -78,18 +90,30 @@ def create_app(
             scraping_state['message'] = f'Cleaning failed: {clean_result.stderr}'
             return
             
+        # Stream JSON Lines and resume by URL: if the previous pull was killed
+        # (e.g. by the timeout) before its output was loaded, its rows are
+        # kept and only the rest of the input is standardized
         llm_result = subprocess.run(
-            [sys.executable, llm_script, '--file', cleaned_file, '--out', llm_output],
+            [sys.executable, llm_script, '--file', cleaned_file, '--out', llm_output,
+             '--stream', '--resume'],
             cwd=llm_dir, capture_output=True, text=True, timeout=600
         )
         if llm_result.returncode != 0:
             scraping_state['message'] = f'LLM failed: {llm_result.stderr}'
             return
             
-        subprocess.run(
+        load_result = subprocess.run(
             [sys.executable, load_script, llm_output],
             capture_output=True, text=True, timeout=300
         )
+        if load_result.returncode != 0:
+            # Keep the output so the next pull loads it again (inserts are idempotent)
+            scraping_state['message'] = f'Loading failed: {load_result.stderr}'
+            return
+        try:
+            os.remove(llm_output)
+        except FileNotFoundError:
+            pass
         scraping_state['message'] = 'Data scraping completed successfully!'
 
     @app.route('/')
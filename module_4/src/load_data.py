@@ -7,13 +7,19 @@ for analysis. Uses DATABASE_URL environment variable when set.
 Idempotent: duplicate URLs are skipped via ON CONFLICT DO NOTHING.
 """
 
-import json
 import os
 import re
 import sys
 import psycopg
 from datetime import datetime
 
+try:
+    from .module_2.applicant_record import ApplicantRecord
+    from .module_2.clean import iter_records
+except ImportError:  # pragma: no cover - run as a script from src/
+    from module_2.applicant_record import ApplicantRecord
+    from module_2.clean import iter_records
+
 # Path to the LLM-extended data file (relative to script dir when used as script)
 DATA_FILE = 'module_2/llm_extend_applicant_data.json'
 
@@ -157,7 +163,11 @@ def create_table(cur):
 
 
 def load_data(cur, data):
-    """Load data into the applicants table. Skips duplicates by url (idempotent)."""
+    """
+    Load data into the applicants table. Skips duplicates by url (idempotent).
+
+    `data` may hold ApplicantRecords or JSON-format dictionaries.
+    """
     insert_query = """
         INSERT INTO applicants (
             program, comments, date_added, url, status, term,
@@ -171,21 +181,22 @@ def load_data(cur, data):
     
     count = 0
     for entry in data:
-        # Parse fields - using correct JSON field names from module_2 scraping
-        program = entry.get('program', '')
-        comments = entry.get('comments', '')
-        date_added = parse_date(entry.get('date_added', ''))
-        url = entry.get('url', '')
-        status = entry.get('status', '')
-        term = entry.get('term', '')
-        us_or_international = get_is_american(entry.get('US/International', ''))
-        gpa = parse_float(entry.get('GPA', ''))
-        gre = parse_float(entry.get('GRE', ''))
-        gre_v = parse_float(entry.get('GRE_V', ''))
-        gre_aw = parse_float(entry.get('GRE_AW', ''))
-        degree = entry.get('Degree', '')
-        llm_program = entry.get('llm-generated-program', '')
-        llm_uni = entry.get('llm-generated-university', '')
+        # Parse fields from the record (missing fields read as '')
+        record = ApplicantRecord.coerce(entry)
+        program = record.program or ''
+        comments = record.comments or ''
+        date_added = parse_date(record.date_added)
+        url = record.url or ''
+        status = record.status or ''
+        term = record.term or ''
+        us_or_international = get_is_american(record.us_international)
+        gpa = parse_float(record.gpa)
+        gre = parse_float(record.gre)
+        gre_v = parse_float(record.gre_v)
+        gre_aw = parse_float(record.gre_aw)
+        degree = record.degree or ''
+        llm_program = record.llm_program or ''
+        llm_uni = record.llm_university or ''
         
         cur.execute(insert_query, (
             program, comments, date_added, url, status, term,
@@ -200,16 +211,47 @@ def load_data(cur, data):
     return count
 
 
+def fetch_known_ids(cur):
+    """Return the set of Grad Cafe result IDs already stored in applicants."""
+    cur.execute("SELECT url FROM applicants WHERE url LIKE %s", ('%/result/%',))
+    known = set()
+    for (url,) in cur.fetchall():
+        match = re.search(r'/result/(\d+)', url or '')
+        if match:
+            known.add(int(match.group(1)))
+    return known
+
+
+def export_known_ids(path):
+    """
+    Write known result IDs, one per line, for ``scrape.py --known-ids``.
+
+    Returns the number of IDs written. Raises psycopg.Error if the database
+    is unreachable so callers can fall back to a full scrape.
+    """
+    conn = get_connection()
+    try:
+        with conn.cursor() as cur:
+            create_table(cur)
+            known = fetch_known_ids(cur)
+        conn.commit()
+    finally:
+        conn.close()
+    with open(path, 'w', encoding='utf-8') as f:
+        for result_id in sorted(known):
+            f.write(f"{result_id}\n")
+    return len(known)
+
+
 def main():
     """Main function to load data into PostgreSQL."""
     data_file = sys.argv[1] if len(sys.argv) >= 2 else DATA_FILE
     base_dir = os.path.dirname(os.path.abspath(__file__))
     if not os.path.isabs(data_file):
         data_file = os.path.join(base_dir, data_file)
-    # Load JSON data
+    # Load JSON / JSON Lines data
     print(f"Loading data from {data_file}...")
-    with open(data_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
+    data = list(iter_records(data_file))
     print(f"Loaded {len(data)} entries from JSON")
     
     print("Connecting to PostgreSQL...")
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+applicant_record.py - Compact record type shared by the pipeline stages.
+
+The scraper, cleaner and database loader all pass applicant entries around.
+ApplicantRecord keeps the known fields in __slots__ (no per-record dict and
+no string-key hashing in hot loops) and converts losslessly to and from the
+JSON format the stages read and write.
+
+"""
+
+# (attribute, JSON key) for every known field, in output order
+FIELDS = (
+    ('program', 'program'),
+    ('comments', 'comments'),
+    ('date_added', 'date_added'),
+    ('url', 'url'),
+    ('status', 'status'),
+    ('term', 'term'),
+    ('us_international', 'US/International'),
+    ('degree', 'Degree'),
+    ('gpa', 'GPA'),
+    ('gre', 'GRE'),
+    ('gre_v', 'GRE_V'),
+    ('gre_aw', 'GRE_AW'),
+    ('llm_program', 'llm-generated-program'),
+    ('llm_university', 'llm-generated-university'),
+)
+
+_ATTRS = tuple(attr for attr, _ in FIELDS)
+_ATTR_BY_KEY = {key: attr for attr, key in FIELDS}
+
+
+class ApplicantRecord:
+    """
+    One admission result.
+
+    A field set to None is absent: it is left out of to_dict(), exactly like
+    a key missing from the original JSON. Keys the pipeline does not know
+    about (and known keys holding an explicit JSON null) are kept in `extra`
+    so a from_dict() / to_dict() round trip gives back the same dict.
+    """
+
+    __slots__ = _ATTRS + ('extra',)
+
+    def __init__(self, program=None, comments=None, date_added=None, url=None,
+                 status=None, term=None, us_international=None, degree=None,
+                 gpa=None, gre=None, gre_v=None, gre_aw=None, llm_program=None,
+                 llm_university=None, extra=None):
+        self.program = program
+        self.comments = comments
+        self.date_added = date_added
+        self.url = url
+        self.status = status
+        self.term = term
+        self.us_international = us_international
+        self.degree = degree
+        self.gpa = gpa
+        self.gre = gre
+        self.gre_v = gre_v
+        self.gre_aw = gre_aw
+        self.llm_program = llm_program
+        self.llm_university = llm_university
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, data):
+        """
+        Build a record from a JSON-format dictionary.
+
+        Args:
+            data: Dictionary keyed by the JSON field names
+
+        Returns:
+            ApplicantRecord
+        """
+        record = cls()
+        extra = None
+        for key, value in data.items():
+            attr = _ATTR_BY_KEY.get(key)
+            if attr is None or value is None:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            else:
+                setattr(record, attr, value)
+        record.extra = extra
+        return record
+
+    @classmethod
+    def coerce(cls, entry):
+        """Return `entry` as a record, converting JSON-format dictionaries."""
+        return entry if isinstance(entry, cls) else cls.from_dict(entry)
+
+    def to_dict(self):
+        """
+        Convert to the JSON-format dictionary the stages read and write.
+
+        Returns:
+            Dictionary with the set fields, then any extra keys
+        """
+        data = {}
+        for attr, key in FIELDS:
+            value = getattr(self, attr)
+            if value is not None:
+                data[key] = value
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def get(self, key, default=None):
+        """Dictionary-style read by JSON key (e.g. 'US/International')."""
+        attr = _ATTR_BY_KEY.get(key)
+        value = getattr(self, attr) if attr else None
+        if value is None and self.extra:
+            value = self.extra.get(key)
+        return default if value is None else value
+
+    def set(self, key, value):
+        """Dictionary-style write by JSON key; unknown keys go to `extra`."""
+        attr = _ATTR_BY_KEY.get(key)
+        if attr is not None:
+            setattr(self, attr, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __getitem__(self, key):
+        value = self.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+    def _state(self):
+        return tuple(getattr(self, attr) for attr in _ATTRS) + (self.extra or None,)
+
+    def __eq__(self, other):
+        if not isinstance(other, ApplicantRecord):
+            return NotImplemented
+        return self._state() == other._state()
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"ApplicantRecord({self.to_dict()!r})"
+
+
+def as_dict(entry):
+    """Return `entry` in JSON format, whether it is a record or already a dict."""
+    return entry.to_dict() if isinstance(entry, ApplicantRecord) else entry
@@ -3,12 +3,40 @@
 clean.py - Data cleaning module for Grad Cafe applicant data.
 
 This module provides functions to clean and standardize scraped data,
-removing HTML remnants and ensuring consistent formatting.
+removing HTML remnants and ensuring consistent formatting. Records can be
+streamed from a JSON array or JSON Lines file and written back out as JSON
+Lines one at a time, so memory use does not grow with the input size, and
+large backfills can be cleaned in chunks across a process pool.
 
 """
 
+import itertools
 import json
+import multiprocessing
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    from .applicant_record import ApplicantRecord, as_dict
+except ImportError:  # pragma: no cover - run as a script from module_2/
+    from applicant_record import ApplicantRecord, as_dict
+
+# Whitespace between the tokens of a JSON array
+_JSON_WHITESPACE = ' \t\r\n'
+_JSON_WHITESPACE_RE = re.compile(r'[ \t\r\n]*')
+_ARRAY_VALUE_END = frozenset(' \t\r\n,]')
+
+# Anything _clean_text would change: a tag, whitespace other than a single
+# space, a run of spaces, or a space at either end
+_NEEDS_CLEANING_RE = re.compile(r'<[^>]+>|[^\S ]|  |^ | $')
+_TAG_RE = re.compile(r'<[^>]+>')
+_WHITESPACE_RE = re.compile(r'\s+')
+
+# A Grad Cafe result URL; only these are keyed by result ID
+_RESULT_URL_RE = re.compile(r'https?://(?:www\.)?thegradcafe\.com/result/(\d+)/?')
+# Result IDs up to this size go in the bitmap (2**27 bits = 16 MiB at most)
+_MAX_BITMAP_ID = 1 << 27
 
 
 def _clean_text(text):
@@ -23,12 +51,17 @@ def _clean_text(text):
     """
     if not text:
         return ""
+    
+    # Fast path: most scraped values come from get_text(strip=True) and are
+    # already clean, so one search replaces both substitutions
+    if not _NEEDS_CLEANING_RE.search(text):
+        return text
         
     # Remove HTML tags if any
-    text = re.sub(r'<[^>]+>', '', text)
+    text = _TAG_RE.sub('', text)
     
     # Normalize whitespace
-    text = re.sub(r'\s+', ' ', text)
+    text = _WHITESPACE_RE.sub(' ', text)
     
     # Strip leading/trailing whitespace
     text = text.strip()
@@ -36,70 +69,149 @@ def _clean_text(text):
     return text
 
 
-def clean_data(raw_data):
+def _clean_entry(entry):
     """
-    Clean and standardize scraped applicant data.
+    Clean a single raw applicant record.
     
     Args:
-        raw_data: List of raw applicant dictionaries
+        entry: Raw ApplicantRecord
         
     Returns:
-        List of cleaned applicant dictionaries
+        Cleaned ApplicantRecord with every scraped field set ('' when missing)
     """
-    cleaned = []
-    
-    for entry in raw_data:
-        if not entry:
-            continue
-            
-        cleaned_entry = {}
-        
-        # Clean program name
-        cleaned_entry['program'] = _clean_text(entry.get('program', ''))
-        
-        # Clean comments
-        cleaned_entry['comments'] = _clean_text(entry.get('comments', ''))
-        
-        # Clean date added
-        date_added = entry.get('date_added', '')
-        cleaned_entry['date_added'] = _clean_text(date_added)
-        
+    return ApplicantRecord(
+        # Free-text fields: strip HTML remnants and normalize whitespace
+        program=_clean_text(entry.program),
+        comments=_clean_text(entry.comments),
+        date_added=_clean_text(entry.date_added),
         # URL (should be clean already)
-        cleaned_entry['url'] = entry.get('url', '')
-        
+        url=entry.url or '',
         # Status - keep as combined string for compatibility
-        status_raw = entry.get('status', '')
-        cleaned_entry['status'] = _clean_text(status_raw)
-        
-        # Term
-        term = entry.get('term', '')
-        cleaned_entry['term'] = _clean_text(term) if term else ''
-        
-        # US/International
-        us_int = entry.get('US/International', '')
-        cleaned_entry['US/International'] = us_int if us_int else ''
-        
-        # Degree
-        degree = entry.get('Degree', '')
-        cleaned_entry['Degree'] = _clean_text(degree) if degree else ''
-        
-        # GPA - keep as string for JSON compatibility with sample format
-        gpa = entry.get('GPA', '')
-        cleaned_entry['GPA'] = gpa if gpa else ''
-        
-        # GRE scores - use empty string for missing values (consistent format)
-        gre = entry.get('GRE', '')
-        cleaned_entry['GRE'] = gre if gre else ''
-            
-        gre_v = entry.get('GRE_V', '')
-        cleaned_entry['GRE_V'] = gre_v if gre_v else ''
-            
-        gre_aw = entry.get('GRE_AW', '')
-        cleaned_entry['GRE_AW'] = gre_aw if gre_aw else ''
+        status=_clean_text(entry.status),
+        term=_clean_text(entry.term),
+        us_international=entry.us_international or '',
+        degree=_clean_text(entry.degree),
+        # GPA/GRE - keep as strings, empty string for missing values
+        gpa=entry.gpa or '',
+        gre=entry.gre or '',
+        gre_v=entry.gre_v or '',
+        gre_aw=entry.gre_aw or '',
+    )
+
+
+class DuplicateFilter:
+    """
+    Drop repeated results, keyed by result URL; the first occurrence wins.
+
+    Results are scraped newest first, so when overlapping scrapes or
+    retried pages repeat a result, the copy seen first is kept and later
+    copies are dropped. The IDs of Grad Cafe result URLs are remembered
+    in a bitmap (one bit per ID, so ~125 KB covers a million results); any
+    other non-empty URL, including one from another host, goes in a set
+    as-is. Entries without a URL are never dropped.
+    """
+
+    def __init__(self):
+        self.dropped = 0
+        self._bits = bytearray()
+        self._other_urls = set()
+
+    def is_duplicate(self, url):
+        """Record `url` as seen; True if it had been seen before."""
+        if not url:
+            return False
+        match = _RESULT_URL_RE.fullmatch(url)
+        result_id = int(match.group(1)) if match else None
+        if result_id is None or result_id >= _MAX_BITMAP_ID:
+            seen = url in self._other_urls
+            self._other_urls.add(url)
+        else:
+            byte, mask = result_id >> 3, 1 << (result_id & 7)
+            if byte >= len(self._bits):
+                self._bits.extend(bytes(max(byte + 1 - len(self._bits), len(self._bits))))
+            seen = bool(self._bits[byte] & mask)
+            self._bits[byte] |= mask
+        if seen:
+            self.dropped += 1
+        return seen
+
+    def filter(self, entries):
+        """Yield entries (records or dictionaries) whose URL is new."""
+        for entry in entries:
+            if not entry or not self.is_duplicate(entry.get('url')):
+                yield entry
+
+
+def _clean_chunk(chunk):
+    """Clean a list of raw entries (process-pool work unit)."""
+    return [_clean_entry(ApplicantRecord.coerce(entry)) for entry in chunk if entry]
+
+
+def iter_clean_data(raw_data, workers=1, chunk_size=2000, dedupe=True):
+    """
+    Lazily clean scraped applicant data.
+    
+    Duplicate results are dropped before cleaning (see DuplicateFilter), so
+    rows that would be discarded never reach the LLM step. With workers > 1
+    the input is cut into chunks of `chunk_size` records that are cleaned in
+    a process pool. Results come back in input order, and at most
+    2 * workers chunks are in flight, so streaming input keeps memory
+    bounded.
+    
+    Args:
+        raw_data: Iterable of raw ApplicantRecords or applicant dictionaries
+            (e.g. iter_records)
+        workers: Number of cleaning processes (1 = clean inline)
+        chunk_size: Records per work unit when workers > 1
+        dedupe: True to drop duplicate URLs, False to keep every entry, or a
+            DuplicateFilter to use (e.g. to read its `dropped` count)
         
-        cleaned.append(cleaned_entry)
+    Yields:
+        Cleaned ApplicantRecords; empty entries are skipped
+    """
+    if dedupe is True:
+        dedupe = DuplicateFilter()
+    if dedupe:
+        raw_data = dedupe.filter(raw_data)
+    
+    if workers <= 1:
+        for entry in raw_data:
+            if entry:
+                yield _clean_entry(ApplicantRecord.coerce(entry))
+        return
+    
+    records = iter(raw_data)
+    chunks = iter(lambda: list(itertools.islice(records, chunk_size)), [])
+    pending = deque()
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        try:
+            for chunk in chunks:
+                pending.append(pool.submit(_clean_chunk, chunk))
+                if len(pending) >= 2 * workers:
+                    yield from pending.popleft().result()
+            while pending:
+                yield from pending.popleft().result()
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def clean_data(raw_data, workers=1, chunk_size=2000, dedupe=True):
+    """
+    Clean and standardize scraped applicant data.
+    
+    Args:
+        raw_data: Iterable of raw ApplicantRecords or applicant dictionaries
+        workers: Number of cleaning processes (1 = clean inline)
+        chunk_size: Records per work unit when workers > 1
+        dedupe: Duplicate handling, as for iter_clean_data
         
-    return cleaned
+    Returns:
+        List of cleaned ApplicantRecords, in input order
+    """
+    return list(iter_clean_data(raw_data, workers=workers, chunk_size=chunk_size,
+                                dedupe=dedupe))
 
 
 def save_data(data, filename):
@@ -107,17 +219,39 @@ def save_data(data, filename):
     Save data to a JSON file.
     
     Args:
-        data: List of applicant dictionaries
+        data: List of ApplicantRecords or applicant dictionaries
         filename: Output filename
     """
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        json.dump([as_dict(entry) for entry in data], f, indent=2, ensure_ascii=False)
     print(f"Saved {len(data)} entries to {filename}")
 
 
+def is_json_array(f):
+    """
+    Tell a JSON array file from a JSON Lines file by its first character.
+    
+    Leading whitespace is skipped and the file is rewound afterwards, so
+    the caller reads it from the start either way.
+    
+    Args:
+        f: Text file opened for reading
+        
+    Returns:
+        True if the first non-whitespace character is '['
+    """
+    while True:
+        chunk = f.read(64)
+        head = chunk.lstrip()
+        if head or not chunk:
+            break
+    f.seek(0)
+    return head.startswith('[')
+
+
 def load_data(filename):
     """
-    Load data from a JSON file.
+    Load data from a JSON array file or a JSON Lines stream.
     
     Args:
         filename: Input filename
@@ -125,29 +259,163 @@ def load_data(filename):
     Returns:
         List of applicant dictionaries
     """
+    return list(iter_records(filename))
+
+
+def save_jsonl(records, filename):
+    """
+    Write records to a JSON Lines file one at a time.
+    
+    Args:
+        records: Iterable of ApplicantRecords or dictionaries (consumed lazily)
+        filename: Output filename
+        
+    Returns:
+        Number of records written
+    """
+    count = 0
+    with open(filename, 'w', encoding='utf-8') as f:
+        for record in records:
+            f.write(json.dumps(as_dict(record), ensure_ascii=False))
+            f.write('\n')
+            count += 1
+    print(f"Saved {count} entries to {filename}")
+    return count
+
+
+def _iter_json_array(f, chunk_size=1 << 16):
+    """
+    Yield the values of a top-level JSON array without loading it whole.
+    
+    The file is read in chunks and each value is decoded with
+    JSONDecoder.raw_decode as soon as it is complete, so only about one
+    chunk plus one record is held in memory at a time. Like json.load,
+    values must be separated by exactly one ',' and nothing but
+    whitespace may follow the closing ']'.
+    
+    Args:
+        f: Text file positioned at (or before whitespace preceding) '['
+        chunk_size: Characters to read at a time
+        
+    Yields:
+        Decoded array values
+    """
+    decoder = json.JSONDecoder()
+    buf = ''
+    while not buf:
+        chunk = f.read(chunk_size)
+        buf = chunk.lstrip()
+        if not chunk:
+            break
+    if not buf.startswith('['):
+        raise ValueError("Expected a JSON array")
+    pos = 1
+    eof = False
+    # What may come next: 'first' (a value or ']'), 'separator' (',' or ']')
+    # or 'value' (a value, after a ',')
+    expect = 'first'
+    while True:
+        pos = _JSON_WHITESPACE_RE.match(buf, pos).end()
+        if pos < len(buf) and expect != 'value' and buf[pos] == ']':
+            _check_array_tail(f, buf[pos + 1:], chunk_size)
+            return
+        if pos < len(buf) and expect == 'separator':
+            if buf[pos] != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array, got {buf[pos]!r}")
+            pos += 1
+            expect = 'value'
+            continue
+        if pos < len(buf):
+            try:
+                value, end = decoder.raw_decode(buf, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            else:
+                # Only trust a value once the character after it is visible:
+                # "1500." would otherwise decode as 1500 at a chunk boundary
+                if eof or (end < len(buf) and buf[end] in _ARRAY_VALUE_END):
+                    yield value
+                    pos = end
+                    expect = 'separator'
+                    continue
+        elif eof:
+            raise ValueError("Unterminated JSON array")
+        chunk = f.read(chunk_size)
+        eof = not chunk
+        buf = buf[pos:] + chunk
+        pos = 0
+
+
+def _check_array_tail(f, rest, chunk_size):
+    """Raise ValueError if anything but whitespace follows a JSON array."""
+    while True:
+        if rest.strip(_JSON_WHITESPACE):
+            raise ValueError("Extra data after JSON array")
+        rest = f.read(chunk_size)
+        if not rest:
+            return
+
+
+def iter_records(filename):
+    """
+    Stream records from a JSON array file or a JSON Lines file.
+    
+    Args:
+        filename: Input filename
+        
+    Yields:
+        Applicant dictionaries, one at a time
+    """
     with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+        if is_json_array(f):
+            yield from _iter_json_array(f)
+        else:
+            for line in f:
+                if line.strip():
+                    yield json.loads(line)
 
 
-if __name__ == "__main__":
+if __name__ == "__main__":  # pragma: no cover
     import argparse
     
     parser = argparse.ArgumentParser(description="Clean Grad Cafe applicant data")
     parser.add_argument('--input', type=str, default='applicant_data.json',
-                        help='Input JSON file (default: applicant_data.json)')
+                        help='Input JSON or JSON Lines file (default: applicant_data.json)')
     parser.add_argument('--output', type=str, default='cleaned_applicant_data.json',
                         help='Output JSON file (default: cleaned_applicant_data.json)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Stream records through and write JSON Lines to --output '
+                             'with flat memory use')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Clean in this many processes (default: 1)')
+    parser.add_argument('--chunk-size', type=int, default=2000,
+                        help='Records per work unit with --workers (default: 2000)')
+    parser.add_argument('--keep-duplicates', action='store_true',
+                        help='Keep repeated results instead of dropping them by URL')
     
     args = parser.parse_args()
+    duplicates = False if args.keep_duplicates else DuplicateFilter()
     
-    # Load raw data
-    print(f"Loading data from {args.input}...")
-    raw = load_data(args.input)
-    print(f"Loaded {len(raw)} entries")
-    
-    # Clean data
-    print("Cleaning data...")
-    cleaned = clean_data(raw)
+    if args.stream:
+        # Record by record: nothing is held beyond the current entry
+        print(f"Streaming {args.input} -> {args.output}...")
+        save_jsonl(iter_clean_data(iter_records(args.input), workers=args.workers,
+                                   chunk_size=args.chunk_size, dedupe=duplicates),
+                   args.output)
+    else:
+        # Load raw data
+        print(f"Loading data from {args.input}...")
+        raw = load_data(args.input)
+        print(f"Loaded {len(raw)} entries")
+        
+        # Clean data
+        print("Cleaning data...")
+        cleaned = clean_data(raw, workers=args.workers, chunk_size=args.chunk_size,
+                             dedupe=duplicates)
+        
+        # Save cleaned data
+        save_data(cleaned, args.output)
     
-    # Save cleaned data
-    save_data(cleaned, args.output)
+    if duplicates:
+        print(f"Dropped {duplicates.dropped} duplicate results (same URL)")
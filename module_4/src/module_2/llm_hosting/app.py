@@ -3,19 +3,31 @@
 
 from __future__ import annotations
 
+import hashlib
+import itertools
 import json
 import os
 import re
+import sqlite3
 import sys
 import difflib
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
 from functools import lru_cache
 import threading
-from typing import Any, Dict, List, Tuple
+import time
+from typing import Any, Dict, Iterable, Iterator, List, Set, Tuple
 
 from flask import Flask, jsonify, request
 from huggingface_hub import hf_hub_download
 from llama_cpp import Llama  # CPU-only by default if N_GPU_LAYERS=0
+import numpy as np  # installed with llama-cpp-python
+
+try:
+    from ..clean import DuplicateFilter, is_json_array, iter_records
+except ImportError:  # pragma: no cover - run as a script from llm_hosting/
+    sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    from clean import DuplicateFilter, is_json_array, iter_records
 
 app = Flask(__name__)
 
@@ -30,6 +42,18 @@ MODEL_FILE = os.getenv(
 )
 
 N_THREADS = int(os.getenv("N_THREADS", str(os.cpu_count() or 2)))
+# Independent model processes for CLI batches; N_THREADS is split between them
+LLM_WORKERS = int(os.getenv("LLM_WORKERS", "1"))
+# Rows standardized (and held in memory) at a time by the streaming CLI
+STREAM_WINDOW = int(os.getenv("STREAM_WINDOW", "1000"))
+# /standardize micro-batching (--serve --batch): LLM work from concurrent
+# requests is queued and run as one batch of at most SERVE_MAX_BATCH distinct
+# strings, started once full or SERVE_MAX_WAIT_MS after the first arrives
+BATCH_SERVING = os.getenv("BATCH_SERVING", "0") == "1"
+SERVE_MAX_BATCH = int(os.getenv("SERVE_MAX_BATCH", "32"))
+SERVE_MAX_WAIT_MS = float(os.getenv("SERVE_MAX_WAIT_MS", "20"))
+# Longest a request waits for its batched results before failing
+SERVE_TIMEOUT_S = float(os.getenv("SERVE_TIMEOUT_S", "300"))
 N_CTX = int(os.getenv("N_CTX", "2048"))
 N_GPU_LAYERS = int(os.getenv("N_GPU_LAYERS", "0"))  # 0 → CPU-only
 
@@ -51,6 +75,9 @@ def _read_lines(path: str) -> List[str]:
 
 CANON_UNIS = _read_lines(CANON_UNIS_PATH)
 CANON_PROGS = _read_lines(CANON_PROGS_PATH)
+# O(1) membership tests for the canonical names
+CANON_UNI_SET = frozenset(CANON_UNIS)
+CANON_PROG_SET = frozenset(CANON_PROGS)
 
 ABBREV_UNI: Dict[str, str] = {
     r"(?i)^mcg(\.|ill)?$": "McGill University",
@@ -58,6 +85,8 @@ ABBREV_UNI: Dict[str, str] = {
     r"(?i)^uoft$": "University of Toronto",
 }
 
+_ABBREV_UNI_RES = [(re.compile(pat), full) for pat, full in ABBREV_UNI.items()]
+
 COMMON_UNI_FIXES: Dict[str, str] = {
     "McGiill University": "McGill University",
     "Mcgill University": "McGill University",
@@ -70,6 +99,25 @@ COMMON_PROG_FIXES: Dict[str, str] = {
     "Info Studies": "Information Studies",
 }
 
+# Precompiled patterns for the rule-based parser and the post-normalizers
+_WS_RE = re.compile(r"\s+")
+_MCGILL_RE = re.compile(r"(?i)mcg(ill)?(\.)?")
+_UBC_RE = re.compile(r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)")
+_OF_RE = re.compile(r"\bOf\b")
+_TRAILING_ABBREV_RE = re.compile(r"\s*\([A-Z]{2,}\)\s*$")
+_DEPT_PREFIX_RE = re.compile(r"^(department|dept\.?)\s+of\s+", re.IGNORECASE)
+# Title-cased small words to lower-case, one alternation per normalizer
+_PROG_SMALL_WORDS_RE = re.compile(r"\b(?:And|Of|In|For|The|With|To)\b")
+_UNI_SMALL_WORDS_RE = re.compile(r"\b(?:Of|And|In|For|The|At|De|Du|Des)\b")
+
+# Exact-input memo size for the rule-based path (one entry per distinct string)
+NORMALIZE_CACHE_SIZE = 10000
+
+
+def _lower_match(match: re.Match) -> str:
+    """re.sub callback: the matched word in lower case."""
+    return match.group(0).lower()
+
 # ---------------- Few-shot prompt ----------------
 SYSTEM_PROMPT = (
     "You are a data cleaning assistant. Standardize degree program and university "
@@ -113,12 +161,111 @@ FEW_SHOTS: List[Tuple[Dict[str, str], Dict[str, str]]] = [
     ),
 ]
 
+
+def _build_prefix_messages() -> List[Dict[str, str]]:
+    """System prompt + few-shot exchanges: the fixed head of every LLM prompt."""
+    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
+    for x_in, x_out in FEW_SHOTS:
+        messages.append(
+            {"role": "user", "content": json.dumps(x_in, ensure_ascii=False)}
+        )
+        messages.append(
+            {
+                "role": "assistant",
+                "content": json.dumps(x_out, ensure_ascii=False),
+            }
+        )
+    return messages
+
+
+PREFIX_MESSAGES = _build_prefix_messages()
+
 _LLM: Llama | None = None
 _LLM_LOCK = threading.Lock()
+# llama.cpp contexts are not thread-safe: one evaluation at a time per model
+_LLM_CALL_LOCK = threading.RLock()
+
+# llama.cpp state saved right after PREFIX_MESSAGES, and the prefix token ids
+_PREFIX_STATE: Any = None
+_PREFIX_IDS: List[int] = []
+
+
+def _complete(llm: Llama, program_text: str, max_tokens: int = 128) -> Dict[str, Any]:
+    """Run one chat completion for `program_text` behind PREFIX_MESSAGES."""
+    messages = PREFIX_MESSAGES + [
+        {
+            "role": "user",
+            "content": json.dumps({"program": program_text}, ensure_ascii=False),
+        }
+    ]
+    return llm.create_chat_completion(
+        messages=messages,
+        temperature=0.0,
+        max_tokens=max_tokens,
+        top_p=1.0,
+    )
+
+
+def _context_ids(llm: Llama) -> List[int]:
+    """Token ids currently held in the model's KV cache."""
+    return list(llm.input_ids[: llm.n_tokens])
+
+
+def _warm_prefix(llm: Llama) -> None:
+    """
+    Evaluate the system prompt + few-shots once and save the llama.cpp state.
+
+    Two throwaway one-token completions with different inputs are run; the
+    tokens their contexts share are the rendered prefix (the second one only
+    evaluates its own suffix).
+    """
+    global _PREFIX_STATE, _PREFIX_IDS
+    contexts = []
+    for probe in ("a", "b"):
+        _complete(llm, probe, max_tokens=1)
+        contexts.append(_context_ids(llm))
+    shared = 0
+    for a, b in zip(*contexts):
+        if a != b:
+            break
+        shared += 1
+    _PREFIX_IDS = contexts[0][:shared]
+    _PREFIX_STATE = llm.save_state()
+
+
+def _restore_prefix(llm: Llama) -> bool:
+    """
+    Reload the saved prefix state unless the KV cache still starts with it.
+
+    llama.cpp already reuses the longest common prefix with the previous
+    prompt, so the (large) state copy is only paid when the cache has
+    drifted off the prefix. Returns True if the state was reloaded.
+    """
+    if _PREFIX_STATE is None:
+        return False
+    if _context_ids(llm)[: len(_PREFIX_IDS)] == _PREFIX_IDS:
+        return False
+    llm.load_state(_PREFIX_STATE)
+    return True
+
+
+def _model_path() -> str:
+    """Download the GGUF file into ./models (or reuse it) and return its path."""
+    return hf_hub_download(
+        repo_id=MODEL_REPO,
+        filename=MODEL_FILE,
+        local_dir="models",
+        local_dir_use_symlinks=False,
+        force_filename=MODEL_FILE,
+    )
 
 
 def _load_llm() -> Llama:
-    """Download (or reuse) the GGUF file and initialize llama.cpp (thread-safe)."""
+    """
+    Download (or reuse) the GGUF file and initialize llama.cpp (thread-safe).
+
+    The prompt prefix is evaluated here, once, so requests start from it.
+    """
     global _LLM
     if _LLM is not None:
         return _LLM
@@ -128,21 +275,16 @@ def _load_llm() -> Llama:
         if _LLM is not None:
             return _LLM
 
-        model_path = hf_hub_download(
-            repo_id=MODEL_REPO,
-            filename=MODEL_FILE,
-            local_dir="models",
-            local_dir_use_symlinks=False,
-            force_filename=MODEL_FILE,
-        )
-
-        _LLM = Llama(
-            model_path=model_path,
+        llm = Llama(
+            model_path=_model_path(),
             n_ctx=N_CTX,
             n_threads=N_THREADS,
             n_gpu_layers=N_GPU_LAYERS,
             verbose=False,
         )
+        with _LLM_CALL_LOCK:
+            _warm_prefix(llm)
+        _LLM = llm
     return _LLM
 
 
@@ -159,7 +301,7 @@ def _smart_split(text: str) -> Tuple[str, str]:
     to find the university portion. Handles multi-comma program names like
     'Criminology, Law and Society, Temple University' correctly.
     """
-    s = re.sub(r"\s+", " ", (text or "")).strip().strip(",")
+    s = _WS_RE.sub(" ", text or "").strip().strip(",")
 
     # Split on commas and scan from the right
     parts = [p.strip() for p in s.split(",") if p.strip()]
@@ -171,9 +313,9 @@ def _smart_split(text: str) -> Tuple[str, str]:
     for i in range(len(parts) - 1, 0, -1):
         candidate_uni = ", ".join(parts[i:])
         # Check against canon list first (exact then fuzzy with high cutoff)
-        if candidate_uni in CANON_UNIS:
+        if candidate_uni in CANON_UNI_SET:
             return ", ".join(parts[:i]), candidate_uni
-        canon_match = _best_match(candidate_uni, CANON_UNIS, cutoff=0.88)
+        canon_match = _best_match(candidate_uni, CANON_UNI_INDEX, cutoff=0.88)
         if canon_match:
             return ", ".join(parts[:i]), canon_match
         # Check for university keywords
@@ -189,60 +331,120 @@ def _split_fallback(text: str) -> Tuple[str, str]:
     prog, uni = _smart_split(text)
 
     # High-signal abbreviation expansions
-    if re.fullmatch(r"(?i)mcg(ill)?(\.)?", uni or ""):
+    if _MCGILL_RE.fullmatch(uni or ""):
         uni = "McGill University"
-    if re.fullmatch(
-        r"(?i)(ubc|u\.?b\.?c\.?|university of british columbia)",
-        uni or "",
-    ):
+    if _UBC_RE.fullmatch(uni or ""):
         uni = "University of British Columbia"
 
     # Title-case program; normalize 'Of' → 'of' for universities
     prog = prog.title()
     if uni:
-        uni = re.sub(r"\bOf\b", "of", uni.title())
+        uni = _OF_RE.sub("of", uni.title())
     else:
         uni = "Unknown"
     return prog, uni
 
 
-def _best_match(name: str, candidates: List[str], cutoff: float = 0.80) -> str | None:
-    """Fuzzy match via difflib (lightweight, Replit-friendly)."""
-    if not name or not candidates:
+class _FuzzyIndex:
+    """
+    Precomputed index over a canonical list for difflib-style fuzzy lookup.
+
+    best() returns exactly what difflib.get_close_matches(name, candidates,
+    n=1, cutoff=cutoff) would. get_close_matches filters every candidate
+    with real_quick_ratio() (lengths only) and quick_ratio() (shared
+    character counts) before paying for ratio(). Here both bounds are
+    computed for all candidates at once from a candidates x characters
+    count matrix. The survivors are scored with ratio() in decreasing
+    quick_ratio order, stopping once the bound falls below the best ratio
+    found, since ratio() never exceeds quick_ratio().
+    """
+
+    def __init__(self, candidates: Iterable[str]) -> None:
+        self.candidates = sorted(set(candidates))
+        self._exact = frozenset(self.candidates)
+        alphabet = sorted({ch for c in self.candidates for ch in c})
+        self._column = {ch: i for i, ch in enumerate(alphabet)}
+        self._counts = np.zeros((len(self.candidates), len(alphabet)), dtype=np.int32)
+        for row, cand in enumerate(self.candidates):
+            for ch in cand:
+                self._counts[row, self._column[ch]] += 1
+        self._lengths = np.array([len(c) for c in self.candidates], dtype=np.int32)
+
+    def best(self, name: str, cutoff: float) -> str | None:
+        """Closest candidate with ratio >= cutoff (ties: the larger string), or None."""
+        if name in self._exact:
+            return name
+        if not name or not self.candidates:
+            return None
+        wanted: Dict[str, int] = {}
+        for ch in name:
+            if ch in self._column:
+                wanted[ch] = wanted.get(ch, 0) + 1
+        columns = [self._column[ch] for ch in wanted]
+        shared = np.minimum(
+            self._counts[:, columns], np.array(list(wanted.values()), dtype=np.int32)
+        ).sum(axis=1)
+        # Same float expressions as SequenceMatcher's ratio helpers
+        total = self._lengths + len(name)
+        quick = 2.0 * shared / total
+        real_quick = 2.0 * np.minimum(self._lengths, len(name)) / total
+        (rows,) = np.nonzero((real_quick >= cutoff) & (quick >= cutoff))
+
+        matcher = difflib.SequenceMatcher()
+        matcher.set_seq2(name)
+        best: Tuple[float, str] | None = None
+        for row in rows[np.argsort(-quick[rows], kind="stable")]:
+            if best is not None and quick[row] < best[0]:
+                break
+            cand = self.candidates[row]
+            matcher.set_seq1(cand)
+            score = matcher.ratio()
+            if score >= cutoff and (best is None or (score, cand) > best):
+                best = (score, cand)
+        return best[1] if best else None
+
+
+CANON_UNI_INDEX = _FuzzyIndex(CANON_UNIS)
+CANON_PROG_INDEX = _FuzzyIndex(CANON_PROGS)
+
+
+def _best_match(name: str, candidates: _FuzzyIndex, cutoff: float = 0.80) -> str | None:
+    """Fuzzy match via difflib ratios, answered from a precomputed index."""
+    if not name:
         return None
-    matches = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
-    return matches[0] if matches else None
+    return candidates.best(name, cutoff)
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def _post_normalize_program(prog: str) -> str:
-    """Apply common fixes, title case, then canonical/fuzzy mapping."""
+    """Apply common fixes, title case, then canonical/fuzzy mapping (memoized)."""
     p = (prog or "").strip()
     p = COMMON_PROG_FIXES.get(p, p)
     # Strip trailing parenthetical abbreviations like "(OLPD)"
-    p = re.sub(r"\s*\([A-Z]{2,}\)\s*$", "", p)
+    p = _TRAILING_ABBREV_RE.sub("", p)
     # Strip leading "Department of" / "Dept. of"
-    p = re.sub(r"^(department|dept\.?)\s+of\s+", "", p, flags=re.IGNORECASE)
+    p = _DEPT_PREFIX_RE.sub("", p)
     p = p.strip().strip(",").strip()
     p = p.title()
     # Normalize common small words
-    for word in ["And", "Of", "In", "For", "The", "With", "To"]:
-        p = re.sub(rf"\b{word}\b", word.lower(), p)
+    p = _PROG_SMALL_WORDS_RE.sub(_lower_match, p)
     # Capitalize first letter
     if p:
         p = p[0].upper() + p[1:]
-    if p in CANON_PROGS:
+    if p in CANON_PROG_SET:
         return p
-    match = _best_match(p, CANON_PROGS, cutoff=0.78)
+    match = _best_match(p, CANON_PROG_INDEX, cutoff=0.78)
     return match or p
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def _post_normalize_university(uni: str) -> str:
-    """Expand abbreviations, apply common fixes, capitalization, and canonical map."""
+    """Expand abbreviations, apply common fixes, capitalization, and canonical map (memoized)."""
     u = (uni or "").strip()
 
     # Abbreviations
-    for pat, full in ABBREV_UNI.items():
-        if re.fullmatch(pat, u):
+    for pat, full in _ABBREV_UNI_RES:
+        if pat.fullmatch(u):
             u = full
             break
 
@@ -250,34 +452,139 @@ def _post_normalize_university(uni: str) -> str:
     u = COMMON_UNI_FIXES.get(u, u)
 
     # Strip trailing parenthetical abbreviations like "(MIT)"
-    u = re.sub(r"\s*\([A-Z]{2,}\)\s*$", "", u).strip()
+    u = _TRAILING_ABBREV_RE.sub("", u).strip()
 
     # Normalize capitalization: title case, then fix 'Of' → 'of'
     if u:
         u = u.title()
-        for word in ["Of", "And", "In", "For", "The", "At", "De", "Du", "Des"]:
-            u = re.sub(rf"\b{word}\b", word.lower(), u)
+        u = _UNI_SMALL_WORDS_RE.sub(_lower_match, u)
         # Capitalize first letter
         u = u[0].upper() + u[1:]
 
     # Canonical or fuzzy map
-    if u in CANON_UNIS:
+    if u in CANON_UNI_SET:
         return u
-    match = _best_match(u, CANON_UNIS, cutoff=0.80)
+    match = _best_match(u, CANON_UNI_INDEX, cutoff=0.80)
     return match or u or "Unknown"
 
-# Cache for LLM results to avoid redundant calls
-_LLM_CACHE: Dict[str, Tuple[str, str]] = {}
+# ---------------- Persistent result cache ----------------
+# SQLite file shared by CLI runs, server restarts and concurrent processes;
+# set to "" to disable
+CACHE_PATH = os.getenv("LLM_CACHE_PATH", "llm_cache.sqlite3")
+
+# Bump when the rule-based parser or the post-normalizers change their output
+RULES_VERSION = "1"
+
+
+def _cache_version() -> str:
+    """Hash of everything a cached result depends on (model, prompt, canon lists)."""
+    digest = hashlib.sha256()
+    for part in (
+        MODEL_REPO,
+        MODEL_FILE,
+        SYSTEM_PROMPT,
+        json.dumps(FEW_SHOTS, sort_keys=True),
+        RULES_VERSION,
+        "\n".join(CANON_UNIS),
+        "\n".join(CANON_PROGS),
+    ):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()[:16]
+
+
+def _cache_key(program_text: str) -> str:
+    """Normalized lookup key: whitespace runs collapsed, ends trimmed."""
+    return _WS_RE.sub(" ", program_text or "").strip()
+
+
+class _ResultCache:
+    """
+    On-disk (program text -> (program, university)) cache in SQLite.
+
+    Rows are stored under the version hash they were computed with; rows of
+    any other version are deleted when the cache is opened, so changing
+    MODEL_FILE, the prompt or the canon lists invalidates old results.
+    WAL mode lets several processes read and write the same file.
+    """
+
+    def __init__(self, path: str, version: str) -> None:
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        with self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS results ("
+                " key TEXT PRIMARY KEY, version TEXT NOT NULL,"
+                " program TEXT NOT NULL, university TEXT NOT NULL)"
+            )
+            self._conn.execute("DELETE FROM results WHERE version != ?", (version,))
+
+    def get(self, key: str) -> Tuple[str, str] | None:
+        """Return the cached pair for `key`, counting the hit or miss."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT program, university FROM results WHERE key = ? AND version = ?",
+                (key, self.version),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return (row[0], row[1])
+
+    def put_many(self, items: Iterable[Tuple[str, Tuple[str, str]]]) -> None:
+        """Store (key, (program, university)) pairs in one transaction."""
+        rows = [(key, self.version, prog, uni) for key, (prog, uni) in items]
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)", rows
+            )
+
+    def put(self, key: str, result: Tuple[str, str]) -> None:
+        """Store one result."""
+        self.put_many([(key, result)])
+
+    def stats(self) -> Dict[str, Any]:
+        """Lookup counters since the cache was opened."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def close(self) -> None:
+        """Close the database connection."""
+        self._conn.close()
+
+
+_RESULT_CACHE: _ResultCache | None = None
+_RESULT_CACHE_LOCK = threading.Lock()
+
 
-# Parallel processing config
-MAX_WORKERS = int(os.getenv("MAX_WORKERS", "4"))
+def _result_cache() -> _ResultCache | None:
+    """Open the persistent cache on first use; None when CACHE_PATH is empty."""
+    global _RESULT_CACHE
+    if _RESULT_CACHE is None and CACHE_PATH:
+        with _RESULT_CACHE_LOCK:
+            if _RESULT_CACHE is None:
+                _RESULT_CACHE = _ResultCache(CACHE_PATH, _cache_version())
+    return _RESULT_CACHE
 
 
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
 def _try_rule_based_parse(program_text: str) -> Tuple[str, str] | None:
     """
     Attempt to parse program/university using rules only.
     Uses right-scan splitting to correctly handle multi-comma program names.
     Returns (program, university) if confident, else None to trigger LLM.
+    Memoized on the exact input, so repeated program strings cost one lookup.
     """
     if not program_text or not program_text.strip():
         return ("Unknown", "Unknown")
@@ -301,7 +608,7 @@ def _try_rule_based_parse(program_text: str) -> Tuple[str, str] | None:
         return (prog, uni)
 
     # If we got a good fuzzy match for university, trust it
-    if uni and uni in CANON_UNIS:
+    if uni and uni in CANON_UNI_SET:
         return (prog, uni)
 
     # Otherwise, might need LLM for ambiguous cases
@@ -313,30 +620,9 @@ def _call_llm_cached(program_text: str) -> Tuple[str, str]:
     """Cached wrapper for LLM calls. Returns (program, university) tuple."""
     llm = _load_llm()
 
-    messages = [{"role": "system", "content": SYSTEM_PROMPT}]
-    for x_in, x_out in FEW_SHOTS:
-        messages.append(
-            {"role": "user", "content": json.dumps(x_in, ensure_ascii=False)}
-        )
-        messages.append(
-            {
-                "role": "assistant",
-                "content": json.dumps(x_out, ensure_ascii=False),
-            }
-        )
-    messages.append(
-        {
-            "role": "user",
-            "content": json.dumps({"program": program_text}, ensure_ascii=False),
-        }
-    )
-
-    out = llm.create_chat_completion(
-        messages=messages,
-        temperature=0.0,
-        max_tokens=128,
-        top_p=1.0,
-    )
+    with _LLM_CALL_LOCK:
+        _restore_prefix(llm)
+        out = _complete(llm, program_text)
 
     text = (out["choices"][0]["message"]["content"] or "").strip()
     try:
@@ -352,30 +638,223 @@ def _call_llm_cached(program_text: str) -> Tuple[str, str]:
     return (std_prog, std_uni)
 
 
-def _call_llm(program_text: str) -> Dict[str, str]:
-    """Query the tiny LLM and return standardized fields (with caching)."""
-    std_prog, std_uni = _call_llm_cached(program_text)
-    return {
-        "standardized_program": std_prog,
-        "standardized_university": std_uni,
-    }
+def _pool_splits(cores: int) -> List[Tuple[int, int]]:
+    """(workers, threads per worker) pairs that use exactly `cores` threads."""
+    return [(n, cores // n) for n in range(1, cores + 1) if cores % n == 0]
+
+
+def _init_llm_worker(n_threads: int) -> None:
+    """Process-pool initializer: load this worker's own model with n_threads."""
+    global N_THREADS
+    N_THREADS = n_threads
+    _load_llm()
+
+
+def _llm_worker_chunk(program_texts: List[str]) -> List[Tuple[str, str]]:
+    """Standardize a run of sorted program strings (process-pool work unit)."""
+    with _LLM_CALL_LOCK:
+        return [_call_llm_cached(text) for text in program_texts]
+
+
+def _llm_pool(workers: int) -> ProcessPoolExecutor:
+    """
+    Start `workers` model processes, each with N_THREADS // workers threads.
+
+    The GGUF file is downloaded here first, not concurrently in every worker.
+    """
+    _model_path()
+    n_threads = max(1, N_THREADS // workers)
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=multiprocessing.get_context("spawn"),
+        initializer=_init_llm_worker,
+        initargs=(n_threads,),
+    )
+
+
+def _map_llm_pool(
+    pool: ProcessPoolExecutor, unique: List[str], chunk_size: int = 8
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Spread sorted distinct program strings over a pool from _llm_pool.
+
+    Workers take runs of `chunk_size` adjacent strings from the pool's shared
+    queue, so consecutive prompts in a worker still share their KV prefix.
+    Results are collected in submission order.
+    """
+    chunks = [unique[i : i + chunk_size] for i in range(0, len(unique), chunk_size)]
+    results = [pair for chunk in pool.map(_llm_worker_chunk, chunks) for pair in chunk]
+    return dict(zip(unique, results))
+
+
+def _standardize_llm_pool(
+    unique: List[str], workers: int, chunk_size: int = 8
+) -> Dict[str, Tuple[str, str]]:
+    """Run one batch on a pool of `workers` model processes started for it."""
+    with _llm_pool(workers) as pool:
+        return _map_llm_pool(pool, unique, chunk_size)
+
+
+def _standardize_llm_batch(
+    program_texts: Iterable[str],
+    workers: int = 1,
+    pool: ProcessPoolExecutor | None = None,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    Run the LLM once per distinct program string, back to back.
+
+    llama.cpp keeps the KV cache of the previous prompt and only evaluates
+    the tokens after the longest common prefix, so consecutive calls share
+    the SYSTEM_PROMPT + FEW_SHOTS prefix and pay for the suffix only.
+    Sorting the distinct strings extends the shared prefix into the inputs
+    ("Computer Science, ..." rows end up adjacent), and holding the model
+    lock for the whole batch keeps other callers from evicting it.
+    With an already running `pool`, or workers > 1, the strings are split
+    across model processes (see _map_llm_pool).
+    Returns {program_text: (program, university)}.
+    """
+    unique = sorted(set(program_texts))
+    if not unique:
+        return {}
+    if pool is not None:
+        return _map_llm_pool(pool, unique)
+    if workers > 1 and len(unique) > 1:
+        return _standardize_llm_pool(unique, min(workers, len(unique)))
+    _load_llm()
+    with _LLM_CALL_LOCK:
+        return {text: _call_llm_cached(text) for text in unique}
 
 
 def _standardize_fast(program_text: str) -> Dict[str, str]:
     """
-    Fast standardization: try rules first, fall back to cached LLM.
+    Fast standardization: persistent cache, then rules, then cached LLM.
     This is the main entry point for processing.
     """
-    # Try rule-based parsing first (instant)
-    result = _try_rule_based_parse(program_text)
-    if result is not None:
-        return {
-            "standardized_program": result[0],
-            "standardized_university": result[1],
-        }
+    cache = _result_cache()
+    key = _cache_key(program_text)
+    result = cache.get(key) if cache else None
+    if result is None:
+        # Try rule-based parsing first (instant), fall back to the LLM
+        result = _try_rule_based_parse(program_text)
+        if result is None:
+            result = _call_llm_cached(program_text)
+        if cache:
+            cache.put(key, result)
+    return {
+        "standardized_program": result[0],
+        "standardized_university": result[1],
+    }
 
-    # Fall back to cached LLM call
-    return _call_llm(program_text)
+
+class _MicroBatcher:
+    """
+    Shared queue that batches work from concurrent callers.
+
+    submit(key, text) returns a Future. A background thread drains the queue
+    into batches of at most `max_batch` keys, waiting up to `max_wait_ms`
+    after the first pending key for more to arrive, and passes each batch
+    ({key: text}) to `resolve`, which returns {key: result}. A key that is
+    already queued or being computed is not queued again: later callers get
+    the same Future, so identical strings from different requests are
+    computed once.
+    """
+
+    def __init__(
+        self, resolve: Any, max_batch: int = 32, max_wait_ms: float = 20.0
+    ) -> None:
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait_ms / 1000.0
+        self.batches = 0
+        self.coalesced = 0
+        self._resolve = resolve
+        self._cond = threading.Condition()
+        self._pending: Dict[str, str] = {}
+        self._inflight: Dict[str, Future] = {}
+        self._thread: threading.Thread | None = None
+
+    def submit(self, key: str, text: str) -> Future:
+        """Queue `text` under `key` (or join the identical queued/running one)."""
+        with self._cond:
+            future = self._inflight.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future
+            future = Future()
+            self._inflight[key] = future
+            self._pending[key] = text
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return future
+
+    def _next_batch(self) -> Dict[str, str]:
+        """Block until a batch is due, then take it off the queue."""
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.max_wait
+            while len(self._pending) < self.max_batch:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            keys = list(itertools.islice(self._pending, self.max_batch))
+            return {key: self._pending.pop(key) for key in keys}
+
+    def _run_batch(self, batch: Dict[str, str]) -> None:
+        """
+        Resolve one batch and settle its futures.
+
+        Every future is settled, with the error if `resolve` failed or left
+        its key out, so no caller waits forever and the thread keeps running.
+        """
+        try:
+            results = self._resolve(batch)
+            error = None
+        except Exception as exc:
+            results, error = {}, exc
+        with self._cond:
+            futures = [(key, self._inflight.pop(key)) for key in batch]
+            self.batches += 1
+        for key, future in futures:
+            try:
+                if error is not None:
+                    raise error
+                future.set_result(results[key])
+            except Exception as exc:
+                future.set_exception(exc)
+
+    def _run(self) -> None:
+        """Worker thread: resolve batches as they become due."""
+        while True:
+            self._run_batch(self._next_batch())
+
+
+def _resolve_llm_requests(batch: Dict[str, str]) -> Dict[str, Tuple[str, str]]:
+    """Micro-batch resolver: one in-process LLM batch, stored in the cache."""
+    llm_results = _standardize_llm_batch(batch.values())
+    results = {key: llm_results[text] for key, text in batch.items()}
+    cache = _result_cache()
+    if cache:
+        cache.put_many(results.items())
+    return results
+
+
+_BATCHER: _MicroBatcher | None = None
+_BATCHER_LOCK = threading.Lock()
+
+
+def _request_batcher() -> _MicroBatcher:
+    """The process-wide /standardize batcher, created on first use."""
+    global _BATCHER
+    if _BATCHER is None:
+        with _BATCHER_LOCK:
+            if _BATCHER is None:
+                _BATCHER = _MicroBatcher(
+                    _resolve_llm_requests, SERVE_MAX_BATCH, SERVE_MAX_WAIT_MS
+                )
+    return _BATCHER
 
 
 def _normalize_input(payload: Any) -> List[Dict[str, Any]]:
@@ -398,16 +877,34 @@ def standardize() -> Any:
     """Standardize rows from an HTTP request and return JSON."""
     payload = request.get_json(force=True, silent=True)
     rows = _normalize_input(payload)
+    if BATCH_SERVING:
+        return jsonify({"rows": _standardize_rows_batched(rows)})
+    return jsonify({"rows": [_process_single_row(row) for row in rows]})
 
-    out: List[Dict[str, Any]] = []
-    for row in rows:
-        program_text = (row or {}).get("program") or ""
-        result = _standardize_fast(program_text)
-        row["llm-generated-program"] = result["standardized_program"]
-        row["llm-generated-university"] = result["standardized_university"]
-        out.append(row)
 
-    return jsonify({"rows": out})
+def _standardize_rows_batched(rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Standardize one request's rows through the shared micro-batcher.
+
+    Distinct program strings are answered from the cache or rules in the
+    request thread; only the LLM-needed ones wait for a batch, where they
+    are coalesced with identical strings from other requests.
+    """
+    groups, texts = _group_rows(rows)
+    cache = _result_cache()
+    results, new_results, llm_keys = _resolve_without_llm(
+        groups, texts, cache, {"cached": 0, "llm": 0}
+    )
+    if cache and new_results:
+        cache.put_many(new_results.items())
+    batcher = _request_batcher()
+    futures = {key: batcher.submit(key, texts[key]) for key in llm_keys}
+    for key, future in futures.items():
+        results[key] = future.result(timeout=SERVE_TIMEOUT_S)
+    for key, indices in groups.items():
+        for idx in indices:
+            _apply_result(rows[idx], results[key])
+    return rows
 
 
 def _process_single_row(row: Dict[str, Any]) -> Dict[str, Any]:
@@ -419,65 +916,387 @@ def _process_single_row(row: Dict[str, Any]) -> Dict[str, Any]:
     return row
 
 
+def _group_rows(rows: Iterable[Dict[str, Any]]) -> Tuple[Dict[str, List[int]], Dict[str, str]]:
+    """
+    Group row positions by normalized program text (_cache_key).
+
+    Returns ({key: [row index, ...]}, {key: first raw program text}).
+    """
+    groups: Dict[str, List[int]] = {}
+    texts: Dict[str, str] = {}
+    for idx, row in enumerate(rows):
+        program_text = (row or {}).get("program") or ""
+        key = _cache_key(program_text)
+        groups.setdefault(key, []).append(idx)
+        texts.setdefault(key, program_text)
+    return groups, texts
+
+
+def _resolve_without_llm(
+    groups: Dict[str, List[int]],
+    texts: Dict[str, str],
+    cache: _ResultCache | None,
+    counts: Dict[str, int],
+) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, Tuple[str, str]], List[str]]:
+    """
+    Look each distinct key up in the persistent cache, then the rules.
+
+    Adds the number of rows answered from the cache to counts["cached"] and
+    of rows left for the model to counts["llm"]. Returns (results, new
+    results to store, keys that need the LLM).
+    """
+    results: Dict[str, Tuple[str, str]] = {}
+    new_results: Dict[str, Tuple[str, str]] = {}
+    llm_keys: List[str] = []
+    for key, program_text in texts.items():
+        result = cache.get(key) if cache else None
+        if result is not None:
+            counts["cached"] += len(groups[key])
+        else:
+            result = _try_rule_based_parse(program_text)
+            if result is None:
+                llm_keys.append(key)
+                counts["llm"] += len(groups[key])
+                continue
+            new_results[key] = result
+        results[key] = result
+    return results, new_results, llm_keys
+
+
+def _resolve_with_llm(
+    llm_keys: List[str],
+    texts: Dict[str, str],
+    workers: int,
+    pool: ProcessPoolExecutor | None = None,
+) -> Dict[str, Tuple[str, str]]:
+    """
+    One LLM batch over the distinct program strings of `llm_keys`.
+
+    Each string is evaluated once and consecutive prompts share the KV prefix.
+    `pool` is a worker pool kept across calls (see _llm_pool).
+    """
+    if workers <= 1 and _LLM is None:
+        print("  Loading LLM model...", file=sys.stderr)
+        _load_llm()  # Pre-load to avoid issues
+    print(
+        f"  Processing LLM rows ({len(llm_keys)} distinct, "
+        f"{workers} worker(s))...",
+        file=sys.stderr,
+    )
+    llm_results = _standardize_llm_batch(
+        [texts[key] for key in llm_keys], workers=workers, pool=pool
+    )
+    return {key: llm_results[texts[key]] for key in llm_keys}
+
+
+def _apply_result(row: Dict[str, Any], result: Tuple[str, str]) -> None:
+    """Attach a (program, university) result to a row."""
+    row["llm-generated-program"], row["llm-generated-university"] = result
+
+
+def _trim_partial_line(path: str, block_size: int = 1 << 16) -> None:
+    """
+    Drop an unterminated last line (e.g. left by a killed run) from a file.
+
+    Appending after it would otherwise glue two records onto one line.
+    """
+    try:
+        f = open(path, "rb+")
+    except FileNotFoundError:
+        return
+    with f:
+        end = f.seek(0, os.SEEK_END)
+        pos = end
+        while pos > 0:
+            start = max(0, pos - block_size)
+            f.seek(start)
+            block = f.read(pos - start)
+            if pos == end and block.endswith(b"\n"):
+                return
+            newline = block.rfind(b"\n")
+            if newline != -1:
+                f.truncate(start + newline + 1)
+                return
+            pos = start
+        f.truncate(0)
+
+
+def _iter_input_rows(in_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Stream rows from a JSON array or JSON Lines file.
+
+    A {'rows': [...]} document cannot be streamed and is read whole.
+    """
+    with open(in_path, "r", encoding="utf-8") as f:
+        is_array = is_json_array(f)
+        # Only a JSON Lines file is read line by line: an array may be one line
+        first_line = "" if is_array else f.readline()
+    if not is_array:
+        try:
+            first = json.loads(first_line)
+        except json.JSONDecodeError:
+            first = None
+        if not isinstance(first, dict) or isinstance(first.get("rows"), list):
+            with open(in_path, "r", encoding="utf-8") as f:
+                yield from _normalize_input(json.load(f))
+            return
+    yield from iter_records(in_path)
+
+
+class _CompletedRows:
+    """
+    Rows already present in a streaming output file, for --resume.
+
+    Rows are matched by result URL, held in a clean.DuplicateFilter bitmap.
+    The rare row without a URL is matched by its content instead.
+    """
+
+    def __init__(self) -> None:
+        self.count = 0
+        self._urls = DuplicateFilter()
+        self._others: Set[str] = set()
+
+    @staticmethod
+    def _content_key(row: Dict[str, Any]) -> str:
+        """The input row's JSON, without the fields this module adds."""
+        return json.dumps(
+            {k: v for k, v in row.items() if not k.startswith("llm-generated-")},
+            sort_keys=True,
+            ensure_ascii=False,
+        )
+
+    def seen(self, row: Dict[str, Any]) -> bool:
+        """Record `row`; True if an identical result was recorded before."""
+        url = row.get("url")
+        if url:
+            return self._urls.is_duplicate(url)
+        key = self._content_key(row)
+        if key in self._others:
+            return True
+        self._others.add(key)
+        return False
+
+    @classmethod
+    def from_output(cls, path: str) -> "_CompletedRows":
+        """Record every row of an existing output file."""
+        done = cls()
+        for row in iter_records(path):
+            done.seen(row)
+            done.count += 1
+        return done
+
+
+def _array_to_jsonl(path: str) -> None:
+    """Rewrite a JSON array output file as JSON Lines, so rows can be appended."""
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        for row in iter_records(path):
+            f.write(json.dumps(row, ensure_ascii=False))
+            f.write("\n")
+    os.replace(tmp, path)
+
+
+def _open_sink(path: str | None, append: bool, to_stdout: bool) -> Any:
+    """stdout, or `path` opened for writing (appending if requested)."""
+    if to_stdout:
+        return sys.stdout
+    assert path is not None
+    return open(path, "a" if append else "w", encoding="utf-8")
+
+
+def _cli_stream_file(
+    in_path: str,
+    out_path: str | None,
+    append: bool,
+    to_stdout: bool,
+    ordered: bool = True,
+    workers: int = 1,
+    window: int | None = None,
+    resume: bool = False,
+) -> None:
+    """
+    Stream rows from `in_path` and write each standardized row as a JSONL line.
+
+    Rows are read `window` (default STREAM_WINDOW) at a time, so memory stays
+    bounded by the window, not the input. Each window is grouped by program
+    text and resolved like the array mode. With `ordered`, a window's rows
+    are written in input order once its LLM batch is done; otherwise rows
+    answered by the cache or rules are written straight away and LLM rows
+    follow. Output is flushed after every window. With `append`, lines are
+    added to an existing output file (an unterminated last line from an
+    interrupted run is dropped first).
+
+    The output file is its own checkpoint: every flushed line is a finished
+    row. With `resume`, the rows already in the output are recorded by URL
+    (_CompletedRows), new lines are appended, and input rows already
+    written are skipped. The input may have changed since (e.g. a fresh
+    scrape added results); only rows not yet in the output are processed.
+    """
+    window = max(1, window or STREAM_WINDOW)
+    completed: _CompletedRows | None = None
+    if not to_stdout:
+        out_path = out_path or os.path.splitext(in_path)[0] + "_llm.jsonl"
+        if resume and os.path.exists(out_path):
+            with open(out_path, "r", encoding="utf-8") as f:
+                if is_json_array(f):
+                    _array_to_jsonl(out_path)  # e.g. an earlier array-mode run
+        if append or resume:
+            _trim_partial_line(out_path)
+        if resume and os.path.exists(out_path):
+            completed = _CompletedRows.from_output(out_path)
+            append = True
+            print(
+                f"Resuming: {completed.count} rows already in {out_path}",
+                file=sys.stderr,
+            )
+    cache = _result_cache()
+    # Only per-window counters: nothing kept for the run grows with the input
+    counts = {"total": 0, "distinct": 0, "cached": 0, "llm": 0, "new": 0}
+
+    def emit(rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            sink.write(json.dumps(row, ensure_ascii=False))
+            sink.write("\n")
+
+    print(f"Streaming rows from {in_path} ({window} per window)...", file=sys.stderr)
+    rows_iter = _iter_input_rows(in_path)
+    if completed is not None:
+        rows_iter = (row for row in rows_iter if not completed.seen(row or {}))
+    sink = _open_sink(out_path, append, to_stdout)
+    # With workers > 1, one pool is started at the first LLM window and kept
+    pool: ProcessPoolExecutor | None = None
+    try:
+        while True:
+            rows = [row for _, row in zip(range(window), rows_iter)]
+            if not rows:
+                break
+            counts["total"] += len(rows)
+            groups, texts = _group_rows(rows)
+            counts["distinct"] += len(groups)
+            results, new_results, llm_keys = _resolve_without_llm(groups, texts, cache, counts)
+            for key, result in results.items():
+                for idx in groups[key]:
+                    _apply_result(rows[idx], result)
+            if not ordered:
+                emit(rows[idx] for key in results for idx in groups[key])
+                sink.flush()
+            if llm_keys:
+                if workers > 1 and pool is None:
+                    pool = _llm_pool(workers)
+                llm_results = _resolve_with_llm(llm_keys, texts, workers, pool)
+                new_results.update(llm_results)
+                for key, result in llm_results.items():
+                    for idx in groups[key]:
+                        _apply_result(rows[idx], result)
+            if cache:
+                cache.put_many(new_results.items())
+            counts["new"] += len(new_results)
+            if ordered:
+                emit(rows)
+            else:
+                emit(rows[idx] for key in llm_keys for idx in groups[key])
+            sink.flush()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+        if sink is not sys.stdout:
+            sink.close()
+
+    total = counts["total"]
+    print(
+        f"  Distinct programs (summed per window): {counts['distinct']} / {total} rows "
+        f"({counts['distinct'] / total if total else 0.0:.1%})",
+        file=sys.stderr,
+    )
+    print(
+        f"  Cached: {counts['cached']} | Rule-parsed: "
+        f"{total - counts['llm'] - counts['cached']} | LLM-needed: {counts['llm']}",
+        file=sys.stderr,
+    )
+    print(f"Done! Streamed {total} rows, {counts['new']} new results.", file=sys.stderr)
+
+
 def _cli_process_file(
     in_path: str,
     out_path: str | None,
     append: bool,
     to_stdout: bool,
     parallel: bool = True,
+    llm_workers: int | None = None,
+    stream: bool = False,
+    ordered: bool = True,
+    window: int | None = None,
+    resume: bool = False,
 ) -> None:
-    """Process a JSON file with optional parallel processing."""
+    """
+    Process a JSON file with optional parallel processing.
+
+    Rows are grouped by normalized program text (_cache_key) and each
+    distinct value goes through the cache, rules or LLM exactly once.
+
+    With `parallel`, LLM-needed rows are spread over `llm_workers` model
+    processes (default LLM_WORKERS); otherwise one in-process model is used.
+    With `stream`, rows are written as JSON Lines while they are processed
+    (see _cli_stream_file); otherwise one JSON array is written at the end.
+    `resume` continues an interrupted streaming run and implies `stream`.
+    """
+    workers = (llm_workers or LLM_WORKERS) if parallel else 1
+    if stream or resume:
+        _cli_stream_file(
+            in_path, out_path, append, to_stdout, ordered, workers, window, resume
+        )
+        return
+
     with open(in_path, "r", encoding="utf-8") as f:
         rows = _normalize_input(json.load(f))
 
     total = len(rows)
     print(f"Processing {total} rows...", file=sys.stderr)
 
-    # First pass: separate into rule-parseable vs LLM-needed
-    rule_parsed: List[Tuple[int, Dict[str, Any]]] = []
-    llm_needed: List[Tuple[int, Dict[str, Any]]] = []
-
-    for idx, row in enumerate(rows):
-        program_text = (row or {}).get("program") or ""
-        result = _try_rule_based_parse(program_text)
-        if result is not None:
-            row["llm-generated-program"] = result[0]
-            row["llm-generated-university"] = result[1]
-            rule_parsed.append((idx, row))
-        else:
-            llm_needed.append((idx, row))
+    # Each distinct value is standardized once and fanned back out
+    groups, texts = _group_rows(rows)
+    print(
+        f"  Distinct programs: {len(groups)} / {total} rows "
+        f"({len(groups) / total if total else 0.0:.1%})",
+        file=sys.stderr,
+    )
 
+    # First pass: persistent cache, then rules; the rest needs the LLM
+    cache = _result_cache()
+    counts = {"cached": 0, "llm": 0}
+    results, new_results, llm_keys = _resolve_without_llm(groups, texts, cache, counts)
     print(
-        f"  Rule-parsed: {len(rule_parsed)} | LLM-needed: {len(llm_needed)}",
+        f"  Cached: {counts['cached']} | Rule-parsed: "
+        f"{total - counts['llm'] - counts['cached']} | LLM-needed: {counts['llm']}",
         file=sys.stderr,
     )
 
-    # Process LLM-needed rows sequentially (LLM isn't thread-safe)
-    # Pre-load the model once before processing
-    processed_llm: List[Tuple[int, Dict[str, Any]]] = []
-    if llm_needed:
-        print("  Loading LLM model...", file=sys.stderr)
-        _load_llm()  # Pre-load to avoid issues
-        print("  Processing LLM rows...", file=sys.stderr)
-        for idx, row in llm_needed:
-            processed_llm.append((idx, _process_single_row(row)))
+    if llm_keys:
+        llm_results = _resolve_with_llm(llm_keys, texts, workers)
+        results.update(llm_results)
+        new_results.update(llm_results)
+
+    if cache:
+        cache.put_many(new_results.items())
+        stats = cache.stats()
+        print(
+            f"  Cache: {stats['hits']} hits / {stats['hits'] + stats['misses']} "
+            f"lookups ({stats['hit_rate']:.0%}), {len(new_results)} new entries",
+            file=sys.stderr,
+        )
 
-    # Merge and sort by original index
-    all_processed = sorted(rule_parsed + processed_llm, key=lambda x: x[0])
+    # Fan the per-value results back out to the rows, in input order
+    for key, indices in groups.items():
+        for idx in indices:
+            _apply_result(rows[idx], results[key])
 
     # Write output as JSON array
-    sink = sys.stdout if to_stdout else None
     if not to_stdout:
         out_path = out_path or in_path.replace(".json", "_llm.json")
-        mode = "a" if append else "w"
-        sink = open(out_path, mode, encoding="utf-8")
-
-    assert sink is not None
+    sink = _open_sink(out_path, append, to_stdout)
 
     try:
-        # Extract just the rows (without indices) and write as JSON array
-        rows_out = [row for _, row in all_processed]
-        json.dump(rows_out, sink, ensure_ascii=False, indent=2)
+        json.dump(rows, sink, ensure_ascii=False, indent=2)
         sink.write("\n")
         sink.flush()
         print(f"Done! Processed {total} rows.", file=sys.stderr)
@@ -486,7 +1305,7 @@ def _cli_process_file(
             sink.close()
 
 
-if __name__ == "__main__":
+if __name__ == "__main__":  # pragma: no cover
     import argparse
 
     parser = argparse.ArgumentParser(
@@ -502,11 +1321,17 @@ if __name__ == "__main__":
         action="store_true",
         help="Run the HTTP server instead of CLI.",
     )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="With --serve, micro-batch LLM work across concurrent requests "
+        "(SERVE_MAX_BATCH, SERVE_MAX_WAIT_MS; also BATCH_SERVING=1).",
+    )
     parser.add_argument(
         "--out",
         default=None,
-        help="Output path for JSON Lines (ndjson). "
-        "Defaults to <input>.jsonl when --file is set.",
+        help="Output path: a JSON array, or JSON Lines (ndjson) with --stream. "
+        "Defaults to <input>_llm.json / <input>_llm.jsonl.",
     )
     parser.add_argument(
         "--append",
@@ -516,17 +1341,54 @@ if __name__ == "__main__":
     parser.add_argument(
         "--stdout",
         action="store_true",
-        help="Write JSON Lines to stdout instead of a file.",
+        help="Write to stdout instead of a file.",
+    )
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Read rows incrementally and write each as a JSON Lines record "
+        "as soon as it is standardized (bounded memory).",
+    )
+    parser.add_argument(
+        "--unordered",
+        action="store_true",
+        help="With --stream, write rule/cache rows before LLM rows of the "
+        "same window instead of keeping input order.",
+    )
+    parser.add_argument(
+        "--window",
+        type=int,
+        default=None,
+        help="Rows per --stream window (default: STREAM_WINDOW env, 1000).",
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Append to the --stream output, skipping input rows (by URL) "
+        "already written by an earlier or interrupted run (implies --stream).",
+    )
+    parser.add_argument(
+        "--llm-workers",
+        type=int,
+        default=None,
+        help="Model processes for LLM rows, sharing N_THREADS "
+        "(default: LLM_WORKERS env, 1).",
     )
     args = parser.parse_args()
 
     if args.serve or args.file is None:
+        BATCH_SERVING = BATCH_SERVING or bool(args.batch)
         port = int(os.getenv("PORT", "8000"))
-        app.run(host="0.0.0.0", port=port, debug=False)
+        app.run(host="0.0.0.0", port=port, debug=False, threaded=True)
     else:
         _cli_process_file(
             in_path=args.file,
             out_path=args.out,
             append=bool(args.append),
             to_stdout=bool(args.stdout),
+            llm_workers=args.llm_workers,
+            stream=bool(args.stream),
+            ordered=not args.unordered,
+            window=args.window,
+            resume=bool(args.resume),
         )
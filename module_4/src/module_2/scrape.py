@@ -2,54 +2,662 @@
 """
 scrape.py - Web scraper for The Grad Cafe admission results.
 
-This module uses urllib to fetch pages and BeautifulSoup to parse HTML,
-extracting graduate school admission data for analysis.
+This module fetches pages over pooled keep-alive HTTP connections and parses
+the HTML with lxml (or BeautifulSoup's html.parser when lxml is missing),
+extracting graduate school admission data for analysis. Pages can be fetched
+concurrently by a bounded thread pool sharing a requests-per-second budget;
+results are always reassembled in page order, and parsing can run in a
+process pool that overlaps with fetching. Long runs can stream entries to a
+resumable JSON Lines file as they arrive. Raw pages can be kept in an
+on-disk cache that is revalidated with conditional requests, so parser changes
+can be re-run offline.
 
 """
 
+import email.utils
+import gzip
+import hashlib
+import http.client
+import itertools
 import json
+import multiprocessing
+import os
+import random
 import re
+import ssl
+import sys
+import tempfile
+import threading
 import time
-import urllib.request
-import urllib.error
+import urllib.parse
+import zlib
+from collections import deque, namedtuple
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from bs4 import BeautifulSoup
 
+try:
+    import lxml.html
+except ImportError:  # pragma: no cover - lxml is optional
+    lxml = None
+
+try:
+    from .applicant_record import ApplicantRecord, as_dict
+    from .clean import iter_records
+except ImportError:  # pragma: no cover - run as a script from module_2/
+    from applicant_record import ApplicantRecord, as_dict
+    from clean import iter_records
+
 
 # Base URL for Grad Cafe survey results
 BASE_URL = "https://www.thegradcafe.com/survey/"
 
+USER_AGENT = 'SuperHan/1.0 (Educational Research Bot)'
+
+# HTTP statuses that carry a Location header we should follow
+_REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+
+# Numeric result ID inside a result URL, e.g. /result/998643
+_RESULT_ID_RE = re.compile(r'/result/(\d+)')
+
+# Class/href filters used by both parser backends
+_BADGE_CLASS_RE = re.compile(r'tw-rounded|tw-px-2')
+_UNI_CLASS_RE = re.compile(r'tw-font-medium')
+_COMMENT_CLASS_RE = re.compile(r'tw-text-gray.*tw-text-sm')
+_RESULT_HREF_RE = re.compile(r'/result/\d+')
+
+# Leading <?xml ...?> declaration, which lxml rejects in an already decoded str
+_XML_DECLARATION_RE = re.compile(r'\s*<\?xml[^>]*\?>')
+
+# Badge classifier: one alternative per field, tried in priority order
+_BADGE_RE = re.compile(
+    r'(?P<term>(?i:Fall|Spring|Summer|Winter)\s+\d{4}$)'   # "Fall 2026"
+    r'|(?P<us_int>(?:American|International)\Z)'          # exact status
+    r'|(?P<gpa>GPA)'                                       # "GPA 3.89"
+    r'|(?P<gre_v>(?i:GRE\s*V\s*\d))'                      # "GRE V 161"
+    r'|(?P<gre_aw>(?i:GRE\s*(?:AW|A)\s*[\d.]))'            # "GRE AW 4.5"
+    r'|(?P<gre>(?i:GRE\s*\d))'                              # "GRE 325"
+)
+_BADGE_FIELDS = {
+    'term': 'term',
+    'us_int': 'US/International',
+    'gpa': 'GPA',
+    'gre_v': 'GRE_V',
+    'gre_aw': 'GRE_AW',
+    'gre': 'GRE',
+}
+
+_Response = namedtuple('_Response', ['status', 'reason', 'headers', 'body'])
+
+# Statuses worth retrying; any other non-200 answer fails the page at once
+_RETRY_STATUSES = frozenset({408, 425, 429, 500, 502, 503, 504})
+# Longest Retry-After we are willing to wait out for a single request
+_MAX_RETRY_AFTER = 600.0
+
 
-def _fetch_page(page_num, retries=3):
+class _HTTPStatusError(Exception):
+    """Raised when a page request completes with a non-200 status."""
+
+    def __init__(self, status, reason='', retry_after=None):
+        super().__init__(f"HTTP {status} {reason}")
+        self.status = status
+        self.retry_after = retry_after
+
+    @property
+    def retryable(self):
+        return self.status in _RETRY_STATUSES
+
+
+def _retry_after(headers):
+    """Seconds requested by a Retry-After header (delta or HTTP date), or None."""
+    value = headers.get('Retry-After')
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, when.timestamp() - time.time())
+
+
+def _backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
     """
-    Fetch a single page of results using urllib.
+    Sleep before retry number `attempt` (0-based): exponential with full jitter.
+
+    A server-supplied Retry-After is a floor, capped at _MAX_RETRY_AFTER.
+    """
+    delay = random.uniform(0, min(cap, base * 2 ** attempt))
+    if retry_after is not None:
+        delay = max(delay, min(retry_after, _MAX_RETRY_AFTER))
+    return delay
+
+
+def _decompress(body, encoding):
+    """Decode a gzip/deflate Content-Encoding; other encodings pass through."""
+    encoding = (encoding or '').strip().lower()
+    if encoding in ('gzip', 'x-gzip'):
+        return gzip.decompress(body)
+    if encoding == 'deflate':
+        try:
+            return zlib.decompress(body)
+        except zlib.error:
+            # Some servers send raw deflate without the zlib header
+            return zlib.decompress(body, -zlib.MAX_WBITS)
+    return body
+
+
+class _HTTPSession:
+    """
+    Thread-safe pool of persistent HTTP(S) connections keyed by host.
+
+    Each request checks a connection out of the pool, so a connection is
+    only ever used by one thread at a time, and returns it afterwards for
+    reuse. Reusing connections skips the TCP and TLS handshakes that
+    otherwise dominate the latency of small HTML pages.
+    """
+
+    def __init__(self, timeout=30, max_idle=8):
+        self.timeout = timeout
+        self.max_idle = max_idle
+        self._idle = {}
+        self._lock = threading.Lock()
+        self._ssl_context = ssl.create_default_context()
+
+    def _connect(self, key):
+        """Open a new connection for a (scheme, host, port) key."""
+        scheme, host, port = key
+        if scheme == 'https':
+            return http.client.HTTPSConnection(host, port, timeout=self.timeout,
+                                               context=self._ssl_context)
+        return http.client.HTTPConnection(host, port, timeout=self.timeout)
+
+    def _acquire(self, key):
+        """Return (connection, reused) for key, preferring an idle one."""
+        with self._lock:
+            idle = self._idle.get(key)
+            if idle:
+                return idle.pop(), True
+        return self._connect(key), False
+
+    def _release(self, key, conn):
+        """Return a healthy connection to the pool, or close it if full."""
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_idle:
+                idle.append(conn)
+                return
+        conn.close()
+
+    def _request(self, key, target, headers):
+        """Send one GET on a pooled connection and read the full response."""
+        conn, reused = self._acquire(key)
+        while True:
+            try:
+                conn.request('GET', target, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (http.client.RemoteDisconnected, ConnectionResetError, BrokenPipeError):
+                conn.close()
+                if not reused:
+                    raise
+                # The server dropped an idle keep-alive connection; retry on a fresh one
+                conn, reused = self._connect(key), False
+            except Exception:
+                conn.close()
+                raise
+        if resp.will_close:
+            conn.close()
+        else:
+            self._release(key, conn)
+        # resp.msg is an HTTPMessage, so header lookups ignore case
+        return _Response(resp.status, resp.reason, resp.msg,
+                         _decompress(body, resp.getheader('Content-Encoding')))
+
+    def get(self, url, headers=None, max_redirects=5):
+        """
+        GET a URL, following redirects and decompressing the body.
+
+        Args:
+            url: Absolute http(s) URL
+            headers: Optional extra request headers
+            max_redirects: Maximum number of redirects to follow
+
+        Returns:
+            _Response(status, reason, headers, body) with body as bytes
+        """
+        request_headers = {
+            'User-Agent': USER_AGENT,
+            'Accept-Encoding': 'gzip, deflate',
+            'Connection': 'keep-alive',
+        }
+        request_headers.update(headers or {})
+
+        for _ in range(max_redirects + 1):
+            parts = urllib.parse.urlsplit(url)
+            default_port = 443 if parts.scheme == 'https' else 80
+            key = (parts.scheme, parts.hostname, parts.port or default_port)
+            target = parts.path or '/'
+            if parts.query:
+                target = f"{target}?{parts.query}"
+            response = self._request(key, target, request_headers)
+            location = response.headers.get('Location')
+            if response.status not in _REDIRECT_STATUSES or not location:
+                return response
+            url = urllib.parse.urljoin(url, location)
+        return response
+
+    def close(self):
+        """Close every idle connection in the pool."""
+        with self._lock:
+            idle, self._idle = self._idle, {}
+        for conns in idle.values():
+            for conn in conns:
+                conn.close()
+
+
+# Session shared by callers that do not bring their own
+_SESSION = _HTTPSession()
+
+
+class _RateLimiter:
+    """
+    Token bucket shared by all fetch workers.
+
+    Tokens refill continuously at `rate` per second up to `burst`; every
+    HTTP request (including retries) takes one token, so the whole scrape
+    never exceeds the politeness budget regardless of worker count.
+    """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.capacity = max(1.0, float(burst))
+        self._tokens = self.capacity
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a request token is available, then consume it."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity,
+                                   self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+
+class _CircuitBreaker:
+    """
+    Error-rate circuit breaker shared by every fetcher talking to one host.
+
+    Outcomes of the last `window` requests are tracked; once at least
+    `min_requests` have been seen and the failure share reaches
+    `threshold`, the circuit opens and `wait()` blocks every fetcher for
+    `cooldown` seconds. A Retry-After on a failed response opens it for at
+    least that long. The window is cleared on opening, so after the pause
+    the host has to fail repeatedly again before the next one.
+    """
+
+    def __init__(self, host, window=20, threshold=0.5, min_requests=5, cooldown=30.0):
+        self.host = host
+        self.threshold = threshold
+        self.min_requests = min_requests
+        self.cooldown = cooldown
+        self.trips = 0
+        self._outcomes = deque(maxlen=window)
+        self._open_until = 0.0
+        self._lock = threading.Lock()
+
+    def wait(self):
+        """Block while the circuit is open."""
+        while True:
+            with self._lock:
+                remaining = self._open_until - time.monotonic()
+            if remaining <= 0:
+                return
+            time.sleep(remaining)
+
+    def record(self, ok, retry_after=None):
+        """Record one request outcome, opening the circuit if needed."""
+        with self._lock:
+            self._outcomes.append(ok)
+            pause = min(retry_after, _MAX_RETRY_AFTER) if retry_after else 0.0
+            failures = self._outcomes.count(False)
+            if (len(self._outcomes) >= self.min_requests
+                    and failures / len(self._outcomes) >= self.threshold):
+                pause = max(pause, self.cooldown)
+            now = time.monotonic()
+            if pause <= 0 or now + pause <= self._open_until:
+                return
+            self._open_until = now + pause
+            self._outcomes.clear()
+            self.trips += 1
+        print(f"  Circuit open for {self.host}: pausing all fetchers for {pause:.0f}s")
+
+
+def _distribution(values):
+    """Summarise a list of durations as count/total/mean/p50/p95/max."""
+    if not values:
+        return {'count': 0, 'total': 0.0, 'mean': 0.0, 'p50': 0.0, 'p95': 0.0, 'max': 0.0}
+    ordered = sorted(values)
+    last = len(ordered) - 1
+    total = sum(ordered)
+    return {
+        'count': len(ordered),
+        'total': round(total, 6),
+        'mean': round(total / len(ordered), 6),
+        'p50': round(ordered[round(0.50 * last)], 6),
+        'p95': round(ordered[round(0.95 * last)], 6),
+        'max': round(ordered[-1], 6),
+    }
+
+
+class _ScrapeStats:
+    """
+    Per-page timing and throughput counters for one scrape.
+
+    Fetcher threads record every HTTP attempt (latency, body bytes,
+    whether it was a retry) and cache hits; the parse stage records its
+    time per page and the driver records how many entries each page gave.
+    `summary()` turns that into a JSON-ready dict with per-stage
+    distributions and a guess at the bottleneck: total fetch time spread
+    over the fetch workers vs. total parse time spread over the parsers.
+    """
+
+    def __init__(self, workers=1, parse_workers=0, progress_every=None, stream=None):
+        self.workers = max(1, workers)
+        self.parse_workers = parse_workers
+        self.progress_every = progress_every
+        self.stream = stream or sys.stderr
+        self.breaker_trips = 0
+        self._started = time.monotonic()
+        self._last_report = self._started
+        self._pages = {}
+        self._lock = threading.Lock()
+
+    def _page(self, page_num):
+        page = self._pages.get(page_num)
+        if page is None:
+            page = self._pages[page_num] = {
+                'page': page_num, 'requests': 0, 'retries': 0, 'fetch_s': 0.0,
+                'bytes': 0, 'cached': False, 'parse_s': None, 'entries': None,
+                'failed': False,
+            }
+        return page
+
+    def record_request(self, page_num, seconds, nbytes, retry=False):
+        """Record one HTTP attempt for a page."""
+        with self._lock:
+            page = self._page(page_num)
+            page['requests'] += 1
+            page['retries'] += int(retry)
+            page['fetch_s'] += seconds
+            page['bytes'] += nbytes
+
+    def record_cache_hit(self, page_num):
+        """Record a page served from the page cache without a request."""
+        with self._lock:
+            self._page(page_num)['cached'] = True
+
+    def record_parse(self, page_num, seconds):
+        """Record the time spent parsing a page."""
+        with self._lock:
+            self._page(page_num)['parse_s'] = seconds
+
+    def record_entries(self, page_num, count):
+        """Record the entries a page produced (None when it failed)."""
+        with self._lock:
+            page = self._page(page_num)
+            page['entries'] = count
+            page['failed'] = count is None
+
+    def summary(self):
+        """Return the run's metrics as a JSON-serialisable dict."""
+        with self._lock:
+            pages = sorted((dict(p) for p in self._pages.values()), key=lambda p: p['page'])
+        elapsed = max(time.monotonic() - self._started, 1e-9)
+        done = [p for p in pages if p['entries'] is not None]
+        entries = sum(p['entries'] for p in done)
+        fetch = _distribution([p['fetch_s'] for p in pages if p['requests']])
+        parse = _distribution([p['parse_s'] for p in pages if p['parse_s'] is not None])
+        fetch_load = fetch['total'] / self.workers
+        parse_load = parse['total'] / max(1, self.parse_workers)
+        return {
+            'elapsed_s': round(elapsed, 3),
+            'pages': len(done),
+            # Pages cancelled by an early stop are neither done nor failed
+            'failed_pages': sum(1 for p in pages if p['failed']),
+            'entries': entries,
+            'entries_per_s': round(entries / elapsed, 3),
+            'pages_per_s': round(len(done) / elapsed, 3),
+            'requests': sum(p['requests'] for p in pages),
+            'retries': sum(p['retries'] for p in pages),
+            'cache_hits': sum(1 for p in pages if p['cached']),
+            'bytes': sum(p['bytes'] for p in pages),
+            'breaker_trips': self.breaker_trips,
+            'fetch_s': fetch,
+            'parse_s': parse,
+            'workers': self.workers,
+            'parse_workers': self.parse_workers,
+            'bottleneck': 'fetch' if fetch_load >= parse_load else 'parse',
+            'per_page': pages,
+        }
+
+    def progress_line(self):
+        """One-line progress summary."""
+        s = self.summary()
+        return (f"[progress] {s['pages']} pages ({s['failed_pages']} failed), "
+                f"{s['entries']} entries, {s['entries_per_s']:.1f} entries/s, "
+                f"fetch p50 {s['fetch_s']['p50'] * 1000:.0f}ms, "
+                f"parse p50 {s['parse_s']['p50'] * 1000:.0f}ms, "
+                f"{s['retries']} retries")
+
+    def maybe_report(self):
+        """Write a progress line to the stream every `progress_every` seconds."""
+        if not self.progress_every:
+            return
+        now = time.monotonic()
+        if now - self._last_report >= self.progress_every:
+            self._last_report = now
+            print(self.progress_line(), file=self.stream, flush=True)
+
+    def write(self, path):
+        """Write the summary as JSON."""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.summary(), f, indent=2)
+
+
+class _PageCache:
+    """
+    On-disk cache of raw survey pages.
+
+    Page bodies are stored gzip-compressed and content-addressed under
+    ``objects/<sha256>.html.gz``, so identical pages share one blob.
+    ``pages/<page_num>.json`` records which blob a page number maps to,
+    when it was fetched, and the ETag / Last-Modified validators used to
+    revalidate it with a conditional request once it is older than `ttl`.
+    With `offline` set, cached pages are always served and nothing is
+    fetched, which lets the parser be re-run over a whole scrape locally.
+    """
+
+    def __init__(self, directory, ttl=3600, offline=False):
+        self.directory = directory
+        self.ttl = ttl
+        self.offline = offline
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+        os.makedirs(os.path.join(directory, 'pages'), exist_ok=True)
+
+    def _meta_path(self, page_num):
+        return os.path.join(self.directory, 'pages', f"{page_num}.json")
+
+    def _blob_path(self, digest):
+        return os.path.join(self.directory, 'objects', f"{digest}.html.gz")
+
+    def _write_atomic(self, path, data):
+        """Write bytes via a temp file + rename so readers never see a partial file."""
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def lookup(self, page_num):
+        """Return the metadata dict for a cached page, or None."""
+        try:
+            with open(self._meta_path(page_num), 'r', encoding='utf-8') as f:
+                meta = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return None
+        return meta if os.path.exists(self._blob_path(meta['sha256'])) else None
+
+    def is_fresh(self, meta):
+        """True when a cached page is young enough to use without revalidating."""
+        return self.offline or time.time() - meta['fetched_at'] < self.ttl
+
+    def read(self, meta):
+        """Return the cached HTML for a metadata dict."""
+        with gzip.open(self._blob_path(meta['sha256']), 'rb') as f:
+            return f.read().decode('utf-8')
+
+    def store(self, page_num, html, etag=None, last_modified=None):
+        """Cache a freshly fetched page and its validators."""
+        body = html.encode('utf-8')
+        digest = hashlib.sha256(body).hexdigest()
+        blob_path = self._blob_path(digest)
+        if not os.path.exists(blob_path):
+            self._write_atomic(blob_path, gzip.compress(body))
+        self._write_meta(page_num, {
+            'sha256': digest,
+            'fetched_at': time.time(),
+            'etag': etag,
+            'last_modified': last_modified,
+        })
+
+    def touch(self, page_num, meta):
+        """Mark a cached page as revalidated (HTTP 304) just now."""
+        self._write_meta(page_num, dict(meta, fetched_at=time.time()))
+
+    def _write_meta(self, page_num, meta):
+        self._write_atomic(self._meta_path(page_num), json.dumps(meta).encode('utf-8'))
+
+
+def _fetch_page(page_num, retries=5, limiter=None, session=None, cache=None,
+                breaker=None, backoff=1.0, stats=None):
+    """
+    Fetch a single page of results over a pooled keep-alive connection.
+
+    Network errors and retryable statuses (429, 5xx, ...) are retried with
+    exponential backoff and full jitter, never sooner than a Retry-After
+    header asks; other statuses (e.g. 404) fail the page immediately.
     
     Args:
         page_num: Page number to fetch (1-indexed)
-        retries: Number of retry attempts on failure
+        retries: Maximum number of attempts
+        limiter: Optional _RateLimiter consulted before every request
+        session: _HTTPSession to use (defaults to the module-wide session)
+        cache: Optional _PageCache; fresh pages are served from it, stale
+            ones are revalidated with a conditional request
+        breaker: Optional _CircuitBreaker shared with the other fetchers
+        backoff: Base backoff delay in seconds (doubles per attempt)
+        stats: Optional _ScrapeStats recording each attempt and cache hit
         
     Returns:
         HTML content as string, or None on failure
     """
     url = f"{BASE_URL}?page={page_num}"
+    session = session or _SESSION
+    
+    meta = cache.lookup(page_num) if cache is not None else None
+    if meta and cache.is_fresh(meta):
+        if stats is not None:
+            stats.record_cache_hit(page_num)
+        return cache.read(meta)
+    if cache is not None and cache.offline:
+        print(f"  Page {page_num} is not in the cache")
+        return None
+    
+    headers = {}
+    if meta and meta.get('etag'):
+        headers['If-None-Match'] = meta['etag']
+    if meta and meta.get('last_modified'):
+        headers['If-Modified-Since'] = meta['last_modified']
     
     for attempt in range(retries):
+        if breaker is not None:
+            breaker.wait()
+        if limiter is not None:
+            limiter.acquire()
+        retry_after = None
+        nbytes = 0
+        started = time.perf_counter()
         try:
-            req = urllib.request.Request(
-                url,
-                headers={'User-Agent': 'SuperHan/1.0 (Educational Research Bot)'}
-            )
-            
-            with urllib.request.urlopen(req, timeout=30) as response:
-                return response.read().decode('utf-8')
+            response = session.get(url, headers=headers)
+            nbytes = len(response.body)
+            if response.status == 304 and meta:
+                html = cache.read(meta)
+                cache.touch(page_num, meta)
+            elif response.status != 200:
+                raise _HTTPStatusError(response.status, response.reason,
+                                       _retry_after(response.headers))
+            else:
+                html = response.body.decode('utf-8')
+                if cache is not None:
+                    cache.store(page_num, html, response.headers.get('ETag'),
+                                response.headers.get('Last-Modified'))
+            if breaker is not None:
+                breaker.record(True)
+            return html
                 
-        except urllib.error.URLError as e:
-            print(f"  Attempt {attempt + 1}/{retries} failed for page {page_num}: {e}")
-            if attempt < retries - 1:
-                time.sleep(2)  # Wait before retry
+        except _HTTPStatusError as e:
+            if not e.retryable:
+                print(f"  Page {page_num} failed: {e} - not retrying")
+                return None
+            error, retry_after = e, e.retry_after
+        except (OSError, http.client.HTTPException, zlib.error, EOFError,
+                UnicodeDecodeError) as e:
+            # A corrupt or truncated body fails this attempt, not the whole scrape
+            error = e
+        finally:
+            if stats is not None:
+                stats.record_request(page_num, time.perf_counter() - started, nbytes,
+                                     retry=attempt > 0)
+        
+        if breaker is not None:
+            breaker.record(False, retry_after)
+        print(f"  Attempt {attempt + 1}/{retries} failed for page {page_num}: {error}")
+        if attempt < retries - 1:
+            time.sleep(_backoff_delay(attempt, base=backoff, retry_after=retry_after))
                 
     return None
 
 
+def _badge_field(text):
+    """
+    Classify one badge's text into the entry field it belongs to.
+    
+    A single anchored match of _BADGE_RE replaces a chain of separate
+    regex tests; its alternatives are ordered so the first one that
+    matches gives the same answer the chain of checks used to.
+    
+    Args:
+        text: Stripped badge text
+        
+    Returns:
+        Field name ('term', 'GPA', 'GRE_V', ...) or None if unrecognized
+    """
+    if not text:
+        return None
+    match = _BADGE_RE.match(text)
+    return _BADGE_FIELDS[match.lastgroup] if match else None
+
+
 def _extract_badges(badge_row):
     """
     Extract badge information (term, GPA, GRE, etc.) from a badge row.
@@ -66,64 +674,42 @@ def _extract_badges(badge_row):
         return badges
     
     # Find all badge-like divs
-    badge_divs = badge_row.find_all('div', class_=re.compile(r'tw-rounded|tw-px-2'))
+    badge_divs = badge_row.find_all('div', class_=_BADGE_CLASS_RE)
     
     for div in badge_divs:
         text = div.get_text(strip=True)
-        
-        if not text:
-            continue
-            
-        # Term (e.g., "Fall 2024", "Spring 2025")
-        if re.match(r'^(Fall|Spring|Summer|Winter)\s+\d{4}$', text, re.IGNORECASE):
-            badges['term'] = text
-            
-        # US/International status
-        elif text in ['American', 'International']:
-            badges['US/International'] = text
-            
-        # GPA
-        elif text.startswith('GPA'):
-            badges['GPA'] = text
-            
-        # GRE Verbal
-        elif re.match(r'^GRE\s*V\s*\d+', text, re.IGNORECASE):
-            badges['GRE_V'] = text
-            
-        # GRE Analytical Writing
-        elif re.match(r'^GRE\s*(AW|A)\s*[\d.]+', text, re.IGNORECASE):
-            badges['GRE_AW'] = text
-            
-        # General GRE score
-        elif re.match(r'^GRE\s*\d+', text, re.IGNORECASE):
-            badges['GRE'] = text
+        field = _badge_field(text)
+        if field:
+            badges[field] = text
             
     return badges
 
 
-def _parse_entry(rows):
+def _parse_entry(rows, cells=None):
     """
     Parse a group of table rows representing one admission entry.
     
     Args:
         rows: List of BeautifulSoup tr elements for one entry
+        cells: The primary row's td elements, if the caller already has them
         
     Returns:
-        Dictionary with applicant data, or None if parsing fails
+        ApplicantRecord, or None if parsing fails
     """
     if not rows or len(rows) == 0:
         return None
         
     primary_row = rows[0]
-    cells = primary_row.find_all('td')
+    if cells is None:
+        cells = primary_row.find_all('td')
     
     if len(cells) < 4:
         return None
         
-    entry = {}
+    entry = ApplicantRecord()
     
     # Cell 0: University name
-    uni_div = cells[0].find('div', class_=re.compile(r'tw-font-medium'))
+    uni_div = cells[0].find('div', class_=_UNI_CLASS_RE)
     university = ""
     if uni_div:
         university = uni_div.get_text(strip=True)
@@ -141,81 +727,84 @@ def _parse_entry(rows):
             program = spans[0].get_text(strip=True)
             # Second span (if exists) is degree
             if len(spans) > 1:
-                entry['Degree'] = spans[1].get_text(strip=True)
+                entry.degree = spans[1].get_text(strip=True)
         else:
             # No spans, get text directly
             program = prog_div.get_text(strip=True)
     
     # Combine program and university
     if program and university:
-        entry['program'] = f"{program}, {university}"
+        entry.program = f"{program}, {university}"
     elif program:
-        entry['program'] = program
+        entry.program = program
     elif university:
-        entry['program'] = university
+        entry.program = university
     else:
-        entry['program'] = ""
+        entry.program = ""
         
     # Cell 2: Date added
     if len(cells) > 2:
         date_text = cells[2].get_text(strip=True)
-        entry['date_added'] = date_text
+        entry.date_added = date_text
         
     # Cell 3: Status/Decision
     if len(cells) > 3:
         status_div = cells[3].find('div')
         if status_div:
             status_text = status_div.get_text(strip=True)
-            entry['status'] = status_text
+            entry.status = status_text
             
     # Cell 4: URL link (if exists)
     if len(cells) > 4:
-        url_link = cells[4].find('a', href=re.compile(r'/result/\d+'))
+        url_link = cells[4].find('a', href=_RESULT_HREF_RE)
         if url_link:
             result_id = url_link.get('href', '')
-            entry['url'] = f"https://www.thegradcafe.com{result_id}"
+            entry.url = f"https://www.thegradcafe.com{result_id}"
             
     # If no URL found in cell 4, try to find it anywhere in the row
-    if 'url' not in entry or not entry['url']:
-        any_link = primary_row.find('a', href=re.compile(r'/result/\d+'))
+    if not entry.url:
+        any_link = primary_row.find('a', href=_RESULT_HREF_RE)
         if any_link:
             result_id = any_link.get('href', '')
-            entry['url'] = f"https://www.thegradcafe.com{result_id}"
+            entry.url = f"https://www.thegradcafe.com{result_id}"
         else:
-            entry['url'] = ""
+            entry.url = ""
                 
     # Process additional rows for badges and comments
     for i, row in enumerate(rows[1:], 1):
         # Check if this is a badge row or comment row
-        comment_p = row.find('p', class_=re.compile(r'tw-text-gray.*tw-text-sm'))
+        comment_p = row.find('p', class_=_COMMENT_CLASS_RE)
         if comment_p:
-            entry['comments'] = comment_p.get_text(strip=True)
+            entry.comments = comment_p.get_text(strip=True)
         else:
             # Extract badges
-            badges = _extract_badges(row)
-            entry.update(badges)
+            for field, text in _extract_badges(row).items():
+                entry.set(field, text)
                 
     # Ensure comments field exists with consistent empty string for missing data
-    if 'comments' not in entry:
-        entry['comments'] = ''
+    if entry.comments is None:
+        entry.comments = ''
 
     # Ensure GRE fields exist with consistent empty string for missing data
-    for field in ['GRE', 'GRE_V', 'GRE_AW']:
-        if field not in entry:
-            entry[field] = ''
+    if entry.gre is None:
+        entry.gre = ''
+    if entry.gre_v is None:
+        entry.gre_v = ''
+    if entry.gre_aw is None:
+        entry.gre_aw = ''
         
     return entry
 
 
-def _parse_page(html):
+def _parse_page_bs4(html):
     """
-    Parse a page of HTML to extract all admission entries.
+    Parse a page of HTML with BeautifulSoup's pure-Python html.parser.
     
     Args:
         html: Raw HTML content
         
     Returns:
-        List of entry dictionaries
+        List of ApplicantRecord entries
     """
     soup = BeautifulSoup(html, 'html.parser')
     entries = []
@@ -233,6 +822,7 @@ def _parse_page(html):
     
     # Group rows by entry - each entry starts with a row containing 4+ td cells
     current_entry_rows = []
+    current_cells = None
     
     for row in rows:
         cells = row.find_all('td')
@@ -241,79 +831,631 @@ def _parse_page(html):
         if len(cells) >= 4:
             # Save previous entry if exists
             if current_entry_rows:
-                entry = _parse_entry(current_entry_rows)
+                entry = _parse_entry(current_entry_rows, current_cells)
                 if entry:
                     entries.append(entry)
                     
             # Start new entry
             current_entry_rows = [row]
+            current_cells = cells
         else:
             # This is a continuation row (badges or comments)
             current_entry_rows.append(row)
             
     # Don't forget the last entry
     if current_entry_rows:
-        entry = _parse_entry(current_entry_rows)
+        entry = _parse_entry(current_entry_rows, current_cells)
         if entry:
             entries.append(entry)
             
     return entries
 
 
-def scrape_data(num_pages=1500, delay=1.0, start_page=1):
+# Elements whose text BeautifulSoup's get_text() leaves out
+_LXML_HIDDEN_TAGS = ('script', 'style', 'template')
+
+
+def _lxml_strings(el):
+    """Like el.itertext(), but skipping the text of _LXML_HIDDEN_TAGS elements."""
+    if el.text and isinstance(el.tag, str):
+        yield el.text
+    for child in el:
+        if child.tag not in _LXML_HIDDEN_TAGS:
+            yield from _lxml_strings(child)
+        if child.tail:
+            yield child.tail
+
+
+def _lxml_text(el):
+    """lxml equivalent of BeautifulSoup's get_text(strip=True)."""
+    if next(el.iterdescendants(*_LXML_HIDDEN_TAGS), None) is None:
+        return ''.join(text.strip() for text in el.itertext())
+    return ''.join(text.strip() for text in _lxml_strings(el))
+
+
+def _lxml_class_matches(el, pattern):
+    """Match a class regex the way BeautifulSoup's class_= filter does."""
+    classes = el.get('class')
+    return bool(classes) and pattern.search(' '.join(classes.split())) is not None
+
+
+def _lxml_find(el, tag, class_re=None, href_re=None):
+    """Return the first descendant `tag` matching the class/href filters, or None."""
+    for child in el.iterdescendants(tag):
+        if class_re is not None and not _lxml_class_matches(child, class_re):
+            continue
+        if href_re is not None and not href_re.search(child.get('href') or ''):
+            continue
+        return child
+    return None
+
+
+def _extract_badges_lxml(badge_row):
+    """lxml version of _extract_badges; returns the same dictionary."""
+    badges = {}
+    for div in badge_row.iterdescendants('div'):
+        if _lxml_class_matches(div, _BADGE_CLASS_RE):
+            text = _lxml_text(div)
+            field = _badge_field(text)
+            if field:
+                badges[field] = text
+    return badges
+
+
+def _parse_entry_lxml(rows, cells):
+    """lxml version of _parse_entry; returns an identical ApplicantRecord."""
+    if len(cells) < 4:
+        return None
+        
+    primary_row = rows[0]
+    entry = ApplicantRecord()
+    
+    # Cell 0: University name
+    uni_div = _lxml_find(cells[0], 'div', class_re=_UNI_CLASS_RE)
+    university = _lxml_text(uni_div) if uni_div is not None else ""
+    
+    # Cell 1: Program and Degree (in spans)
+    program = ""
+    prog_div = _lxml_find(cells[1], 'div')
+    if prog_div is not None:
+        spans = list(prog_div.iterdescendants('span'))
+        if spans:
+            program = _lxml_text(spans[0])
+            if len(spans) > 1:
+                entry.degree = _lxml_text(spans[1])
+        else:
+            program = _lxml_text(prog_div)
+            
+    if program and university:
+        entry.program = f"{program}, {university}"
+    else:
+        entry.program = program or university
+        
+    # Cell 2: Date added; Cell 3: Status/Decision
+    entry.date_added = _lxml_text(cells[2])
+    status_div = _lxml_find(cells[3], 'div')
+    if status_div is not None:
+        entry.status = _lxml_text(status_div)
+        
+    # Cell 4 (or anywhere in the row): URL link
+    url_link = None
+    if len(cells) > 4:
+        url_link = _lxml_find(cells[4], 'a', href_re=_RESULT_HREF_RE)
+    if url_link is None:
+        url_link = _lxml_find(primary_row, 'a', href_re=_RESULT_HREF_RE)
+    entry.url = f"https://www.thegradcafe.com{url_link.get('href', '')}" if url_link is not None else ""
+    
+    # Additional rows hold badges or comments
+    for row in rows[1:]:
+        comment_p = _lxml_find(row, 'p', class_re=_COMMENT_CLASS_RE)
+        if comment_p is not None:
+            entry.comments = _lxml_text(comment_p)
+        else:
+            for field, text in _extract_badges_lxml(row).items():
+                entry.set(field, text)
+            
+    if entry.comments is None:
+        entry.comments = ''
+    if entry.gre is None:
+        entry.gre = ''
+    if entry.gre_v is None:
+        entry.gre_v = ''
+    if entry.gre_aw is None:
+        entry.gre_aw = ''
+        
+    return entry
+
+
+def _parse_page_lxml(html):
+    """
+    Parse a page of HTML with lxml (libxml2), producing the same entries
+    as _parse_page_bs4 several times faster.
+    
+    Args:
+        html: Raw HTML content
+        
+    Returns:
+        List of ApplicantRecord entries
+    """
+    entries = []
+    if not html or not html.strip():
+        return entries
+        
+    declaration = _XML_DECLARATION_RE.match(html)
+    if declaration:
+        html = html[declaration.end():]
+    doc = lxml.html.fromstring(html)
+    table = next(doc.iter('table'), None)
+    if table is None:
+        return entries
+        
+    tbody = next(table.iterdescendants('tbody'), None)
+    if tbody is None:
+        return entries
+        
+    current_rows = []
+    current_cells = []
+    for row in tbody.iterdescendants('tr'):
+        cells = list(row.iterdescendants('td'))
+        if len(cells) >= 4:
+            if current_rows:
+                entry = _parse_entry_lxml(current_rows, current_cells)
+                if entry:
+                    entries.append(entry)
+            current_rows = [row]
+            current_cells = cells
+        else:
+            current_rows.append(row)
+            
+    if current_rows:
+        entry = _parse_entry_lxml(current_rows, current_cells)
+        if entry:
+            entries.append(entry)
+            
+    return entries
+
+
+# Parser backends by name; lxml is preferred when it is installed
+PARSER_BACKENDS = {'bs4': _parse_page_bs4}
+if lxml is not None:
+    PARSER_BACKENDS['lxml'] = _parse_page_lxml
+DEFAULT_PARSER = 'lxml' if 'lxml' in PARSER_BACKENDS else 'bs4'
+
+
+def _parse_page(html, backend=None):
+    """
+    Parse a page of HTML to extract all admission entries.
+    
+    Args:
+        html: Raw HTML content
+        backend: Parser backend name from PARSER_BACKENDS (default: DEFAULT_PARSER)
+        
+    Returns:
+        List of ApplicantRecord entries
+    """
+    try:
+        parse = PARSER_BACKENDS[backend or DEFAULT_PARSER]
+    except KeyError:
+        raise ValueError(f"Unknown parser backend: {backend!r}") from None
+    return parse(html)
+
+
+def _timed_parse(html, backend=None):
+    """Parse a page, returning (entries, seconds spent parsing)."""
+    started = time.perf_counter()
+    entries = _parse_page(html, backend)
+    return entries, time.perf_counter() - started
+
+
+def _fetch_pages(page_nums, workers=1, **fetch_kwargs):
+    """
+    Fetch pages, yielding (page_num, html) pairs in page order.
+
+    With workers > 1 a thread pool keeps at most `workers` requests in
+    flight; results are handed back in the order of `page_nums` even when
+    later pages finish first. Closing the generator early cancels any
+    requests that have not started yet.
+
+    Args:
+        page_nums: Iterable of page numbers to fetch
+        workers: Maximum number of page requests in flight
+        **fetch_kwargs: Passed through to _fetch_page (limiter, session, cache,
+            breaker, stats)
+
+    Yields:
+        (page_num, html) tuples; html is None when the page failed
+    """
+    if workers <= 1:
+        for page_num in page_nums:
+            yield page_num, _fetch_page(page_num, **fetch_kwargs)
+        return
+
+    pages = iter(page_nums)
+    pending = deque()
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        try:
+            for page_num in itertools.islice(pages, workers):
+                pending.append((page_num, pool.submit(_fetch_page, page_num, **fetch_kwargs)))
+            while pending:
+                page_num, future = pending.popleft()
+                for next_page in itertools.islice(pages, 1):
+                    pending.append((next_page, pool.submit(_fetch_page, next_page, **fetch_kwargs)))
+                yield page_num, future.result()
+        finally:
+            for _, future in pending:
+                future.cancel()
+
+
+def _result_id(url):
+    """Return the numeric Grad Cafe result ID in a URL, or None."""
+    match = _RESULT_ID_RE.search(url or '')
+    return int(match.group(1)) if match else None
+
+
+def load_known_ids(filename):
+    """
+    Load already-known result IDs from an index file.
+
+    Each non-empty line holds a numeric result ID or a full result URL.
+
+    Args:
+        filename: Index file path
+
+    Returns:
+        Set of integer result IDs
+    """
+    known = set()
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if line.isdigit():
+                known.add(int(line))
+            elif line:
+                result_id = _result_id(line)
+                if result_id is not None:
+                    known.add(result_id)
+    return known
+
+
+def _parse_pages(fetched, parser=None, parse_workers=0, stats=None):
+    """
+    Parse fetched pages, yielding (page_num, entries) in page order.
+
+    With parse_workers > 0 each page's HTML is handed to a process pool so
+    parsing runs on other cores while fetching continues. At most
+    2 * parse_workers pages are queued for parsing; once the queue is full
+    the oldest page is waited on before more HTML is accepted, which keeps
+    the amount of raw HTML held in memory bounded.
+
+    Args:
+        fetched: Iterable of (page_num, html) pairs; html may be None
+        parser: Parser backend name (default: DEFAULT_PARSER)
+        parse_workers: Number of parser processes (0 = parse inline)
+        stats: Optional _ScrapeStats recording the parse time per page
+
+    Yields:
+        (page_num, entries) tuples; entries is None when html was None
+    """
+    def finish(page_num, result):
+        if result is None:
+            return page_num, None
+        entries, seconds = result
+        if stats is not None:
+            stats.record_parse(page_num, seconds)
+        return page_num, entries
+
+    if parse_workers <= 0:
+        for page_num, html in fetched:
+            yield finish(page_num, None if html is None else _timed_parse(html, parser))
+        return
+
+    max_pending = 2 * parse_workers
+    pending = deque()
+    # spawn, not fork: the fetch thread pool may be running when workers start
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=parse_workers, mp_context=context) as pool:
+        try:
+            for page_num, html in fetched:
+                future = None if html is None else pool.submit(_timed_parse, html, parser)
+                pending.append((page_num, future))
+                if len(pending) >= max_pending:
+                    page_num, future = pending.popleft()
+                    yield finish(page_num, future.result() if future else None)
+            while pending:
+                page_num, future = pending.popleft()
+                yield finish(page_num, future.result() if future else None)
+        finally:
+            for _, future in pending:
+                if future:
+                    future.cancel()
+
+
+def _scrape_pages(page_nums, workers=1, rate=None, known_ids=None, parser=None,
+                  parse_workers=0, cache=None, failed_out=None, stats_out=None,
+                  progress_every=None):
+    """
+    Fetch and parse pages, yielding (page_num, entries) in page order.
+
+    Prints per-page progress as it goes and a summary (including any
+    failed pages) once every page has been yielded. All fetchers share one
+    circuit breaker for the survey host, so a burst of errors pauses the
+    whole scrape instead of burning through every page's retries.
+
+    Results are listed newest first, so when `known_ids` is given, entries
+    already known are dropped and paging stops at the first page made up
+    entirely of known results; requests still in flight are cancelled.
+
+    Args:
+        page_nums: Range (or list) of page numbers to scrape
+        workers: Maximum number of page requests in flight (1 = sequential)
+        rate: Optional global cap on requests per second across all workers
+        known_ids: Optional set of result IDs that are already stored
+        parser: Parser backend name (default: DEFAULT_PARSER)
+        parse_workers: Parser processes running alongside fetching (0 = inline)
+        cache: Optional _PageCache for raw HTML
+        failed_out: Optional path; failed page numbers are written there,
+            one per line, for a later re-fetch pass (see load_page_list)
+        stats_out: Optional path for the JSON metrics summary (_ScrapeStats)
+        progress_every: Optional interval in seconds for progress lines on stderr
+
+    Yields:
+        (page_num, entries) tuples; entries is None when the page failed
+    """
+    total = 0
+    failed_pages = []
+    limiter = _RateLimiter(rate, burst=workers) if rate else None
+    session = _HTTPSession(max_idle=max(1, workers))
+    breaker = _CircuitBreaker(urllib.parse.urlsplit(BASE_URL).netloc)
+    stats = _ScrapeStats(workers=workers, parse_workers=parse_workers,
+                         progress_every=progress_every)
+    last_page = page_nums[-1] if page_nums else 0
+    fetched = _fetch_pages(page_nums, workers=workers, limiter=limiter, session=session,
+                           cache=cache, breaker=breaker, stats=stats)
+    parsed = _parse_pages(fetched, parser=parser, parse_workers=parse_workers, stats=stats)
+
+    try:
+        for page_num, entries in parsed:
+            print(f"Fetching page {page_num}/{last_page}...", end=" ")
+
+            stats.maybe_report()
+            if entries is None:
+                print("FAILED - skipping")
+                failed_pages.append(page_num)
+                stats.record_entries(page_num, None)
+                yield page_num, None
+                continue
+
+            if known_ids is not None:
+                new_entries = [e for e in entries if _result_id(e.url) not in known_ids]
+                if entries and not new_entries:
+                    print("all results already known - stopping")
+                    stats.record_entries(page_num, 0)
+                    break
+                entries = new_entries
+            total += len(entries)
+            stats.record_entries(page_num, len(entries))
+
+            print(f"Got {len(entries)} entries (total: {total})")
+            yield page_num, entries
+    finally:
+        parsed.close()
+        fetched.close()
+        session.close()
+
+    stats.breaker_trips = breaker.trips
+    summary = stats.summary()
+    print(f"\nScraping complete! Total entries: {total}")
+    print(f"Throughput: {summary['entries_per_s']:.1f} entries/s; "
+          f"fetch p50 {summary['fetch_s']['p50'] * 1000:.0f}ms / "
+          f"p95 {summary['fetch_s']['p95'] * 1000:.0f}ms, "
+          f"parse p50 {summary['parse_s']['p50'] * 1000:.0f}ms; "
+          f"{summary['retries']} retries; bottleneck: {summary['bottleneck']}")
+    if stats_out:
+        stats.write(stats_out)
+    if failed_pages:
+        print(f"Failed pages ({len(failed_pages)}): {', '.join(map(str, failed_pages))}")
+    if failed_out:
+        with open(failed_out, 'w', encoding='utf-8') as f:
+            f.writelines(f"{page_num}\n" for page_num in failed_pages)
+        if failed_pages:
+            print(f"Re-fetch them with: --pages-file {failed_out}")
+
+
+def load_page_list(filename):
+    """
+    Read page numbers from a file with one number per line.
+
+    Used to re-fetch just the pages a previous run failed on (the
+    `failed_out` file); blank lines and '#' comments are ignored.
+
+    Args:
+        filename: Path to the page list
+
+    Returns:
+        Sorted list of unique page numbers
+    """
+    pages = set()
+    with open(filename, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.split('#', 1)[0].strip()
+            if line:
+                pages.add(int(line))
+    return sorted(pages)
+
+
+def _request_rate(rate, delay):
+    """Global requests/second budget: `rate` if given, else one per `delay` seconds."""
+    if rate is None and delay:
+        return 1.0 / delay
+    return rate
+
+
+def scrape_data(num_pages=1500, delay=1.0, start_page=1, workers=1, rate=None,
+                known_ids=None, parser=None, parse_workers=0, cache=None,
+                failed_out=None, page_nums=None, stats_out=None, progress_every=None):
     """
     Scrape admission data from Grad Cafe.
     
     Args:
         num_pages: Number of pages to scrape (default 1500 for ~30,000 entries)
-        delay: Delay between requests in seconds (be respectful)
+        delay: Seconds between requests when `rate` is not given, i.e. a
+            budget of 1/delay requests per second across all workers
+            (0 = no limit)
         start_page: Page to start from (for resuming)
+        workers: Maximum number of page requests in flight (1 = sequential)
+        rate: Optional global cap on requests per second across all workers;
+            overrides `delay`
+        known_ids: Optional set of known result IDs; only new results are
+            returned and paging stops at the first fully known page
+        parser: Parser backend name (default: DEFAULT_PARSER)
+        parse_workers: Parser processes running alongside fetching (0 = inline)
+        cache: Optional _PageCache for raw HTML (see --cache / --from-cache)
+        failed_out: Optional path to write failed page numbers to
+        page_nums: Explicit page numbers to scrape instead of the
+            num_pages/start_page range (e.g. from load_page_list)
+        stats_out: Optional path for the JSON metrics summary
+        progress_every: Optional interval in seconds for progress lines on stderr
         
     Returns:
-        List of applicant dictionaries
+        List of ApplicantRecord entries, in page order
     """
     all_entries = []
     
-    print(f"Starting scrape of {num_pages} pages from page {start_page}...")
+    if page_nums is None:
+        print(f"Starting scrape of {num_pages} pages from page {start_page}...")
+        page_nums = range(start_page, start_page + num_pages)
+    else:
+        print(f"Starting scrape of {len(page_nums)} listed pages...")
     
-    for page_num in range(start_page, start_page + num_pages):
-        print(f"Fetching page {page_num}/{start_page + num_pages - 1}...", end=" ")
-        
-        html = _fetch_page(page_num)
-        
-        if html is None:
-            print("FAILED - skipping")
-            continue
+    for _, entries in _scrape_pages(page_nums, workers=workers,
+                                    rate=_request_rate(rate, delay),
+                                    known_ids=known_ids, parser=parser,
+                                    parse_workers=parse_workers, cache=cache,
+                                    failed_out=failed_out, stats_out=stats_out,
+                                    progress_every=progress_every):
+        if entries:
+            all_entries.extend(entries)
             
-        entries = _parse_page(html)
-        all_entries.extend(entries)
-        
-        print(f"Got {len(entries)} entries (total: {len(all_entries)})")
-        
-        # Rate limiting
-        # if page_num < start_page + num_pages - 1:
-        #     time.sleep(delay)
-            
-    print(f"\nScraping complete! Total entries: {len(all_entries)}")
     return all_entries
 
 
+def _checkpoint_path(filename):
+    """Checkpoint file kept next to a streamed JSONL output."""
+    return f"{filename}.checkpoint"
+
+
+def _read_checkpoint(filename):
+    """Return the checkpoint dict for a streamed output, or None."""
+    try:
+        with open(_checkpoint_path(filename), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def _write_checkpoint(filename, checkpoint):
+    """Atomically replace the checkpoint file."""
+    path = _checkpoint_path(filename)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(checkpoint, f)
+    os.replace(tmp_path, path)
+
+
+def scrape_to_jsonl(filename, num_pages=1500, start_page=None, workers=1, rate=None,
+                    known_ids=None, parser=None, parse_workers=0, cache=None,
+                    failed_out=None, stats_out=None, progress_every=None, delay=1.0):
+    """
+    Scrape pages and stream each page's entries to a JSON Lines file.
+
+    Entries are appended and flushed page by page, so memory stays flat and
+    a crash loses at most the page in progress. After each page a checkpoint
+    (``<filename>.checkpoint``) records the next page and the file size at
+    that point. When `start_page` is None and a checkpoint exists, the run
+    resumes where the previous one stopped, truncating any partially written
+    page first; otherwise the output is started from scratch. The checkpoint
+    is removed once the run finishes (including a `known_ids` early stop),
+    so re-running a finished job starts again from the first page.
+
+    Args:
+        filename: JSONL output path
+        num_pages: Number of pages in the run, counted from its first page
+        start_page: First page to scrape, or None to resume from the checkpoint
+        workers: Maximum number of page requests in flight (1 = sequential)
+        rate: Optional global cap on requests per second across all workers;
+            overrides `delay`
+        known_ids: Optional set of known result IDs (see scrape_data)
+        parser: Parser backend name (default: DEFAULT_PARSER)
+        parse_workers: Parser processes running alongside fetching (0 = inline)
+        cache: Optional _PageCache for raw HTML
+        failed_out: Optional path to write failed page numbers to
+        stats_out: Optional path for the JSON metrics summary
+        progress_every: Optional interval in seconds for progress lines on stderr
+        delay: Seconds between requests when `rate` is not given (see scrape_data)
+
+    Returns:
+        Number of entries written by this call
+    """
+    checkpoint = None
+    if start_page is None and os.path.exists(filename):
+        checkpoint = _read_checkpoint(filename)
+    if checkpoint:
+        first_page = checkpoint['start_page']
+        next_page = checkpoint['next_page']
+        with open(filename, 'a', encoding='utf-8') as f:
+            f.truncate(checkpoint['offset'])
+        print(f"Resuming {filename} from page {next_page}...")
+    else:
+        first_page = next_page = start_page or 1
+        open(filename, 'w', encoding='utf-8').close()
+
+    page_nums = range(next_page, first_page + num_pages)
+    print(f"Starting scrape of {len(page_nums)} pages from page {next_page}...")
+
+    written = 0
+    with open(filename, 'a', encoding='utf-8') as f:
+        for page_num, entries in _scrape_pages(page_nums, workers=workers,
+                                               rate=_request_rate(rate, delay),
+                                               known_ids=known_ids, parser=parser,
+                                               parse_workers=parse_workers, cache=cache,
+                                               failed_out=failed_out, stats_out=stats_out,
+                                               progress_every=progress_every):
+            for entry in entries or ():
+                f.write(json.dumps(entry.to_dict(), ensure_ascii=False))
+                f.write('\n')
+            written += len(entries or ())
+            f.flush()
+            os.fsync(f.fileno())
+            _write_checkpoint(filename, {
+                'start_page': first_page,
+                'next_page': page_num + 1,
+                'offset': f.tell(),
+            })
+
+    try:
+        os.remove(_checkpoint_path(filename))
+    except FileNotFoundError:
+        pass
+    print(f"Streamed {written} entries to {filename}")
+    return written
+
+
 def save_data(data, filename="applicant_data.json"):
     """
     Save data to a JSON file.
     
     Args:
-        data: List of applicant dictionaries
+        data: List of ApplicantRecord entries (or applicant dictionaries)
         filename: Output filename
     """
     with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(data, f, indent=2, ensure_ascii=False)
+        json.dump([as_dict(entry) for entry in data], f, indent=2, ensure_ascii=False)
     print(f"Saved {len(data)} entries to {filename}")
 
 
 def load_data(filename="applicant_data.json"):
     """
-    Load data from a JSON file.
+    Load data from a JSON array file or a JSON Lines stream.
     
     Args:
         filename: Input filename
@@ -321,28 +1463,79 @@ def load_data(filename="applicant_data.json"):
     Returns:
         List of applicant dictionaries
     """
-    with open(filename, 'r', encoding='utf-8') as f:
-        return json.load(f)
+    return list(iter_records(filename))
 
 
-if __name__ == "__main__":
+if __name__ == "__main__":  # pragma: no cover
     import argparse
     
     parser = argparse.ArgumentParser(description="Scrape Grad Cafe admission results")
     parser.add_argument('--pages', type=int, default=1500, 
                         help='Number of pages to scrape (default: 1500)')
-    parser.add_argument('--start', type=int, default=1,
-                        help='Starting page number (default: 1)')
+    parser.add_argument('--start', type=int, default=None,
+                        help='Starting page number (default: 1, or resume '
+                             'from the checkpoint with --stream)')
     parser.add_argument('--delay', type=float, default=1.0,
-                        help='Delay between requests in seconds (default: 1.0)')
+                        help='Seconds between requests, shared by all workers, unless '
+                             '--rate is given; 0 disables the limit (default: 1.0)')
     parser.add_argument('--output', type=str, default='applicant_data.json',
                         help='Output filename (default: applicant_data.json)')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Maximum concurrent page requests (default: 1)')
+    parser.add_argument('--rate', type=float, default=None,
+                        help='Global request budget in requests/second; overrides '
+                             '--delay (default: 1/--delay)')
+    parser.add_argument('--stream', action='store_true',
+                        help='Append each page to --output as JSON Lines with a '
+                             'resumable checkpoint instead of one JSON array')
+    parser.add_argument('--known-ids', type=str, default=None,
+                        help='Index file of already-stored result IDs/URLs; only new '
+                             'results are kept and paging stops at the first known page')
+    parser.add_argument('--parser', choices=sorted(PARSER_BACKENDS), default=DEFAULT_PARSER,
+                        help=f'HTML parser backend (default: {DEFAULT_PARSER})')
+    parser.add_argument('--parse-workers', type=int, default=0,
+                        help='Parse pages in this many processes while fetching '
+                             'continues (default: 0, parse inline)')
+    parser.add_argument('--cache', type=str, default=None,
+                        help='Directory for the raw HTML page cache (default: no cache)')
+    parser.add_argument('--cache-ttl', type=float, default=3600,
+                        help='Seconds before a cached page is revalidated (default: 3600)')
+    parser.add_argument('--from-cache', action='store_true',
+                        help='Re-parse cached pages offline without any network requests')
+    parser.add_argument('--failed-out', type=str, default=None,
+                        help='Write the page numbers that failed to this file, one per line')
+    parser.add_argument('--pages-file', type=str, default=None,
+                        help='Scrape only the pages listed in this file (e.g. a previous '
+                             '--failed-out list) instead of --start/--pages')
+    parser.add_argument('--stats-out', type=str, default=None,
+                        help='Write per-page fetch/parse timings and throughput as JSON')
+    parser.add_argument('--progress', type=float, default=None, metavar='SECONDS',
+                        help='Print a progress line to stderr every SECONDS')
     
     args = parser.parse_args()
+    known = load_known_ids(args.known_ids) if args.known_ids else None
+    if args.from_cache and not args.cache:
+        parser.error('--from-cache requires --cache DIR')
+    cache = _PageCache(args.cache, ttl=args.cache_ttl, offline=args.from_cache) if args.cache else None
+    if args.pages_file and args.stream:
+        parser.error('--pages-file cannot be combined with --stream')
     
-    # Scrape the data
-    data = scrape_data(num_pages=args.pages, delay=args.delay, start_page=args.start)
-    
-    # Save to file
-    if data:
+    if args.stream:
+        scrape_to_jsonl(args.output, num_pages=args.pages, start_page=args.start,
+                        workers=args.workers, rate=args.rate, known_ids=known,
+                        parser=args.parser, parse_workers=args.parse_workers,
+                        cache=cache, failed_out=args.failed_out,
+                        stats_out=args.stats_out, progress_every=args.progress,
+                        delay=args.delay)
+    else:
+        # Scrape the data
+        data = scrape_data(num_pages=args.pages, delay=args.delay,
+                           start_page=args.start or 1,
+                           workers=args.workers, rate=args.rate, known_ids=known,
+                           parser=args.parser, parse_workers=args.parse_workers,
+                           cache=cache, failed_out=args.failed_out,
+                           stats_out=args.stats_out, progress_every=args.progress,
+                           page_nums=load_page_list(args.pages_file) if args.pages_file else None)
+        
+        # Save to file (even when empty, so later stages never see stale data)
         save_data(data, args.output)
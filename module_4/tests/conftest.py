@@ -1,5 +1,6 @@
 """Pytest fixtures for Grad Cafe tests."""
 
+import json
 import os
 import sys
 
@@ -11,6 +12,13 @@ _src_dir = os.path.join(_module_dir, 'src')
 if _src_dir not in sys.path:
     sys.path.insert(0, _module_dir)
 
+# The LLM standardizer reads its canonical lists at import time
+_llm_dir = os.path.join(_src_dir, 'module_2', 'llm_hosting')
+os.environ.setdefault('CANON_UNIS_PATH', os.path.join(_llm_dir, 'canon_universities.txt'))
+os.environ.setdefault('CANON_PROGS_PATH', os.path.join(_llm_dir, 'canon_programs.txt'))
+# ... and keeps no persistent result cache unless a test opens one
+os.environ.setdefault('LLM_CACHE_PATH', '')
+
 from src.flask_app import create_app
 
 
@@ -112,3 +120,78 @@ def db_backend(monkeypatch, request):
         
         return {'type': 'mock', 'connect_mock': mock_connect, 'conn': mock_conn, 'cur': mock_cur}
 
+
+
+@pytest.fixture
+def survey_page_html():
+    """Saved Grad Cafe survey page used by the scraper/parser tests."""
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'survey_page.html')
+    with open(path, 'r', encoding='utf-8') as f:
+        return f.read()
+
+
+class FakeLlama:
+    """
+    Stand-in for llama_cpp.Llama in the standardizer tests.
+
+    Prompts are tokenized one byte per token and, like llama.cpp, only the
+    tokens after the longest common prefix with the current context are
+    counted as evaluated. Replies split the program on its last comma
+    unless `replies` has a canned answer.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.kwargs = kwargs
+        self.input_ids = []
+        self.evaluated = 0
+        self.loads = 0
+        self.prompts = []
+        self.replies = {}
+
+    def tokenize(self, text):
+        return list(text.encode('utf-8'))
+
+    def _render(self, messages):
+        return ''.join(f"<|{m['role']}|>\n{m['content']}</s>\n" for m in messages) + '<|assistant|>\n'
+
+    def create_chat_completion(self, messages, **kwargs):
+        tokens = self.tokenize(self._render(messages))
+        common = 0
+        for a, b in zip(self.input_ids, tokens[:-1]):
+            if a != b:
+                break
+            common += 1
+        self.evaluated += len(tokens) - common
+        program = json.loads(messages[-1]['content'])['program']
+        reply = self.replies.get(program)
+        if reply is None:
+            prog, sep, uni = program.rpartition(', ')
+            reply = json.dumps({'standardized_program': prog if sep else program,
+                                'standardized_university': uni if sep else 'Unknown'})
+        self.input_ids = tokens + self.tokenize(reply)
+        self.prompts.append(program)
+        return {'choices': [{'message': {'content': reply}}]}
+
+    @property
+    def n_tokens(self):
+        return len(self.input_ids)
+
+    def save_state(self):
+        return list(self.input_ids)
+
+    def load_state(self, state):
+        self.loads += 1
+        self.input_ids = list(state)
+
+
+@pytest.fixture
+def fake_llm(monkeypatch):
+    """Install a FakeLlama as the standardizer's model, with a cold LLM cache."""
+    from src.module_2.llm_hosting import app as llm_app
+    llm = FakeLlama()
+    monkeypatch.setattr(llm_app, '_LLM', llm)
+    monkeypatch.setattr(llm_app, '_PREFIX_STATE', None)
+    monkeypatch.setattr(llm_app, '_PREFIX_IDS', [])
+    llm_app._call_llm_cached.cache_clear()
+    yield llm
+    llm_app._call_llm_cached.cache_clear()
@@ -0,0 +1,64 @@
+"""Tests for the shared record type (module_2/applicant_record.py)."""
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from src.module_2.applicant_record import ApplicantRecord, as_dict
+
+MODULE_2 = Path(__file__).resolve().parents[1] / 'src' / 'module_2'
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('name', [
+    'applicant_data.json', 'cleaned_applicant_data.json', 'llm_extend_applicant_data.json',
+])
+def test_round_trip_is_lossless_on_bundled_data(name):
+    rows = json.loads((MODULE_2 / name).read_text(encoding='utf-8'))
+    for row in rows:
+        record = ApplicantRecord.from_dict(row)
+        assert record.to_dict() == row
+        assert ApplicantRecord.coerce(record) is record
+        assert as_dict(record) == row
+        assert as_dict(row) is row
+
+
+@pytest.mark.etl
+def test_unknown_keys_and_nulls_are_kept():
+    row = {'program': 'Physics', 'GPA': None, 'source': 'manual', 'Degree': 'PhD'}
+    record = ApplicantRecord.from_dict(row)
+    assert record.gpa is None
+    assert record.extra == {'GPA': None, 'source': 'manual'}
+    assert record.to_dict() == row
+    assert record.get('source') == 'manual'
+    assert record.get('GPA', 'n/a') == 'n/a'
+    assert record.get('nope') is None
+
+
+@pytest.mark.etl
+def test_dictionary_style_access():
+    record = ApplicantRecord(program='Math', us_international='American')
+    assert record['US/International'] == 'American'
+    with pytest.raises(KeyError):
+        record['GRE']
+    record.set('GRE_V', 'GRE V 160')
+    record.set('note', 'x')
+    assert record.gre_v == 'GRE V 160'
+    assert record.to_dict() == {'program': 'Math', 'US/International': 'American',
+                                'GRE_V': 'GRE V 160', 'note': 'x'}
+    assert not hasattr(record, '__dict__')
+
+
+@pytest.mark.etl
+def test_equality_repr_and_pickle():
+    record = ApplicantRecord(program='Math', url='https://www.thegradcafe.com/result/1')
+    assert record == ApplicantRecord.from_dict(record.to_dict())
+    assert record != ApplicantRecord(program='Math')
+    assert record != record.to_dict()
+    assert ApplicantRecord(extra={}) == ApplicantRecord()
+    assert repr(record).startswith("ApplicantRecord({'program': 'Math'")
+    assert pickle.loads(pickle.dumps(record)) == record
+    with pytest.raises(TypeError):
+        hash(record)
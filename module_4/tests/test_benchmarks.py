@@ -0,0 +1,347 @@
+"""
+Micro-benchmarks for the pipeline hot paths.
+
+Each benchmark checks that the optimized path produces the same output as
+the reference path and prints the timings (run with ``-s`` to see them).
+Timing ratios are reported, not asserted, so the suite stays stable on
+slow or shared CI machines.
+"""
+
+import difflib
+import json
+import os
+import re
+import time
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.module_2 import clean, scrape
+from src.module_2.applicant_record import ApplicantRecord
+
+
+def _best_of(fn, repeat=5):
+    """Best wall-clock time of `repeat` calls to fn()."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+APPLICANT_DATA = Path(__file__).resolve().parents[1] / 'src' / 'module_2' / 'applicant_data.json'
+
+
+def _big_page(html, copies=20):
+    """Repeat the fixture's result rows to get a realistically sized page."""
+    match = re.search(r'(<tbody[^>]*>)(.*)(</tbody>)', html, re.DOTALL)
+    rows = match.group(2)
+    return html[:match.start(2)] + rows * copies + html[match.end(2):]
+
+
+@pytest.mark.etl
+def test_benchmark_parser_backends(survey_page_html):
+    page = _big_page(survey_page_html)
+    expected = scrape._parse_page(page, 'bs4')
+    assert scrape._parse_page(page, 'lxml') == expected
+
+    timings = {name: _best_of(lambda name=name: scrape._parse_page(page, name))
+               for name in sorted(scrape.PARSER_BACKENDS)}
+    per_entry = {name: t / len(expected) * 1e6 for name, t in timings.items()}
+    print(f"\nparse {len(expected)} entries: " + ", ".join(
+        f"{name} {t * 1000:.1f} ms ({per_entry[name]:.0f} us/entry)"
+        for name, t in timings.items()))
+    print(f"lxml speedup over bs4: {timings['bs4'] / timings['lxml']:.1f}x")
+
+
+def _badge_field_chain(text):
+    """The original one-regex-per-check badge classifier, kept as reference."""
+    if not text:
+        return None
+    if re.match(r'^(Fall|Spring|Summer|Winter)\s+\d{4}$', text, re.IGNORECASE):
+        return 'term'
+    elif text in ['American', 'International']:
+        return 'US/International'
+    elif text.startswith('GPA'):
+        return 'GPA'
+    elif re.match(r'^GRE\s*V\s*\d+', text, re.IGNORECASE):
+        return 'GRE_V'
+    elif re.match(r'^GRE\s*(AW|A)\s*[\d.]+', text, re.IGNORECASE):
+        return 'GRE_AW'
+    elif re.match(r'^GRE\s*\d+', text, re.IGNORECASE):
+        return 'GRE'
+    return None
+
+
+_BADGE_TEXTS = [
+    '', 'Fall 2026', 'spring 2025', 'SUMMER  2024', 'Winter\n2023', 'Fall 2026\n', 'Fall 26',
+    'Fall 2026 ', 'Autumn 2026', 'American', 'International', 'american', 'American\n',
+    'Americans', 'GPA 3.89', 'GPA', 'gpa 3.2', 'GPA3.9', 'GRE 325', 'gre 310', 'GRE325',
+    'GRE V 161', 'GRE V161', 'gre v 150', 'GRE Verbal 160', 'GRE AW 4.5', 'GRE A 3.5',
+    'GRE AW.5', 'gre aw 4', 'GRE AW', 'GRE Q 170', 'GRE', 'GRE V', 'Rolling', 'Masters',
+    'Interview on 29 Jan', 'GREAT 5', 'GRE  V  99', 'GRE\tAW\t6.0',
+]
+
+
+@pytest.mark.etl
+def test_benchmark_badge_dispatcher():
+    for text in _BADGE_TEXTS:
+        assert scrape._badge_field(text) == _badge_field_chain(text), text
+
+    corpus = _BADGE_TEXTS * 200
+    chain = _best_of(lambda: [_badge_field_chain(t) for t in corpus])
+    single = _best_of(lambda: [scrape._badge_field(t) for t in corpus])
+    print(f"\nclassify {len(corpus)} badges: chain {chain * 1000:.1f} ms, "
+          f"single-pass {single * 1000:.1f} ms ({chain / single:.1f}x)")
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('backend', sorted(scrape.PARSER_BACKENDS))
+def test_benchmark_per_entry_parse_cost(survey_page_html, backend):
+    page = _big_page(survey_page_html)
+    entries = scrape._parse_page(page, backend)
+    elapsed = _best_of(lambda: scrape._parse_page(page, backend))
+    print(f"\n{backend}: {elapsed / len(entries) * 1e6:.0f} us per entry "
+          f"({len(entries)} entries)")
+
+
+@pytest.mark.etl
+def test_benchmark_clean_workers_scaling():
+    raw = [{
+        'program': f'  <b>Computer   Science</b>,  University {i} ',
+        'comments': '<p>Got the   email\n today.</p> ' * 4,
+        'date_added': ' January 1, 2026 ',
+        'status': ' Accepted on 1 Jan ',
+        'term': ' Fall 2026 ',
+        'Degree': ' PhD ',
+    } for i in range(40000)]
+    expected = clean.clean_data(raw)
+
+    timings = {}
+    for workers in (1, 2, 4, 8):
+        start = time.perf_counter()
+        result = clean.clean_data(raw, workers=workers, chunk_size=2000)
+        timings[workers] = time.perf_counter() - start
+        assert result == expected
+    print(f"\nclean {len(raw)} records: " + ", ".join(
+        f"{w} worker(s) {t * 1000:.0f} ms ({timings[1] / t:.2f}x)"
+        for w, t in timings.items()))
+
+
+def _clean_text_subs(text):
+    """The original cleaner: both substitutions on every value."""
+    if not text:
+        return ""
+    text = re.sub(r'<[^>]+>', '', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+@pytest.mark.etl
+def test_benchmark_clean_text_fast_path():
+    records = json.loads(APPLICANT_DATA.read_text(encoding='utf-8'))
+    texts = [value for record in records for value in record.values()
+             if isinstance(value, str)] * 20
+    assert [clean._clean_text(t) for t in texts] == [_clean_text_subs(t) for t in texts]
+
+    fast = _best_of(lambda: [clean._clean_text(t) for t in texts])
+    subs = _best_of(lambda: [_clean_text_subs(t) for t in texts])
+    print(f"\nclean {len(texts)} values from applicant_data.json: "
+          f"fast path {fast * 1000:.1f} ms, two re.sub {subs * 1000:.1f} ms "
+          f"({subs / fast:.1f}x)")
+
+
+def _traced_size(build):
+    """Bytes still allocated by the object build() returns."""
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        obj = build()
+        return tracemalloc.get_traced_memory()[0] - before, obj
+    finally:
+        tracemalloc.stop()
+
+
+@pytest.mark.etl
+def test_benchmark_record_memory_and_clean():
+    rows = json.loads(APPLICANT_DATA.read_text(encoding='utf-8')) * 50
+    dict_bytes, dicts = _traced_size(lambda: [dict(r) for r in rows])
+    record_bytes, records = _traced_size(lambda: [ApplicantRecord.from_dict(r) for r in rows])
+    assert [r.to_dict() for r in records] == dicts
+
+    # The rows repeat, so keep duplicates to time cleaning every one of them
+    cleaned = clean.clean_data(records, dedupe=False)
+    assert [r.to_dict() for r in cleaned] == \
+        [r.to_dict() for r in clean.clean_data(rows, dedupe=False)]
+    from_records = _best_of(lambda: clean.clean_data(records, dedupe=False))
+    from_dicts = _best_of(lambda: clean.clean_data(rows, dedupe=False))
+    print(f"\n{len(rows)} rows: dicts {dict_bytes / len(rows):.0f} B/row, "
+          f"records {record_bytes / len(rows):.0f} B/row "
+          f"({dict_bytes / record_bytes:.1f}x smaller); clean from records "
+          f"{from_records * 1000:.0f} ms vs from dicts {from_dicts * 1000:.0f} ms")
+
+
+def _tokens_per_request(llm, texts, evict):
+    """Average prompt tokens evaluated per _complete call, plus the replies."""
+    from src.module_2.llm_hosting import app as llm_app
+    start = llm.evaluated
+    replies = []
+    for text in texts:
+        if evict:
+            llm.input_ids = []
+        llm_app._restore_prefix(llm)
+        replies.append(llm_app._complete(llm, text))
+    return (llm.evaluated - start) / len(texts), replies
+
+
+@pytest.mark.etl
+def test_benchmark_prefix_state_tokens_per_request(monkeypatch):
+    from src.module_2.llm_hosting import app as llm_app
+    from tests.conftest import FakeLlama
+
+    rows = json.loads(APPLICANT_DATA.read_text(encoding='utf-8'))
+    texts = sorted({row['program'] for row in rows})[:200]
+
+    monkeypatch.setattr(llm_app, '_PREFIX_STATE', None)
+    monkeypatch.setattr(llm_app, '_PREFIX_IDS', [])
+    cold, expected = _tokens_per_request(FakeLlama(), texts, evict=True)
+
+    llm = FakeLlama()
+    llm_app._warm_prefix(llm)
+    restored, replies = _tokens_per_request(llm, texts, evict=True)
+    assert replies == expected
+    assert llm.loads == len(texts)
+    steady, replies = _tokens_per_request(llm, texts, evict=False)
+    assert replies == expected
+    assert llm.loads == len(texts)  # the cache never drifts back to back
+
+    print(f"\nprompt tokens evaluated per request ({len(texts)} requests): "
+          f"no saved prefix {cold:.0f}, restored prefix state {restored:.0f}, "
+          f"back-to-back {steady:.0f}")
+    print(f"prefix is {len(llm_app._PREFIX_IDS)} of {cold:.0f} tokens; "
+          f"{cold / restored:.1f}x fewer tokens per request")
+
+
+@pytest.mark.etl
+@pytest.mark.skipif(not os.getenv('LLM_BENCH'),
+                    reason='set LLM_BENCH=1 to download and run the real model')
+def test_benchmark_llm_pool_splits(monkeypatch):
+    from src.module_2.llm_hosting import app as llm_app
+
+    cores = int(os.getenv('LLM_BENCH_CORES', str(os.cpu_count() or 1)))
+    rows = json.loads(APPLICANT_DATA.read_text(encoding='utf-8'))
+    texts = sorted({row['program'] for row in rows})[:int(os.getenv('LLM_BENCH_ROWS', '48'))]
+    monkeypatch.setattr(llm_app, 'N_THREADS', cores)
+
+    timings, expected = {}, None
+    for workers, threads in llm_app._pool_splits(cores):
+        start = time.perf_counter()
+        result = llm_app._standardize_llm_pool(texts, workers)
+        timings[(workers, threads)] = time.perf_counter() - start
+        expected = expected or result
+        assert result == expected
+
+    print(f"\nLLM throughput on {cores} cores, {len(texts)} strings (incl. model load): "
+          + ", ".join(f"{w}x{t} threads {len(texts) / s:.2f} rows/s"
+                      for (w, t), s in timings.items()))
+    best = min(timings, key=timings.get)
+    print(f"best split: LLM_WORKERS={best[0]} with N_THREADS={cores}")
+
+
+@pytest.mark.etl
+def test_benchmark_fuzzy_index_vs_difflib():
+    from src.module_2.llm_hosting import app as llm_app
+
+    rows = json.loads((APPLICANT_DATA.parent / 'cleaned_applicant_data.json').read_text(encoding='utf-8'))
+    queries = []
+    for row in rows:
+        prog, uni = llm_app._smart_split(row['program'])
+        queries += [(prog, llm_app.CANON_PROGS, llm_app.CANON_PROG_INDEX, 0.78),
+                    (uni, llm_app.CANON_UNIS, llm_app.CANON_UNI_INDEX, 0.80),
+                    (uni, llm_app.CANON_UNIS, llm_app.CANON_UNI_INDEX, 0.88)]
+
+    def reference():
+        return [(difflib.get_close_matches(name, canon, n=1, cutoff=cutoff) or [None])[0]
+                for name, canon, _, cutoff in queries]
+
+    def indexed():
+        return [index.best(name, cutoff) for name, _, index, cutoff in queries]
+
+    assert indexed() == reference()
+    slow = _best_of(reference, repeat=3)
+    fast = _best_of(indexed, repeat=3)
+    print(f"\n{len(queries)} canon lookups: difflib {slow * 1000:.0f} ms, "
+          f"index {fast * 1000:.1f} ms ({slow / fast:.1f}x)")
+
+
+def _normalize_words_reference(text, words):
+    """The original small-word loop: one re.sub per word."""
+    for word in words:
+        text = re.sub(rf"\b{word}\b", word.lower(), text)
+    return text
+
+
+def _rule_parse_reference(text):
+    """The original rule-based path: regex loops and list scans on every row."""
+    from src.module_2.llm_hosting import app as llm_app
+
+    if not text or not text.strip():
+        return ('Unknown', 'Unknown')
+    prog_raw, uni_raw = llm_app._smart_split(text)
+    if not uni_raw:
+        return None
+
+    p = llm_app.COMMON_PROG_FIXES.get(prog_raw.strip(), prog_raw.strip())
+    p = re.sub(r"\s*\([A-Z]{2,}\)\s*$", "", p)
+    p = re.sub(r"^(department|dept\.?)\s+of\s+", "", p, flags=re.IGNORECASE)
+    p = _normalize_words_reference(p.strip().strip(",").strip().title(),
+                                   ["And", "Of", "In", "For", "The", "With", "To"])
+    if p:
+        p = p[0].upper() + p[1:]
+    if p not in llm_app.CANON_PROGS:
+        p = llm_app._best_match(p, llm_app.CANON_PROG_INDEX, cutoff=0.78) or p
+
+    u = uni_raw.strip()
+    for pat, full in llm_app.ABBREV_UNI.items():
+        if re.fullmatch(pat, u):
+            u = full
+            break
+    u = llm_app.COMMON_UNI_FIXES.get(u, u)
+    u = re.sub(r"\s*\([A-Z]{2,}\)\s*$", "", u).strip()
+    if u:
+        u = _normalize_words_reference(u.title(), ["Of", "And", "In", "For", "The",
+                                                   "At", "De", "Du", "Des"])
+        u = u[0].upper() + u[1:]
+    if u not in llm_app.CANON_UNIS:
+        u = llm_app._best_match(u, llm_app.CANON_UNI_INDEX, cutoff=0.80) or u or 'Unknown'
+
+    if u != 'Unknown' and p:
+        return (p, u)
+    if u and u in llm_app.CANON_UNIS:
+        return (p, u)
+    return None
+
+
+@pytest.mark.etl
+def test_benchmark_rule_based_normalization():
+    from src.module_2.llm_hosting import app as llm_app
+
+    rows = json.loads((APPLICANT_DATA.parent / 'cleaned_applicant_data.json').read_text(encoding='utf-8'))
+    texts = [row['program'] for row in rows] * 10
+
+    def cold():
+        for fn in (llm_app._try_rule_based_parse, llm_app._post_normalize_program,
+                   llm_app._post_normalize_university):
+            fn.cache_clear()
+        return [llm_app._try_rule_based_parse(t) for t in texts]
+
+    assert cold() == [_rule_parse_reference(t) for t in texts]
+    reference = _best_of(lambda: [_rule_parse_reference(t) for t in texts], repeat=3)
+    compiled = _best_of(cold, repeat=3)
+    memoized = _best_of(lambda: [llm_app._try_rule_based_parse(t) for t in texts], repeat=3)
+    print(f"\nrule-based parse of {len(texts)} rows ({len(set(texts))} distinct): "
+          f"reference {reference * 1000:.0f} ms, compiled + memo from cold "
+          f"{compiled * 1000:.0f} ms, warm memo {memoized * 1000:.2f} ms "
+          f"({reference / memoized:.0f}x)")
@@ -0,0 +1,232 @@
+"""Tests for the data cleaning stage (module_2/clean.py)."""
+
+import io
+import json
+import re
+import tracemalloc
+
+import pytest
+
+from src.module_2 import clean
+
+
+@pytest.mark.etl
+def test_clean_text():
+    assert clean._clean_text(None) == ''
+    assert clean._clean_text('  <b>Computer</b>\n  Science ') == 'Computer Science'
+
+
+def _clean_text_reference(text):
+    """The original two-substitution cleaner."""
+    if not text:
+        return ''
+    return re.sub(r'\s+', ' ', re.sub(r'<[^>]+>', '', text)).strip()
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text', [
+    'Computer Science', 'a  b', ' a', 'a ', 'a\tb', 'a\nb', 'a\n', 'a\xa0b',
+    'a<br>b', 'a <b> c', '<p>x</p>', '1 < 2', 'a > b', '<>', 'x\u2003y', 'a \x1c',
+])
+def test_clean_text_fast_path_matches_reference(text):
+    assert clean._clean_text(text) == _clean_text_reference(text)
+    clean_text = _clean_text_reference(text)
+    assert clean._clean_text(clean_text) is clean_text
+
+
+@pytest.mark.etl
+def test_clean_data_normalizes_fields():
+    raw = [
+        None,
+        {
+            'program': ' Computer  Science, MIT ',
+            'comments': '<p>Great</p>',
+            'date_added': 'January 1, 2026 ',
+            'url': 'https://www.thegradcafe.com/result/1',
+            'status': 'Accepted on 1 Jan',
+            'term': ' Fall 2026',
+            'US/International': 'American',
+            'Degree': 'PhD ',
+            'GPA': 'GPA 3.9',
+            'GRE': 'GRE 330',
+            'GRE_V': 'GRE V 165',
+            'GRE_AW': 'GRE AW 5.0',
+        },
+        {'program': 'Physics'},
+    ]
+    cleaned = clean.clean_data(raw)
+    assert len(cleaned) == 2
+    assert cleaned[0]['program'] == 'Computer Science, MIT'
+    assert cleaned[0]['comments'] == 'Great'
+    assert cleaned[0]['term'] == 'Fall 2026'
+    assert cleaned[0]['Degree'] == 'PhD'
+    assert cleaned[0]['GRE_AW'] == 'GRE AW 5.0'
+    assert cleaned[1].to_dict() == {
+        'program': 'Physics', 'comments': '', 'date_added': '', 'url': '',
+        'status': '', 'term': '', 'US/International': '', 'Degree': '',
+        'GPA': '', 'GRE': '', 'GRE_V': '', 'GRE_AW': '',
+    }
+
+
+@pytest.mark.etl
+def test_save_and_load_json_and_jsonl(tmp_path):
+    records = [{'program': 'Mathematics'}, {'program': 'Physics'}]
+    json_path = tmp_path / 'cleaned.json'
+    clean.save_data(records, str(json_path))
+    assert clean.load_data(str(json_path)) == records
+
+    jsonl_path = tmp_path / 'raw.jsonl'
+    jsonl_path.write_text('\n'.join(json.dumps(r) for r in records) + '\n\n', encoding='utf-8')
+    assert clean.load_data(str(jsonl_path)) == records
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text, expected', [
+    ('[{"a": 1}]', True),
+    (' ' * 100 + '\n[]', True),
+    ('{"a": 1}\n', False),
+    (' ' * 100, False),
+    ('', False),
+])
+def test_is_json_array_skips_leading_whitespace_and_rewinds(text, expected):
+    f = io.StringIO(text)
+    assert clean.is_json_array(f) is expected
+    assert f.read() == text
+
+
+@pytest.mark.etl
+def test_clean_data_workers_preserve_order():
+    raw = [{'program': f' P{i} '} if i % 7 else None for i in range(250)]
+    expected = clean.clean_data(raw)
+    assert clean._clean_chunk(raw) == expected
+    assert clean.clean_data(raw, workers=2, chunk_size=16) == expected
+    # Streaming input with more chunks than the in-flight window
+    stream = clean.iter_clean_data(iter(raw), workers=2, chunk_size=5)
+    assert list(stream) == expected
+    assert clean.clean_data([], workers=2) == []
+
+
+@pytest.mark.etl
+def test_iter_clean_data_workers_close_early():
+    stream = clean.iter_clean_data(({'program': str(i)} for i in range(100)),
+                                   workers=2, chunk_size=3)
+    assert next(stream)['program'] == '0'
+    stream.close()
+
+
+@pytest.mark.etl
+def test_iter_clean_data_is_lazy():
+    def raw():
+        yield {'program': ' A '}
+        raise AssertionError('read past the first record')
+
+    assert next(clean.iter_clean_data(raw()))['program'] == 'A'
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('chunk_size', [1, 3, 7, 1 << 16])
+def test_iter_json_array_matches_json_load(chunk_size):
+    values = [{'program': 'Math, "MIT"', 'n': 12345}, 67890, [], {}, 'x]', None, 1.5e3, 2]
+    text = ' \n[ ' + ' ,\n '.join(json.dumps(v) for v in values) + ' ]\n'
+    assert list(clean._iter_json_array(io.StringIO(text), chunk_size)) == values
+    assert list(clean._iter_json_array(io.StringIO('[]'), chunk_size)) == []
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text', [
+    '{"a": 1}', '[{"a": 1}, ', '[{"a": 1', '[{"a": }]', '[{}x]', '   ',
+    # Separators and trailing data that json.load rejects too
+    '[1 2]', '[1,,2]', '[1,]', '[,1]', '[,]', '[1]x', '[1]      x', '[1]\n\n]', '[] []',
+])
+def test_iter_json_array_rejects_bad_input(text):
+    with pytest.raises(ValueError):
+        list(clean._iter_json_array(io.StringIO(text), chunk_size=4))
+
+
+@pytest.mark.etl
+def test_stream_clean_json_array_to_jsonl(tmp_path):
+    raw = [{'program': f' Program <b>{i}</b> ', 'comments': 'x' * 200} for i in range(20000)]
+    src = tmp_path / 'raw.json'
+    clean.save_data(raw, str(src))
+    out = tmp_path / 'cleaned.jsonl'
+
+    tracemalloc.start()
+    try:
+        count = clean.save_jsonl(clean.iter_clean_data(clean.iter_records(str(src))), str(out))
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert count == 20000
+    # Flat memory: far below the size of the input file
+    assert peak < src.stat().st_size / 4
+    assert clean.load_data(str(out)) == [r.to_dict() for r in clean.clean_data(raw)]
+
+    jsonl_src = tmp_path / 'raw.jsonl'
+    clean.save_jsonl(raw[:3] + [{}], str(jsonl_src))
+    assert list(clean.iter_records(str(jsonl_src))) == raw[:3] + [{}]
+    assert len(list(clean.iter_clean_data(clean.iter_records(str(jsonl_src))))) == 3
+
+
+def _result(result_id, program='Physics'):
+    return {'program': program, 'url': f'https://www.thegradcafe.com/result/{result_id}'}
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('workers', [1, 2])
+def test_clean_data_drops_duplicate_urls_first_wins(workers):
+    raw = [
+        _result(5, 'Physics, MIT'), _result(7), {'program': 'No URL'},
+        _result(5, 'Physics, Stale copy'), {'program': 'No URL'}, None,
+        {'program': 'Custom', 'url': 'https://example.com/x'},
+        {'program': 'Custom again', 'url': 'https://example.com/x'}, _result(7),
+    ]
+    duplicates = clean.DuplicateFilter()
+    cleaned = clean.clean_data(raw, workers=workers, chunk_size=2, dedupe=duplicates)
+    assert [r.program for r in cleaned] == ['Physics, MIT', 'Physics', 'No URL', 'No URL', 'Custom']
+    assert duplicates.dropped == 3
+    assert len(clean.clean_data(raw)) == 5
+    assert len(clean.clean_data(raw, dedupe=False)) == 8
+
+
+@pytest.mark.etl
+def test_duplicate_filter_bitmap_and_fallback():
+    duplicates = clean.DuplicateFilter()
+    ids = [3, 0, 1000, 999_999, 8, 1000, 3]
+    assert [duplicates.is_duplicate(_result(i)['url']) for i in ids] == \
+        [False, False, False, False, False, True, True]
+    # One bit per ID: a million IDs fit in a ~125 KB bitmap
+    assert len(duplicates._bits) <= 2 * (999_999 // 8 + 1)
+    huge = _result(clean._MAX_BITMAP_ID)['url']
+    assert not duplicates.is_duplicate(huge)
+    assert duplicates.is_duplicate(huge)
+    assert not duplicates.is_duplicate('')
+    assert duplicates.dropped == 3
+
+
+@pytest.mark.etl
+def test_duplicate_filter_keys_ids_by_host():
+    duplicates = clean.DuplicateFilter()
+    urls = [
+        'https://www.thegradcafe.com/result/5',
+        'https://example.com/result/5',
+        'https://www.thegradcafe.com/archive/result/5',
+        '/result/5',
+        'http://thegradcafe.com/result/5/',
+        'https://example.com/result/5',
+    ]
+    # Another host or path with the same numeric ID is a different result
+    assert [duplicates.is_duplicate(url) for url in urls] == \
+        [False, False, False, False, True, True]
+    assert duplicates._other_urls == set(urls[1:4])
+
+
+@pytest.mark.etl
+def test_stream_dedupe_records(tmp_path):
+    src = tmp_path / 'raw.jsonl'
+    clean.save_jsonl([_result(i % 50) for i in range(200)], str(src))
+    duplicates = clean.DuplicateFilter()
+    out = tmp_path / 'out.jsonl'
+    assert clean.save_jsonl(clean.iter_clean_data(clean.iter_records(str(src)),
+                                                  dedupe=duplicates), str(out)) == 50
+    assert duplicates.dropped == 150
@@ -1,3 +1,4 @@
+import os
 import sys
 import subprocess
 import threading
@@ -26,6 +27,85 @@ def test_flask_default_scraper_success(mock_thread):
         with app.test_client() as c:
             c.post('/api/pull-data')
 
+@pytest.mark.web
+@patch('threading.Thread', side_effect=SyncThread)
+def test_flask_default_scraper_passes_known_ids(mock_thread):
+    """Pull Data exports known result IDs so the scraper only fetches new results."""
+    app = flask_app.create_app()
+    with patch('subprocess.run') as mock_run, \
+         patch('src.load_data.export_known_ids', return_value=3) as mock_export:
+        mock_run.return_value.returncode = 0
+        with app.test_client() as c:
+            c.post('/api/pull-data')
+    known_file = mock_export.call_args.args[0]
+    scrape_cmd = mock_run.call_args_list[0].args[0]
+    assert scrape_cmd[-2:] == ['--known-ids', known_file]
+
+
+@pytest.mark.web
+@patch('threading.Thread', side_effect=SyncThread)
+def test_flask_default_scraper_resumes_llm_stage(mock_thread):
+    """The LLM stage streams and resumes by URL, so a timed-out run keeps its rows."""
+    app = flask_app.create_app()
+    with patch('subprocess.run') as mock_run:
+        mock_run.return_value.returncode = 0
+        with app.test_client() as c:
+            c.post('/api/pull-data')
+    llm_cmd = mock_run.call_args_list[2].args[0]
+    assert llm_cmd[-2:] == ['--stream', '--resume']
+    llm_output = llm_cmd[llm_cmd.index('--out') + 1]
+    assert not llm_output.endswith('llm_extend_applicant_data.json')
+    assert mock_run.call_args_list[3].args[0][-1] == llm_output
+
+
+@pytest.mark.web
+@patch('threading.Thread', side_effect=SyncThread)
+def test_flask_default_scraper_removes_loaded_llm_output(mock_thread):
+    """A loaded pull's LLM output is removed; a failed load keeps it for the next pull."""
+    app = flask_app.create_app()
+    outputs = []
+    load_returncode = [1]
+
+    def fake_run(cmd, **kwargs):
+        if '--out' in cmd:
+            path = cmd[cmd.index('--out') + 1]
+            with open(path, 'a', encoding='utf-8') as f:
+                f.write('{}\n')
+            outputs.append(path)
+        returncode = load_returncode[0] if cmd[1].endswith('load_data.py') else 0
+        return MagicMock(returncode=returncode, stderr='db down')
+
+    try:
+        with patch('subprocess.run', side_effect=fake_run), \
+             patch('src.load_data.export_known_ids', side_effect=psycopg.OperationalError("down")):
+            with app.test_client() as c:
+                c.post('/api/pull-data')
+                assert c.get('/api/scrape-status').get_json()['message'] == 'Loading failed: db down'
+                assert os.path.exists(outputs[-1])
+
+                load_returncode[0] = 0
+                c.post('/api/pull-data')
+                assert 'successfully' in c.get('/api/scrape-status').get_json()['message']
+                assert not os.path.exists(outputs[-1])
+    finally:
+        for path in outputs:
+            if os.path.exists(path):
+                os.remove(path)
+
+
+@pytest.mark.web
+@patch('threading.Thread', side_effect=SyncThread)
+def test_flask_default_scraper_without_db_scrapes_all(mock_thread):
+    """If known IDs cannot be exported, the scrape runs without --known-ids."""
+    app = flask_app.create_app()
+    with patch('subprocess.run') as mock_run, \
+         patch('src.load_data.export_known_ids', side_effect=psycopg.OperationalError("down")):
+        mock_run.return_value.returncode = 0
+        with app.test_client() as c:
+            c.post('/api/pull-data')
+    assert '--known-ids' not in mock_run.call_args_list[0].args[0]
+
+
 @pytest.mark.web
 @patch('threading.Thread', side_effect=SyncThread)
 def test_flask_default_scraper_fail_scrape(mock_thread):
@@ -173,7 +253,7 @@ def test_load_data_year_parsing_fail():
 @pytest.mark.db
 @patch('src.load_data.get_connection')
 @patch('src.load_data.create_table')
-def test_load_data_db_error(mock_create, mock_get_conn):
+def test_load_data_db_error(mock_create, mock_get_conn, tmp_path):
     """Cover load_data.py db error handling (lines 235-239)."""
     # Setup connection to be successful
     mock_conn = MagicMock()
@@ -182,10 +262,10 @@ def test_load_data_db_error(mock_create, mock_get_conn):
     # Make create_table raise psycopg.Error -> Triggers except block
     mock_create.side_effect = psycopg.Error("DB Error")
     
-    # Also need to mock sys.argv/IO because main() reads file
-    with patch('sys.argv', ['load_data.py', 'test.json']), \
-         patch('builtins.open', new_callable=unittest.mock.mock_open, read_data='[]'), \
-         patch('json.load', return_value=[]):
+    # Also need sys.argv pointing at a data file because main() reads it
+    data_file = tmp_path / 'test.json'
+    data_file.write_text('[]', encoding='utf-8')
+    with patch('sys.argv', ['load_data.py', str(data_file)]):
         
         with pytest.raises(psycopg.Error):
             load_data.main()
@@ -0,0 +1,873 @@
+"""Tests for the LLM standardizer (module_2/llm_hosting/app.py)."""
+
+import difflib
+import json
+import tracemalloc
+from pathlib import Path
+
+import pytest
+
+from src.module_2.llm_hosting import app as llm_app
+from tests.conftest import FakeLlama
+
+MODULE_2 = Path(__file__).resolve().parents[1] / 'src' / 'module_2'
+
+
+@pytest.mark.etl
+def test_read_lines_missing_file_is_empty(tmp_path):
+    assert llm_app._read_lines(str(tmp_path / 'nope.txt')) == []
+    assert 'Harvard University' in llm_app.CANON_UNIS
+    assert 'Physics' in llm_app.CANON_PROGS
+
+
+@pytest.mark.etl
+def test_load_llm_downloads_once(monkeypatch):
+    calls = []
+
+    def fake_download(**kwargs):
+        calls.append(kwargs)
+        return '/models/' + kwargs['filename']
+
+    monkeypatch.setattr(llm_app, '_LLM', None)
+    monkeypatch.setattr(llm_app, '_PREFIX_STATE', None)
+    monkeypatch.setattr(llm_app, '_PREFIX_IDS', [])
+    monkeypatch.setattr(llm_app, 'hf_hub_download', fake_download)
+    monkeypatch.setattr(llm_app, 'Llama', FakeLlama)
+    llm = llm_app._load_llm()
+    assert llm.kwargs['model_path'] == '/models/' + llm_app.MODEL_FILE
+    assert llm.kwargs['n_ctx'] == llm_app.N_CTX
+    assert llm_app._load_llm() is llm
+    assert len(calls) == 1
+    # The prefix was evaluated at load time: two one-token probes
+    assert llm.prompts == ['a', 'b']
+    probe = llm._render(llm_app.PREFIX_MESSAGES + [{'role': 'user', 'content': '{"program": "a"}'}])
+    prefix = llm.tokenize(probe[:probe.rindex('a"}')])
+    assert llm_app._PREFIX_IDS == prefix
+    assert llm_app._PREFIX_STATE[:len(prefix)] == prefix
+
+
+@pytest.mark.etl
+def test_load_llm_rechecks_under_lock(monkeypatch):
+    loaded = object()
+
+    class RacingLock:
+        """Another thread finishes loading while we wait for the lock."""
+
+        def __enter__(self):
+            llm_app._LLM = loaded
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(llm_app, '_LLM', None)
+    monkeypatch.setattr(llm_app, '_LLM_LOCK', RacingLock())
+    monkeypatch.setattr(llm_app, 'hf_hub_download', pytest.fail)
+    assert llm_app._load_llm() is loaded
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text, expected', [
+    ('Physics', ('Physics', '')),
+    (' Physics ,  Harvard University, ', ('Physics', 'Harvard University')),
+    ('Physics, Harvrd University', ('Physics', 'Harvard University')),
+    ('Criminology, Law and Society, Acme Institute', ('Criminology, Law and Society', 'Acme Institute')),
+    ('Physics, Foo, Bar', ('Physics', 'Foo, Bar')),
+])
+def test_smart_split(text, expected):
+    assert llm_app._smart_split(text) == expected
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text, expected', [
+    ('physics, mcg', ('Physics', 'Mcgill University')),
+    ('physics, u.b.c.', ('Physics', 'University of British Columbia')),
+    ('physics', ('Physics', 'Unknown')),
+    ('physics, foo of bar', ('Physics', 'Foo of Bar')),
+])
+def test_split_fallback(text, expected):
+    assert llm_app._split_fallback(text) == expected
+
+
+@pytest.mark.etl
+def test_best_match_and_post_normalizers():
+    index = llm_app._FuzzyIndex(['Physics', 'Physics'])
+    assert llm_app._best_match('', index) is None
+    assert llm_app._best_match('Physics', llm_app._FuzzyIndex([])) is None
+    assert llm_app._best_match('Physcs', index) == 'Physics'
+    assert llm_app._best_match('Physics', index) == 'Physics'
+    assert llm_app._best_match('???', index) is None
+    assert llm_app._post_normalize_program('Dept. of Mathematic (MA)') == 'Mathematics'
+    assert llm_app._post_normalize_program('history and theory of zzz') == 'History and Theory of Zzz'
+    assert llm_app._post_normalize_program('') == ''
+    assert llm_app._post_normalize_university('uoft') == 'University of Toronto'
+    assert llm_app._post_normalize_university('McGiill University') == 'McGill University'
+    assert llm_app._post_normalize_university('zzz institute of qqq (ZIQ)') == 'Zzz Institute of Qqq'
+    assert llm_app._post_normalize_university('') == 'Unknown'
+
+
+def _fuzzy_queries():
+    """Lookups the rule-based parser makes on the bundled data, plus near misses."""
+    rows = json.loads((MODULE_2 / 'cleaned_applicant_data.json').read_text(encoding='utf-8'))
+    queries = []
+    for row in rows:
+        prog, uni = llm_app._smart_split(row['program'])
+        queries += [(prog, 0.78), (uni, 0.80), (uni, 0.88)]
+    for name in llm_app.CANON_UNIS[::29] + llm_app.CANON_PROGS[::9]:
+        for variant in (name[1:], name[:-2], name.lower(), name.replace('e', 'a'),
+                        name + ' Campus', name[: len(name) // 2]):
+            queries += [(variant, 0.78), (variant, 0.80), (variant, 0.88)]
+    return queries
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('canon', ['CANON_UNIS', 'CANON_PROGS'])
+def test_fuzzy_index_matches_difflib(canon):
+    candidates = getattr(llm_app, canon)
+    index = llm_app._FuzzyIndex(candidates)
+    for name, cutoff in _fuzzy_queries():
+        expected = difflib.get_close_matches(name, candidates, n=1, cutoff=cutoff)
+        assert index.best(name, cutoff) == (expected[0] if expected else None), (name, cutoff)
+
+
+@pytest.mark.etl
+def test_fuzzy_index_breaks_ties_like_difflib():
+    candidates = ['abcx', 'abcy', 'abcz', 'zzzz']
+    index = llm_app._FuzzyIndex(candidates)
+    for name in ('abc', 'abcw', 'xabc'):
+        assert [index.best(name, 0.5)] == difflib.get_close_matches(name, candidates, n=1, cutoff=0.5)
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('text, expected', [
+    ('', ('Unknown', 'Unknown')),
+    (None, ('Unknown', 'Unknown')),
+    ('Physics', None),
+    ('Physics, Harvard University', ('Physics', 'Harvard University')),
+    ('Physics, McG', ('Physics', 'McGill University')),
+    ('(AB), McGill University', ('', 'McGill University')),
+    ('(AB), Zzz Unknownish', None),
+])
+def test_try_rule_based_parse(text, expected):
+    assert llm_app._try_rule_based_parse(text) == expected
+
+
+@pytest.mark.etl
+def test_normalizers_are_memoized_on_exact_input():
+    llm_app._post_normalize_university.cache_clear()
+    llm_app._try_rule_based_parse.cache_clear()
+    for _ in range(3):
+        assert llm_app._post_normalize_university('mcgill') == 'McGill University'
+        assert llm_app._try_rule_based_parse('Physics, U.B.C.') == (
+            'Physics', 'University of British Columbia')
+    assert llm_app._post_normalize_university.cache_info().hits >= 2
+    assert llm_app._try_rule_based_parse.cache_info().hits == 2
+
+
+@pytest.mark.etl
+def test_small_words_lowered_in_one_pass():
+    assert llm_app._post_normalize_program('the art of war and peace in europe') == (
+        'The Art of War and Peace in Europe')
+    assert llm_app._post_normalize_university('universite de la the zzz at yyy') == (
+        'Universite de La the Zzz at Yyy')
+
+
+@pytest.mark.etl
+def test_call_llm_parses_json_reply(fake_llm):
+    fake_llm.replies['Infomation, mcg'] = (
+        'Sure! {"standardized_program": "Info Studies", "standardized_university": "McG"}'
+    )
+    assert llm_app._call_llm_cached('Infomation, mcg') == (
+        'Information Studies', 'McGill University')
+    # Cached: the model is not asked again
+    llm_app._call_llm_cached('Infomation, mcg')
+    assert fake_llm.prompts == ['Infomation, mcg']
+
+
+@pytest.mark.etl
+def test_call_llm_falls_back_to_rules_on_bad_reply(fake_llm):
+    fake_llm.replies['physics, ubc'] = 'I cannot help with that.'
+    assert llm_app._call_llm_cached('physics, ubc') == ('Physics', 'University of British Columbia')
+
+
+@pytest.mark.etl
+def test_standardize_fast_uses_rules_then_llm(fake_llm):
+    assert llm_app._standardize_fast('Physics, Harvard University') == {
+        'standardized_program': 'Physics',
+        'standardized_university': 'Harvard University',
+    }
+    assert fake_llm.prompts == []
+    assert llm_app._standardize_fast('Physics') == {
+        'standardized_program': 'Physics',
+        'standardized_university': 'Unknown',
+    }
+    assert fake_llm.prompts == ['Physics']
+
+
+@pytest.mark.etl
+def test_normalize_input():
+    rows = [{'program': 'Physics'}]
+    assert llm_app._normalize_input(rows) is rows
+    assert llm_app._normalize_input({'rows': rows}) is rows
+    assert llm_app._normalize_input({'rows': 'nope'}) == []
+    assert llm_app._normalize_input(None) == []
+
+
+@pytest.mark.etl
+def test_flask_endpoints(fake_llm):
+    client = llm_app.app.test_client()
+    assert client.get('/').get_json() == {'ok': True}
+    resp = client.post('/standardize', json={'rows': [{'program': 'Physics, Harvard University'}, {}]})
+    rows = resp.get_json()['rows']
+    assert rows[0]['llm-generated-university'] == 'Harvard University'
+    assert rows[1] == {'llm-generated-program': 'Unknown', 'llm-generated-university': 'Unknown'}
+
+
+@pytest.mark.etl
+def test_process_single_row(fake_llm):
+    row = llm_app._process_single_row({'program': 'Physics, Yale University'})
+    assert row['llm-generated-program'] == 'Physics'
+    assert row['llm-generated-university'] == 'Yale University'
+
+
+def _write_rows(tmp_path, rows):
+    path = tmp_path / 'rows.json'
+    path.write_text(json.dumps(rows), encoding='utf-8')
+    return str(path)
+
+
+@pytest.mark.etl
+def test_cli_process_file_writes_json(tmp_path, fake_llm):
+    in_path = _write_rows(tmp_path, [
+        {'program': 'Physics, Harvard University'},
+        {'program': 'Chemistry'},
+        {'program': 'Biology, Yale University'},
+        {'program': 'Chemistry'},
+    ])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False)
+    out = json.loads((tmp_path / 'rows_llm.json').read_text(encoding='utf-8'))
+    assert [r['program'] for r in out] == [
+        'Physics, Harvard University', 'Chemistry', 'Biology, Yale University', 'Chemistry',
+    ]
+    assert [r['llm-generated-university'] for r in out] == [
+        'Harvard University', 'Unknown', 'Yale University', 'Unknown',
+    ]
+    assert fake_llm.prompts == ['Chemistry']
+
+
+@pytest.mark.etl
+def test_cli_process_file_standardizes_each_distinct_program_once(tmp_path, capsys, fake_llm, monkeypatch):
+    parsed = []
+    orig = llm_app._try_rule_based_parse.__wrapped__
+
+    def counting_parse(text):
+        parsed.append(text)
+        return orig(text)
+
+    monkeypatch.setattr(llm_app, '_try_rule_based_parse', counting_parse)
+    in_path = _write_rows(tmp_path, [
+        {'program': 'Physics, Harvard University'},
+        {'program': 'Chemistry'},
+        {'program': ' Physics,  Harvard University'},
+        {'program': 'Chemistry '},
+        {'program': 'Physics, Harvard University'},
+        {},
+    ])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True)
+    captured = capsys.readouterr()
+    assert parsed == ['Physics, Harvard University', 'Chemistry', '']
+    assert fake_llm.prompts == ['Chemistry']
+    assert 'Distinct programs: 3 / 6 rows (50.0%)' in captured.err
+    assert 'Cached: 0 | Rule-parsed: 4 | LLM-needed: 2' in captured.err
+    out = json.loads(captured.out)
+    assert [r['llm-generated-university'] for r in out] == [
+        'Harvard University', 'Unknown', 'Harvard University', 'Unknown',
+        'Harvard University', 'Unknown',
+    ]
+    assert out[2]['program'] == ' Physics,  Harvard University'
+
+
+@pytest.mark.etl
+def test_cli_process_file_stdout_and_append(tmp_path, capsys, fake_llm):
+    in_path = _write_rows(tmp_path, {'rows': [{'program': 'Physics, Harvard University'}]})
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True)
+    captured = capsys.readouterr()
+    assert json.loads(captured.out)[0]['llm-generated-program'] == 'Physics'
+    assert 'Rule-parsed: 1 | LLM-needed: 0' in captured.err
+
+    out_path = tmp_path / 'out.json'
+    out_path.write_text('existing\n', encoding='utf-8')
+    llm_app._cli_process_file(in_path, str(out_path), append=True, to_stdout=False)
+    assert out_path.read_text(encoding='utf-8').startswith('existing\n[')
+
+
+def _read_jsonl(path):
+    return [json.loads(line) for line in path.read_text(encoding='utf-8').splitlines()]
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('ordered', [True, False])
+def test_cli_stream_writes_jsonl_per_window(tmp_path, capsys, fake_llm, ordered):
+    rows = [
+        {'program': 'Physics, Harvard University'},
+        {'program': 'Chemistry'},
+        {'program': 'Biology, Yale University'},
+        {'program': 'Chemistry '},
+        {'program': 'Biology'},
+        {},
+    ]
+    in_path = _write_rows(tmp_path, rows)
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False,
+                              stream=True, ordered=ordered, window=4)
+    out = _read_jsonl(tmp_path / 'rows_llm.jsonl')
+    # Windows are [0..3] and [4, 5]; unordered puts each window's LLM rows last
+    order = [0, 1, 2, 3, 4, 5] if ordered else [0, 2, 1, 3, 5, 4]
+    assert [r.get('program') for r in out] == [rows[i].get('program') for i in order]
+    assert {r.get('program'): r['llm-generated-university'] for r in out}['Biology, Yale University'] == \
+        'Yale University'
+    assert fake_llm.prompts == ['Chemistry', 'Biology']
+    err = capsys.readouterr().err
+    assert 'Distinct programs (summed per window): 5 / 6 rows (83.3%)' in err
+    assert 'Cached: 0 | Rule-parsed: 3 | LLM-needed: 3' in err
+
+
+@pytest.mark.etl
+def test_cli_stream_append_drops_torn_line(tmp_path, fake_llm):
+    in_path = tmp_path / 'rows.jsonl'
+    in_path.write_text('{"program": "Physics, Harvard University"}\n\n{"program": "Chemistry"}\n',
+                       encoding='utf-8')
+    out_path = tmp_path / 'out.jsonl'
+    out_path.write_text('{"program": "done"}\n{"program": "to', encoding='utf-8')
+    llm_app._cli_process_file(str(in_path), str(out_path), append=True, to_stdout=False, stream=True)
+    assert [r['program'] for r in _read_jsonl(out_path)] == [
+        'done', 'Physics, Harvard University', 'Chemistry',
+    ]
+
+
+@pytest.mark.etl
+def test_cli_stream_reads_rows_document_and_stdout(tmp_path, capsys, fake_llm):
+    in_path = _write_rows(tmp_path, {'rows': [{'program': 'Physics, Harvard University'}]})
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True, stream=True)
+    lines = capsys.readouterr().out.splitlines()
+    assert [json.loads(line)['llm-generated-university'] for line in lines] == ['Harvard University']
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('content, kept', [
+    ('', ''),
+    ('abc', ''),
+    ('a\nb\n', 'a\nb\n'),
+    ('a\nb\n' + 'c' * 10, 'a\nb\n'),
+])
+def test_trim_partial_line(tmp_path, content, kept):
+    path = tmp_path / 'out.jsonl'
+    path.write_text(content, encoding='utf-8')
+    llm_app._trim_partial_line(str(path), block_size=3)
+    assert path.read_text(encoding='utf-8') == kept
+    llm_app._trim_partial_line(str(tmp_path / 'missing.jsonl'))
+
+
+def _result_rows(ids):
+    return [{'program': f'Program {i}', 'url': f'https://www.thegradcafe.com/result/{i}'} for i in ids]
+
+
+@pytest.mark.etl
+def test_cli_stream_resume_skips_rows_already_written(tmp_path, capsys, fake_llm, monkeypatch):
+    rows = _result_rows(range(10))
+    in_path = _write_rows(tmp_path, rows)
+    out_path = tmp_path / 'out.jsonl'
+    resolve = llm_app._resolve_with_llm
+
+    def crash_on_third_window(llm_keys, texts, workers, pool=None):
+        if 'Program 6' in texts.values():
+            raise KeyboardInterrupt
+        return resolve(llm_keys, texts, workers, pool)
+
+    monkeypatch.setattr(llm_app, '_resolve_with_llm', crash_on_third_window)
+    with pytest.raises(KeyboardInterrupt):
+        llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False,
+                                  stream=True, window=3)
+    assert len(_read_jsonl(out_path)) == 6
+    with open(out_path, 'a', encoding='utf-8') as f:
+        f.write('{"program": "Prog')  # torn line from the killed run
+
+    monkeypatch.setattr(llm_app, '_resolve_with_llm', resolve)
+    fake_llm.prompts.clear()
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False,
+                              window=3, resume=True)
+    assert 'Resuming: 6 rows already in' in capsys.readouterr().err
+    assert fake_llm.prompts == ['Program 6', 'Program 7', 'Program 8', 'Program 9']
+    assert [r['url'] for r in _read_jsonl(out_path)] == [r['url'] for r in rows]
+
+    # Finished: resuming again has nothing left to do
+    fake_llm.prompts.clear()
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False, resume=True)
+    assert fake_llm.prompts == []
+    assert len(_read_jsonl(out_path)) == 10
+
+
+@pytest.mark.etl
+def test_cli_stream_resume_after_input_changed(tmp_path, fake_llm):
+    out_path = tmp_path / 'out.jsonl'
+    in_path = _write_rows(tmp_path, _result_rows([3, 2, 1]) + [{'program': 'Biology'}])
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False, stream=True)
+
+    # A new scrape puts newer results first and keeps the older ones
+    _write_rows(tmp_path, _result_rows([5, 4, 3, 2, 1]) + [{'program': 'Biology'}, {'program': 'Physics'}])
+    fake_llm.prompts.clear()
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False, resume=True)
+    assert sorted(fake_llm.prompts) == ['Physics', 'Program 4', 'Program 5']
+    assert [r['program'] for r in _read_jsonl(out_path)] == [
+        'Program 3', 'Program 2', 'Program 1', 'Biology', 'Program 5', 'Program 4', 'Physics',
+    ]
+
+
+@pytest.mark.etl
+def test_cli_stream_resume_converts_array_output_and_starts_fresh_without_output(tmp_path, fake_llm):
+    in_path = _write_rows(tmp_path, _result_rows([2, 1]))
+    out_path = tmp_path / 'out.json'
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False)
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False, resume=True)
+    assert [r['program'] for r in _read_jsonl(out_path)] == ['Program 2', 'Program 1']
+
+    out_path.unlink()
+    llm_app._cli_process_file(in_path, str(out_path), append=False, to_stdout=False, resume=True)
+    assert len(_read_jsonl(out_path)) == 2
+
+
+@pytest.mark.etl
+def test_cli_stream_memory_is_bounded_by_window(tmp_path, fake_llm):
+    rows = [{'program': 'Physics, Harvard University', 'comments': 'x' * 200, 'n': i}
+            for i in range(20000)]
+    in_path = tmp_path / 'rows.json'
+    in_path.write_text(json.dumps(rows), encoding='utf-8')
+    out_path = tmp_path / 'rows.jsonl'
+
+    tracemalloc.start()
+    try:
+        llm_app._cli_process_file(str(in_path), str(out_path), append=False,
+                                  to_stdout=False, stream=True, window=200)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    assert peak < in_path.stat().st_size / 4
+    assert [r['n'] for r in _read_jsonl(out_path)] == list(range(20000))
+
+
+@pytest.mark.etl
+def test_llm_batch_dedups_sorts_and_shares_prefix(fake_llm):
+    texts = ['Physics', 'Chemistry', 'Physics', 'Chemical Engineering', 'Chemistry']
+    results = llm_app._standardize_llm_batch(texts)
+    assert fake_llm.prompts == ['Chemical Engineering', 'Chemistry', 'Physics']
+    assert results['Physics'] == ('Physics', 'Unknown')
+    assert set(results) == set(texts)
+    assert llm_app._standardize_llm_batch([]) == {}
+
+    # Only the first prompt pays for the system prompt and few-shots
+    prompt_tokens = sum(
+        len(fake_llm.tokenize(fake_llm._render(llm_app.PREFIX_MESSAGES + [
+            {'role': 'user', 'content': json.dumps({'program': t})}
+        ])))
+        for t in fake_llm.prompts
+    )
+    prefix_tokens = len(fake_llm.tokenize(fake_llm._render(llm_app.PREFIX_MESSAGES)))
+    assert fake_llm.evaluated < prompt_tokens - prefix_tokens
+
+
+@pytest.mark.etl
+def test_restore_prefix_only_when_cache_drifted(fake_llm, monkeypatch):
+    assert llm_app._restore_prefix(fake_llm) is False  # nothing saved yet
+    llm_app._warm_prefix(fake_llm)
+    evaluated = fake_llm.evaluated
+
+    llm_app._call_llm_cached('Chemistry')
+    assert fake_llm.loads == 0
+    suffix = fake_llm.evaluated - evaluated
+
+    fake_llm.input_ids = fake_llm.tokenize('some other prompt')
+    assert llm_app._restore_prefix(fake_llm) is True
+    assert fake_llm.loads == 1
+    evaluated = fake_llm.evaluated
+    llm_app._call_llm_cached('Chemistri')
+    assert fake_llm.evaluated - evaluated <= suffix
+
+
+@pytest.fixture
+def result_cache(tmp_path, monkeypatch):
+    """Open a fresh persistent cache as the standardizer's result cache."""
+    cache = llm_app._ResultCache(str(tmp_path / 'cache.sqlite3'), llm_app._cache_version())
+    monkeypatch.setattr(llm_app, '_RESULT_CACHE', cache)
+    yield cache
+    cache.close()
+
+
+@pytest.mark.etl
+def test_result_cache_round_trip_and_stats(tmp_path):
+    path = str(tmp_path / 'cache.sqlite3')
+    cache = llm_app._ResultCache(path, 'v1')
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'hit_rate': 0.0}
+    assert cache.get('Physics, MIT') is None
+    cache.put('Physics, MIT', ('Physics', 'Massachusetts Institute of Technology'))
+    assert cache.get('Physics, MIT') == ('Physics', 'Massachusetts Institute of Technology')
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'hit_rate': 0.5}
+
+    # Another process on the same file sees the row; another version does not
+    other = llm_app._ResultCache(path, 'v1')
+    assert other.get('Physics, MIT') == ('Physics', 'Massachusetts Institute of Technology')
+    other.close()
+    cache.close()
+    newer = llm_app._ResultCache(path, 'v2')
+    assert newer.get('Physics, MIT') is None
+    newer.close()
+    older = llm_app._ResultCache(path, 'v1')
+    assert older.get('Physics, MIT') is None
+    older.close()
+
+
+@pytest.mark.etl
+def test_cache_version_and_key(monkeypatch):
+    version = llm_app._cache_version()
+    assert llm_app._cache_version() == version
+    monkeypatch.setattr(llm_app, 'MODEL_FILE', 'other.gguf')
+    assert llm_app._cache_version() != version
+    monkeypatch.undo()
+    monkeypatch.setattr(llm_app, 'SYSTEM_PROMPT', llm_app.SYSTEM_PROMPT + 'Be brief.\n')
+    assert llm_app._cache_version() != version
+    assert llm_app._cache_key('  Physics,\n  MIT ') == 'Physics, MIT'
+    assert llm_app._cache_key(None) == ''
+
+
+@pytest.mark.etl
+def test_result_cache_opens_lazily(tmp_path, monkeypatch):
+    monkeypatch.setattr(llm_app, '_RESULT_CACHE', None)
+    monkeypatch.setattr(llm_app, 'CACHE_PATH', '')
+    assert llm_app._result_cache() is None
+
+    monkeypatch.setattr(llm_app, 'CACHE_PATH', str(tmp_path / 'cache.sqlite3'))
+    cache = llm_app._result_cache()
+    assert cache.version == llm_app._cache_version()
+    assert llm_app._result_cache() is cache
+    cache.close()
+
+    opened = object()
+
+    class RacingLock:
+        """Another thread opens the cache while we wait for the lock."""
+
+        def __enter__(self):
+            llm_app._RESULT_CACHE = opened
+
+        def __exit__(self, *exc):
+            return False
+
+    monkeypatch.setattr(llm_app, '_RESULT_CACHE', None)
+    monkeypatch.setattr(llm_app, '_RESULT_CACHE_LOCK', RacingLock())
+    assert llm_app._result_cache() is opened
+
+
+@pytest.mark.etl
+def test_standardize_fast_consults_persistent_cache(fake_llm, result_cache):
+    first = llm_app._standardize_fast('Chemistry')
+    assert fake_llm.prompts == ['Chemistry']
+    llm_app._call_llm_cached.cache_clear()
+    # A new process: the LLM is not asked again, even with extra whitespace
+    assert llm_app._standardize_fast(' Chemistry ') == first
+    assert fake_llm.prompts == ['Chemistry']
+
+    # Rule-parsed results are cached too
+    result_cache.put('Physics, Harvard University', ('Cached Physics', 'Harvard University'))
+    assert llm_app._standardize_fast('Physics, Harvard University')['standardized_program'] == 'Cached Physics'
+    assert result_cache.stats()['hits'] == 2
+
+
+@pytest.mark.etl
+def test_cli_process_file_uses_persistent_cache(tmp_path, capsys, fake_llm, result_cache):
+    in_path = _write_rows(tmp_path, [
+        {'program': 'Physics, Harvard University'},
+        {'program': 'Chemistry'},
+        {'program': 'Physics,  Harvard University'},
+    ])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False)
+    err = capsys.readouterr().err
+    assert 'Cached: 0 | Rule-parsed: 2 | LLM-needed: 1' in err
+    assert 'Cache: 0 hits / 2 lookups (0%), 2 new entries' in err
+    first = (tmp_path / 'rows_llm.json').read_text(encoding='utf-8')
+
+    llm_app._call_llm_cached.cache_clear()
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False)
+    err = capsys.readouterr().err
+    assert 'Cached: 3 | Rule-parsed: 0 | LLM-needed: 0' in err
+    assert 'Cache: 2 hits / 4 lookups (50%), 0 new entries' in err
+    assert (tmp_path / 'rows_llm.json').read_text(encoding='utf-8') == first
+    assert fake_llm.prompts == ['Chemistry']
+
+
+class InlineExecutor:
+    """ProcessPoolExecutor stand-in that runs the initializer and work in-process."""
+
+    instances = []
+
+    def __init__(self, max_workers, mp_context, initializer, initargs):
+        self.max_workers = max_workers
+        self.chunks = []
+        self.mapped = []
+        self.closed = False
+        initializer(*initargs)
+        InlineExecutor.instances.append(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def map(self, fn, chunks):
+        self.chunks = list(chunks)
+        self.mapped.append(self.chunks)
+        return [fn(chunk) for chunk in reversed(self.chunks)][::-1]
+
+    def shutdown(self):
+        self.closed = True
+
+
+@pytest.mark.etl
+def test_pool_splits():
+    assert llm_app._pool_splits(1) == [(1, 1)]
+    assert llm_app._pool_splits(8) == [(1, 8), (2, 4), (4, 2), (8, 1)]
+    assert llm_app._pool_splits(6) == [(1, 6), (2, 3), (3, 2), (6, 1)]
+
+
+@pytest.mark.etl
+def test_llm_worker_init_and_chunk(fake_llm, monkeypatch):
+    monkeypatch.setattr(llm_app, 'N_THREADS', 8)
+    llm_app._init_llm_worker(2)
+    assert llm_app.N_THREADS == 2
+    assert llm_app._llm_worker_chunk(['Chemistry', 'Physics, Yale University']) == [
+        ('Chemistry', 'Unknown'), ('Physics', 'Yale University'),
+    ]
+
+
+@pytest.mark.etl
+def test_llm_batch_spreads_over_worker_pool(fake_llm, monkeypatch):
+    downloads = []
+    monkeypatch.setattr(llm_app, '_model_path', lambda: downloads.append(1))
+    monkeypatch.setattr(llm_app, 'ProcessPoolExecutor', InlineExecutor)
+    monkeypatch.setattr(llm_app, 'N_THREADS', 8)
+    InlineExecutor.instances.clear()
+    texts = [f'Program {i:02d}' for i in range(20)] * 2
+
+    results = llm_app._standardize_llm_batch(texts, workers=4)
+    assert downloads == [1]
+    pool, = InlineExecutor.instances
+    assert pool.max_workers == 4
+    assert llm_app.N_THREADS == 2
+    assert [len(c) for c in pool.chunks] == [8, 8, 4]
+    assert sum(pool.chunks, []) == sorted(set(texts))
+    assert results == {t: (t, 'Unknown') for t in texts}
+
+    # A single distinct string, or a single worker, stays in-process
+    InlineExecutor.instances.clear()
+    assert llm_app._standardize_llm_batch(['Chemistry'] * 3, workers=4) == {
+        'Chemistry': ('Chemistry', 'Unknown'),
+    }
+    assert llm_app._standardize_llm_batch(['Physics', 'Chemistry'], workers=1)
+    assert InlineExecutor.instances == []
+
+
+@pytest.mark.etl
+def test_cli_process_file_llm_workers(tmp_path, capsys, fake_llm, monkeypatch):
+    monkeypatch.setattr(llm_app, '_model_path', lambda: None)
+    monkeypatch.setattr(llm_app, 'ProcessPoolExecutor', InlineExecutor)
+    monkeypatch.setattr(llm_app, 'N_THREADS', 4)
+    in_path = _write_rows(tmp_path, [{'program': 'Physics'}, {'program': 'Chemistry'}])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True, llm_workers=2)
+    captured = capsys.readouterr()
+    assert '(2 distinct, 2 worker(s))' in captured.err
+    assert [r['llm-generated-program'] for r in json.loads(captured.out)] == ['Physics', 'Chemistry']
+
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True,
+                              parallel=False, llm_workers=2)
+    assert '(2 distinct, 1 worker(s))' in capsys.readouterr().err
+
+
+@pytest.mark.etl
+def test_cli_loads_model_before_llm_batch(tmp_path, capsys, fake_llm, monkeypatch):
+    monkeypatch.setattr(llm_app, '_LLM', None)
+    monkeypatch.setattr(llm_app, '_load_llm', lambda: setattr(llm_app, '_LLM', fake_llm) or fake_llm)
+    in_path = _write_rows(tmp_path, [{'program': 'Chemistry'}])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=True)
+    assert 'Loading LLM model...' in capsys.readouterr().err
+
+
+@pytest.mark.etl
+def test_cli_stream_reads_pretty_printed_rows_document(tmp_path, fake_llm):
+    in_path = tmp_path / 'rows.json'
+    in_path.write_text(json.dumps({'rows': [{'program': 'Physics, Harvard University'}]}, indent=2),
+                       encoding='utf-8')
+    llm_app._cli_process_file(str(in_path), None, append=False, to_stdout=False, stream=True)
+    assert [r['llm-generated-program'] for r in _read_jsonl(tmp_path / 'rows_llm.jsonl')] == ['Physics']
+
+
+def _recording_batcher(max_batch, max_wait_ms):
+    batches = []
+
+    def resolve(batch):
+        batches.append(dict(batch))
+        if 'boom' in batch:
+            raise RuntimeError('model crashed')
+        return {key: text.upper() for key, text in batch.items() if key != 'lost'}
+
+    return llm_app._MicroBatcher(resolve, max_batch, max_wait_ms), batches
+
+
+@pytest.mark.etl
+def test_micro_batcher_coalesces_identical_keys():
+    batcher, batches = _recording_batcher(max_batch=3, max_wait_ms=5000)
+    futures = [batcher.submit(key, key) for key in ('a', 'b', 'a', 'c')]
+    assert [f.result(timeout=5) for f in futures] == ['A', 'B', 'A', 'C']
+    assert futures[0] is futures[2]
+    assert batches == [{'a': 'a', 'b': 'b', 'c': 'c'}]
+    assert (batcher.batches, batcher.coalesced) == (1, 1)
+
+
+@pytest.mark.etl
+def test_micro_batcher_splits_at_max_batch_and_flushes_after_wait():
+    batcher, batches = _recording_batcher(max_batch=2, max_wait_ms=20)
+    futures = [batcher.submit(key, key) for key in ('a', 'b', 'c')]
+    assert [f.result(timeout=5) for f in futures] == ['A', 'B', 'C']
+    assert [sorted(b) for b in batches] == [['a', 'b'], ['c']]
+    # A finished key is computed again, not served from a stale future
+    assert batcher.submit('a', 'a').result(timeout=5) == 'A'
+    assert batcher.coalesced == 0
+
+
+@pytest.mark.etl
+def test_micro_batcher_reports_errors_to_every_caller():
+    batcher, _ = _recording_batcher(max_batch=2, max_wait_ms=50)
+    futures = [batcher.submit('boom', 'boom'), batcher.submit('x', 'x')]
+    for future in futures:
+        with pytest.raises(RuntimeError, match='model crashed'):
+            future.result(timeout=5)
+    assert batcher.submit('x', 'x').result(timeout=5) == 'X'
+
+
+@pytest.mark.etl
+def test_micro_batcher_fails_keys_missing_from_results():
+    batcher, _ = _recording_batcher(max_batch=2, max_wait_ms=50)
+    futures = [batcher.submit('lost', 'lost'), batcher.submit('x', 'x')]
+    with pytest.raises(KeyError):
+        futures[0].result(timeout=5)
+    assert futures[1].result(timeout=5) == 'X'
+    # The worker thread survived and keeps serving
+    assert batcher.submit('y', 'y').result(timeout=5) == 'Y'
+
+
+@pytest.mark.etl
+def test_batched_standardize_times_out_waiting_for_a_batch(monkeypatch):
+    import concurrent.futures
+    import threading
+
+    release = threading.Event()
+
+    def stuck(batch):
+        release.wait(5)
+        return {key: ('Stuck', 'Unknown') for key in batch}
+
+    monkeypatch.setattr(llm_app, '_BATCHER', llm_app._MicroBatcher(stuck, 1, 0))
+    monkeypatch.setattr(llm_app, 'SERVE_TIMEOUT_S', 0.05)
+    monkeypatch.setattr(llm_app, '_result_cache', lambda: None)
+    try:
+        with pytest.raises(concurrent.futures.TimeoutError):
+            llm_app._standardize_rows_batched([{'program': 'Quantum Basket Weaving'}])
+    finally:
+        release.set()
+
+
+@pytest.mark.etl
+def test_batched_standardize_coalesces_concurrent_requests(fake_llm, result_cache, monkeypatch):
+    import threading
+
+    monkeypatch.setattr(llm_app, 'BATCH_SERVING', True)
+    monkeypatch.setattr(llm_app, '_BATCHER', None)
+    monkeypatch.setattr(llm_app, 'SERVE_MAX_BATCH', 2)
+    monkeypatch.setattr(llm_app, 'SERVE_MAX_WAIT_MS', 5000)
+    client = llm_app.app.test_client()
+    payloads = [
+        [{'program': 'Chemistry'}, {'program': 'Physics, Harvard University'}],
+        [{'program': 'Chemistry'}, {'program': 'Biology'}, {'program': 'Chemistry '}],
+    ]
+    responses = [None, None]
+
+    def post(i):
+        responses[i] = client.post('/standardize', json={'rows': payloads[i]}).get_json()['rows']
+
+    threads = [threading.Thread(target=post, args=(i,)) for i in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert [r['llm-generated-university'] for r in responses[0]] == ['Unknown', 'Harvard University']
+    assert [r['llm-generated-program'] for r in responses[1]] == ['Chemistry', 'Biology', 'Chemistry']
+    batcher = llm_app._request_batcher()
+    assert batcher is llm_app._BATCHER
+    # 'Chemistry' was asked for by both requests and computed once
+    assert (batcher.batches, batcher.coalesced) == (1, 1)
+    assert sorted(fake_llm.prompts) == ['Biology', 'Chemistry']
+    assert result_cache.get('Chemistry') == ('Chemistry', 'Unknown')
+    assert result_cache.get('Physics, Harvard University') == ('Physics', 'Harvard University')
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('ordered', [True, False])
+def test_cli_stream_stores_results_in_persistent_cache(tmp_path, capsys, fake_llm, result_cache, ordered):
+    in_path = _write_rows(tmp_path, [
+        {'program': 'Chemistry'},
+        {'program': 'Physics, Harvard University'},
+        {'program': 'Biology'},
+    ])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False,
+                              stream=True, ordered=ordered, window=2)
+    assert result_cache.get('Chemistry') == ('Chemistry', 'Unknown')
+    assert result_cache.get('Biology') == ('Biology', 'Unknown')
+    first = _read_jsonl(tmp_path / 'rows_llm.jsonl')
+    assert sorted(r['program'] for r in first) == ['Biology', 'Chemistry', 'Physics, Harvard University']
+
+    # Second run: every row comes from the cache, the model is not asked again
+    llm_app._call_llm_cached.cache_clear()
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False,
+                              stream=True, ordered=ordered, window=2)
+    assert 'Cached: 3 | Rule-parsed: 0 | LLM-needed: 0' in capsys.readouterr().err
+    assert sorted(fake_llm.prompts) == ['Biology', 'Chemistry']
+    second = _read_jsonl(tmp_path / 'rows_llm.jsonl')
+    if ordered:
+        assert second == first
+    else:
+        assert sorted(second, key=lambda r: r['program']) == sorted(first, key=lambda r: r['program'])
+
+
+@pytest.mark.etl
+def test_cli_stream_reuses_one_worker_pool_across_windows(tmp_path, capsys, fake_llm, monkeypatch):
+    monkeypatch.setattr(llm_app, '_model_path', lambda: None)
+    monkeypatch.setattr(llm_app, 'ProcessPoolExecutor', InlineExecutor)
+    monkeypatch.setattr(llm_app, 'N_THREADS', 4)
+    InlineExecutor.instances.clear()
+    rows = [{'program': f'Program {i}'} for i in range(5)] + [{'program': 'Physics, Yale University'}]
+    in_path = _write_rows(tmp_path, rows)
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False,
+                              stream=True, window=2, llm_workers=2)
+    pool, = InlineExecutor.instances
+    assert pool.max_workers == 2
+    assert pool.mapped == [[['Program 0', 'Program 1']], [['Program 2', 'Program 3']], [['Program 4']]]
+    assert pool.closed
+    assert [r['llm-generated-program'] for r in _read_jsonl(tmp_path / 'rows_llm.jsonl')] == [
+        'Program 0', 'Program 1', 'Program 2', 'Program 3', 'Program 4', 'Physics',
+    ]
+    assert capsys.readouterr().err.count('2 worker(s)') == 3
+
+    # No LLM rows: no pool is started at all
+    InlineExecutor.instances.clear()
+    in_path = _write_rows(tmp_path, [{'program': 'Physics, Yale University'}])
+    llm_app._cli_process_file(in_path, None, append=False, to_stdout=False, stream=True, llm_workers=2)
+    assert InlineExecutor.instances == []
+
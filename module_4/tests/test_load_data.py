@@ -109,11 +109,15 @@ def test_load_data_logic():
 
 
 @pytest.mark.db
-def test_main_functionality():
-    # Mock sys.argv, os.path, open, json.load, psycopg.connect
-    with patch.object(sys, 'argv', ['script_name', 'dummy.json']), \
-         patch('builtins.open'), \
-         patch('json.load', return_value=[{}]), \
+@pytest.mark.parametrize('name, text', [
+    ('rows.json', '[{}]'),
+    ('rows.jsonl', '{}\n\n'),
+])
+def test_main_functionality(tmp_path, name, text):
+    # A JSON array or JSON Lines file; psycopg.connect is mocked
+    data_file = tmp_path / name
+    data_file.write_text(text, encoding='utf-8')
+    with patch.object(sys, 'argv', ['script_name', str(data_file)]), \
          patch('psycopg.connect') as mock_connect:
         
         mock_conn = mock_connect.return_value
@@ -140,3 +144,29 @@ def test_get_connection_uses_defaults():
              load_data.get_connection()
              _, kwargs = mock_connect.call_args
              assert kwargs.get('dbname') == 'gradcafe'
+
+
+@pytest.mark.db
+def test_fetch_known_ids():
+    cur = MagicMock()
+    cur.fetchall.return_value = [
+        ('https://www.thegradcafe.com/result/998643',),
+        ('https://www.thegradcafe.com/result/12',),
+        ('https://example.com/e2e1',),
+        (None,),
+    ]
+    assert load_data.fetch_known_ids(cur) == {998643, 12}
+
+
+@pytest.mark.db
+def test_export_known_ids(tmp_path):
+    conn = MagicMock()
+    cur = conn.cursor.return_value.__enter__.return_value
+    cur.fetchall.return_value = [('https://www.thegradcafe.com/result/7',),
+                                 ('https://www.thegradcafe.com/result/3',)]
+    path = tmp_path / 'known_ids.txt'
+    with patch('src.load_data.get_connection', return_value=conn):
+        assert load_data.export_known_ids(str(path)) == 2
+    assert path.read_text() == '3\n7\n'
+    conn.commit.assert_called_once()
+    conn.close.assert_called_once()
@@ -1,6 +1,7 @@
 """Test main blocks using runpy."""
 
 
+import os
 import sys
 from unittest.mock import patch, MagicMock
 import unittest.mock
@@ -32,7 +33,7 @@ def test_flask_app_main():
             mock_run.assert_called_with(host='0.0.0.0', port=8080, debug=True)
 
 @pytest.mark.db
-def test_load_data_main():
+def test_load_data_main(tmp_path):
     """Cover load_data.py if __name__ == '__main__' block."""
     # load_data.py has a top-level main() function?
     # I need to check load_data.py structure to be sure.
@@ -41,10 +42,13 @@ def test_load_data_main():
     # Let's check:
     # `def main():` usually exists.
     # If so:
+    from src import load_data
+    data_file = tmp_path / 'dummy.json'
+    data_file.write_text('[{}]', encoding='utf-8')
+    # A relative path is resolved against the script's directory
+    relative = os.path.relpath(data_file, os.path.dirname(load_data.__file__))
     with patch('src.load_data.psycopg') as mock_psycopg, \
-         patch('sys.argv', ['load_data.py', 'dummy.json']), \
-         patch('builtins.open', unittest.mock.mock_open(read_data='[]')), \
-         patch('json.load', return_value=[{}]):
+         patch('sys.argv', ['load_data.py', relative]):
          
          mock_conn = mock_psycopg.connect.return_value
          mock_cur = mock_conn.cursor.return_value.__enter__.return_value
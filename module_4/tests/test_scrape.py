@@ -0,0 +1,901 @@
+"""Tests for the Grad Cafe scraper (module_2/scrape.py)."""
+
+import gzip
+import http.client
+import http.server
+import io
+import json
+import threading
+import time
+import zlib
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+from src.module_2 import scrape
+
+
+class _SurveyHandler(http.server.BaseHTTPRequestHandler):
+    """Keep-alive test server that mimics the survey pages."""
+
+    protocol_version = 'HTTP/1.1'
+    connections = []
+    requests = []
+
+    def setup(self):
+        super().setup()
+        type(self).connections.append(self.client_address)
+
+    def log_message(self, *args):
+        pass
+
+    def _send(self, status, body=b'', headers=None):
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        type(self).requests.append((self.path, dict(self.headers)))
+        body = f'<p>{self.path}</p>'.encode('utf-8')
+        if self.path.startswith('/survey/'):
+            if 'gzip' in self.headers.get('Accept-Encoding', ''):
+                self._send(200, gzip.compress(body), {'Content-Encoding': 'gzip'})
+            else:
+                self._send(200, body)
+        elif self.path == '/deflate':
+            self._send(200, zlib.compress(body), {'Content-Encoding': 'deflate'})
+        elif self.path == '/raw-deflate':
+            compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+            raw = compressor.compress(body) + compressor.flush()
+            self._send(200, raw, {'Content-Encoding': 'deflate'})
+        elif self.path == '/redirect':
+            self._send(302, headers={'Location': '/survey/?page=7'})
+        elif self.path == '/loop':
+            self._send(302, headers={'Location': '/loop'})
+        elif self.path.startswith('/cached/'):
+            if self.headers.get('If-None-Match') == '"v1"':
+                self._send(304, headers={'ETag': '"v1"'})
+            else:
+                self._send(200, body, {'ETag': '"v1"',
+                                       'Last-Modified': 'Wed, 01 Jan 2025 00:00:00 GMT'})
+        elif self.path == '/lower-redirect':
+            self._send(301, headers={'location': '/survey/?page=8'})
+        elif self.path == '/lower-headers':
+            self._send(200, body, {'etag': '"v2"', 'retry-after': '3'})
+        elif self.path.startswith('/corrupt/'):
+            page = self.path.rsplit('=', 1)[-1]
+            if page == '1':
+                self._send(200, b'not deflate', {'Content-Encoding': 'deflate'})
+            elif page == '2':
+                self._send(200, gzip.compress(body)[:-8], {'Content-Encoding': 'gzip'})
+            else:
+                self._send(200, b'\xff\xfe<p>')
+        elif self.path.startswith('/throttle/'):
+            self._send(429, headers={'Retry-After': '7'})
+        elif self.path.startswith('/gone/'):
+            self._send(404)
+        elif self.path == '/close':
+            self._send(200, body, {'Connection': 'close'})
+        else:
+            self._send(503)
+
+
+@pytest.fixture
+def survey_server(monkeypatch):
+    """Serve _SurveyHandler on localhost and point BASE_URL at it."""
+    _SurveyHandler.connections = []
+    _SurveyHandler.requests = []
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), _SurveyHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{base}/survey/')
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.etl
+def test_parse_page_fixture(survey_page_html):
+    entries = scrape._parse_page(survey_page_html)
+    assert len(entries) == 7
+    first = entries[0]
+    assert first['program'] == 'Computer Science, University of Illinois Chicago(UIC)'
+    assert first['Degree'] == 'PhD'
+    assert first['status'] == 'Interview on 29 Jan'
+    assert first['url'] == 'https://www.thegradcafe.com/result/998643'
+    assert first['term'] == 'Fall 2026'
+    assert first['US/International'] == 'International'
+    assert first['GRE'] == first['GRE_V'] == first['GRE_AW'] == first['comments'] == ''
+
+    second = entries[1]
+    assert second['GPA'] == 'GPA 3.89'
+    assert second['GRE'] == 'GRE 325'
+    assert second['GRE_V'] == 'GRE V 161'
+    assert second['GRE_AW'] == 'GRE AW 4.5'
+    assert second['comments'].startswith('Got the email')
+
+    assert entries[2]['program'] == 'Mathematics, McGill University'
+    assert entries[2]['url'] == ''
+    assert entries[2]['GRE_AW'] == 'GRE A 3.5'
+    assert entries[3]['url'] == ''
+    # URL found outside cell 4, program/university missing
+    assert entries[4]['program'] == ''
+    assert entries[4]['url'] == 'https://www.thegradcafe.com/result/998640'
+    # Program without university
+    assert entries[5]['program'] == 'Physics'
+    assert entries[5]['comments'] == 'Funded offer.'
+    # University without program
+    assert entries[6]['program'] == 'Yale University'
+
+
+@pytest.mark.etl
+def test_parse_page_without_table():
+    assert scrape._parse_page('<html><body>No results</body></html>') == []
+    assert scrape._parse_page('<table><tr><td>x</td></tr></table>') == []
+
+
+@pytest.mark.etl
+def test_parse_entry_and_badges_edge_cases():
+    assert scrape._parse_entry([]) is None
+    assert scrape._extract_badges(None) == {}
+
+
+@pytest.mark.etl
+def test_fetch_page_reuses_connection_with_gzip(survey_server):
+    session = scrape._HTTPSession()
+    try:
+        assert scrape._fetch_page(3, session=session) == '<p>/survey/?page=3</p>'
+        assert scrape._fetch_page(4, session=session) == '<p>/survey/?page=4</p>'
+    finally:
+        session.close()
+    # Both pages went over a single keep-alive connection
+    assert len(_SurveyHandler.connections) == 1
+    path, headers = _SurveyHandler.requests[0]
+    assert headers['Accept-Encoding'] == 'gzip, deflate'
+    assert headers['User-Agent'] == scrape.USER_AGENT
+
+
+@pytest.mark.etl
+def test_fetch_page_default_session(survey_server):
+    assert scrape._fetch_page(1) == '<p>/survey/?page=1</p>'
+
+
+@pytest.mark.etl
+def test_session_decompresses_deflate_and_follows_redirects(survey_server):
+    session = scrape._HTTPSession()
+    try:
+        assert session.get(f'{survey_server}/deflate').body == b'<p>/deflate</p>'
+        assert session.get(f'{survey_server}/raw-deflate').body == b'<p>/raw-deflate</p>'
+        redirected = session.get(f'{survey_server}/redirect')
+        assert redirected.status == 200
+        assert redirected.body == b'<p>/survey/?page=7</p>'
+        assert session.get(f'{survey_server}/loop', max_redirects=2).status == 302
+    finally:
+        session.close()
+
+
+@pytest.mark.etl
+def test_session_header_lookups_ignore_case(survey_server):
+    session = scrape._HTTPSession()
+    try:
+        redirected = session.get(f'{survey_server}/lower-redirect')
+        assert redirected.status == 200
+        assert redirected.body == b'<p>/survey/?page=8</p>'
+        response = session.get(f'{survey_server}/lower-headers')
+        assert response.headers.get('ETag') == '"v2"'
+        assert scrape._retry_after(response.headers) == 3
+    finally:
+        session.close()
+
+
+@pytest.mark.etl
+def test_session_drops_connection_close_responses(survey_server):
+    session = scrape._HTTPSession()
+    try:
+        session.get(f'{survey_server}/close')
+        session.get(f'{survey_server}/close')
+    finally:
+        session.close()
+    assert len(_SurveyHandler.connections) == 2
+
+
+@pytest.mark.etl
+def test_session_pool_limit_closes_extra_connections():
+    session = scrape._HTTPSession(max_idle=1)
+    first, second = MagicMock(), MagicMock()
+    session._release(('http', 'h', 80), first)
+    session._release(('http', 'h', 80), second)
+    second.close.assert_called_once()
+    assert session._acquire(('http', 'h', 80)) == (first, True)
+
+
+@pytest.mark.etl
+def test_session_retries_stale_keepalive_connection():
+    session = scrape._HTTPSession()
+    key = ('https', 'example.com', 443)
+    stale = MagicMock()
+    stale.getresponse.side_effect = http.client.RemoteDisconnected('closed')
+    session._release(key, stale)
+    fresh = MagicMock()
+    fresh.getresponse.return_value.will_close = False
+    fresh.getresponse.return_value.status = 200
+    fresh.getresponse.return_value.read.return_value = b'ok'
+    fresh.getresponse.return_value.getheader.return_value = None
+    with patch.object(session, '_connect', return_value=fresh) as mock_connect:
+        response = session.get('https://example.com/survey/?page=1')
+    assert response.body == b'ok'
+    stale.close.assert_called_once()
+    mock_connect.assert_called_once_with(key)
+    # A failure on a brand new connection is not retried
+    broken = MagicMock()
+    broken.getresponse.side_effect = ConnectionResetError('reset')
+    with patch.object(session, '_connect', return_value=broken), \
+         patch.object(session, '_acquire', return_value=(broken, False)):
+        with pytest.raises(ConnectionResetError):
+            session.get('https://example.com/survey/?page=2')
+    broken.close.assert_called_once()
+
+
+@pytest.mark.etl
+def test_session_connects_https_and_http():
+    session = scrape._HTTPSession(timeout=5)
+    assert isinstance(session._connect(('https', 'example.com', 443)), http.client.HTTPSConnection)
+    assert isinstance(session._connect(('http', 'example.com', 80)), http.client.HTTPConnection)
+
+
+@pytest.mark.etl
+def test_fetch_page_retries_then_fails(survey_server, monkeypatch):
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{survey_server}/missing/')
+    with patch('src.module_2.scrape.time.sleep') as mock_sleep:
+        assert scrape._fetch_page(1, retries=3) is None
+    assert len(_SurveyHandler.requests) == 3
+    assert mock_sleep.call_count == 2
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('page_num', [1, 2, 3])
+def test_fetch_page_retries_corrupt_bodies(survey_server, monkeypatch, page_num):
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{survey_server}/corrupt/')
+    with patch('src.module_2.scrape.time.sleep'):
+        assert scrape._fetch_page(page_num, retries=2) is None
+    assert len(_SurveyHandler.requests) == 2
+
+
+@pytest.mark.etl
+def test_fetch_page_does_not_retry_client_errors(survey_server, monkeypatch):
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{survey_server}/gone/')
+    breaker = scrape._CircuitBreaker('test', min_requests=1)
+    with patch('src.module_2.scrape.time.sleep') as mock_sleep:
+        assert scrape._fetch_page(1, retries=3, breaker=breaker) is None
+    assert len(_SurveyHandler.requests) == 1
+    mock_sleep.assert_not_called()
+    assert breaker.trips == 0
+
+
+@pytest.mark.etl
+def test_fetch_page_honours_retry_after(survey_server, monkeypatch):
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{survey_server}/throttle/')
+    clock = [0.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    breaker = scrape._CircuitBreaker('test')
+    with patch('src.module_2.scrape.time.monotonic', side_effect=lambda: clock[0]), \
+         patch('src.module_2.scrape.time.sleep', side_effect=fake_sleep):
+        assert scrape._fetch_page(1, retries=2, breaker=breaker) is None
+    assert len(_SurveyHandler.requests) == 2
+    # Each 429 pauses every fetcher for the Retry-After, and the retry itself
+    # never comes back sooner than that
+    assert breaker.trips == 2
+    assert sleeps and sleeps[0] == 7
+
+
+@pytest.mark.etl
+def test_retry_after_parsing():
+    assert scrape._retry_after({}) is None
+    assert scrape._retry_after({'Retry-After': '12'}) == 12.0
+    assert scrape._retry_after({'Retry-After': '-3'}) == 0.0
+    assert scrape._retry_after({'Retry-After': 'soon'}) is None
+    assert scrape._retry_after({'Retry-After': 'Wed, 21 Oct 2015 07:28:00 GMT'}) == 0.0
+    future = time.strftime('%a, %d %b %Y %H:%M:%S GMT', time.gmtime(time.time() + 120))
+    assert 100 < scrape._retry_after({'Retry-After': future}) <= 120
+
+
+@pytest.mark.etl
+def test_backoff_delay_grows_with_jitter_and_cap():
+    with patch('src.module_2.scrape.random.uniform', side_effect=lambda lo, hi: hi):
+        assert [scrape._backoff_delay(n) for n in range(4)] == [1, 2, 4, 8]
+        assert scrape._backoff_delay(20, cap=60) == 60
+        assert scrape._backoff_delay(0, retry_after=30) == 30
+        assert scrape._backoff_delay(0, retry_after=10 ** 6) == scrape._MAX_RETRY_AFTER
+    with patch('src.module_2.scrape.random.uniform', side_effect=lambda lo, hi: lo):
+        assert scrape._backoff_delay(5) == 0
+
+
+@pytest.mark.etl
+def test_circuit_breaker_opens_on_error_spike():
+    clock = [100.0]
+    sleeps = []
+
+    def fake_sleep(seconds):
+        sleeps.append(seconds)
+        clock[0] += seconds
+
+    breaker = scrape._CircuitBreaker('example.com', window=4, threshold=0.5,
+                                     min_requests=4, cooldown=30)
+    with patch('src.module_2.scrape.time.monotonic', side_effect=lambda: clock[0]), \
+         patch('src.module_2.scrape.time.sleep', side_effect=fake_sleep):
+        breaker.wait()
+        for ok in (True, False, True):
+            breaker.record(ok)
+        assert breaker.trips == 0
+        breaker.record(False)
+        assert breaker.trips == 1
+        # A shorter Retry-After while open does not shorten or re-trip the pause
+        breaker.record(False, retry_after=5)
+        assert breaker.trips == 1
+        breaker.wait()
+        assert sleeps == [30.0]
+        # Window was cleared: a single failure afterwards does not re-open it
+        breaker.record(False)
+        breaker.wait()
+        assert breaker.trips == 1 and sleeps == [30.0]
+
+
+@pytest.mark.etl
+def test_failed_pages_written_and_refetched(survey_page_html, tmp_path):
+    failed_file = tmp_path / 'failed.txt'
+
+    def flaky(page_num, **kwargs):
+        return None if page_num in (2, 4) else survey_page_html
+
+    with patch('src.module_2.scrape._fetch_page', side_effect=flaky):
+        data = scrape.scrape_data(num_pages=5, delay=0, failed_out=str(failed_file))
+    assert len(data) == 21
+    assert failed_file.read_text() == '2\n4\n'
+
+    failed_file.write_text('# retry these\n4\n\n2\n4\n')
+    pages = scrape.load_page_list(str(failed_file))
+    assert pages == [2, 4]
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html) as mock_fetch:
+        data = scrape.scrape_data(page_nums=pages, delay=0, failed_out=str(failed_file))
+    assert [c.args[0] for c in mock_fetch.call_args_list] == [2, 4]
+    assert len(data) == 14
+    assert failed_file.read_text() == ''
+
+
+@pytest.mark.etl
+def test_fetch_page_network_error_closes_connection():
+    session = MagicMock()
+    session.get.side_effect = OSError('unreachable')
+    with patch('src.module_2.scrape.time.sleep'):
+        assert scrape._fetch_page(1, retries=2, session=session) is None
+    assert session.get.call_count == 2
+    conn = MagicMock()
+    conn.request.side_effect = TimeoutError('timed out')
+    pool = scrape._HTTPSession()
+    with patch.object(pool, '_connect', return_value=conn):
+        with pytest.raises(TimeoutError):
+            pool.get('http://example.com/')
+    conn.close.assert_called_once()
+
+
+@pytest.mark.etl
+def test_fetch_page_uses_rate_limiter(survey_server):
+    limiter = MagicMock()
+    scrape._fetch_page(1, limiter=limiter)
+    limiter.acquire.assert_called_once()
+
+
+@pytest.mark.etl
+def test_rate_limiter_enforces_budget():
+    limiter = scrape._RateLimiter(rate=1000, burst=2)
+    with patch('src.module_2.scrape.time.sleep', wraps=time.sleep) as mock_sleep:
+        for _ in range(5):
+            limiter.acquire()
+    # The first two requests use the burst; later ones must wait for refill
+    assert mock_sleep.call_count >= 1
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('kwargs, expected', [
+    ({}, 1.0),
+    ({'delay': 0.25}, 4.0),
+    ({'delay': 0.25, 'rate': 10}, 10),
+    ({'delay': 0}, None),
+])
+def test_delay_sets_the_default_request_rate(tmp_path, kwargs, expected):
+    with patch('src.module_2.scrape._scrape_pages', return_value=iter(())) as mock_pages:
+        scrape.scrape_data(num_pages=1, **kwargs)
+    assert mock_pages.call_args.kwargs['rate'] == expected
+    with patch('src.module_2.scrape._scrape_pages', return_value=iter(())) as mock_pages:
+        scrape.scrape_to_jsonl(str(tmp_path / 'out.jsonl'), num_pages=1, **kwargs)
+    assert mock_pages.call_args.kwargs['rate'] == expected
+
+
+@pytest.mark.etl
+def test_fetch_pages_concurrent_preserves_order():
+    in_flight = {'now': 0, 'max': 0}
+    lock = threading.Lock()
+
+    def fake_fetch(page_num, **kwargs):
+        with lock:
+            in_flight['now'] += 1
+            in_flight['max'] = max(in_flight['max'], in_flight['now'])
+        # Earlier pages take longer so they complete out of order
+        time.sleep(0.02 * (6 - page_num))
+        with lock:
+            in_flight['now'] -= 1
+        return None if page_num == 4 else f'page-{page_num}'
+
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch):
+        results = list(scrape._fetch_pages(range(1, 6), workers=3))
+
+    assert [p for p, _ in results] == [1, 2, 3, 4, 5]
+    assert results[3] == (4, None)
+    assert results[4] == (5, 'page-5')
+    assert in_flight['max'] <= 3
+
+
+@pytest.mark.etl
+def test_fetch_pages_close_cancels_pending():
+    with patch('src.module_2.scrape._fetch_page', side_effect=lambda p, **kwargs: str(p)):
+        gen = scrape._fetch_pages(range(1, 100), workers=2)
+        assert next(gen) == (1, '1')
+        gen.close()
+
+
+@pytest.mark.etl
+def test_scrape_data_concurrent_in_page_order(survey_page_html, capsys):
+    def fake_fetch(page_num, **kwargs):
+        if page_num == 2:
+            return None
+        return survey_page_html
+
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch):
+        data = scrape.scrape_data(num_pages=3, start_page=1, workers=3, rate=500)
+
+    assert len(data) == 14
+    out = capsys.readouterr().out
+    assert 'Fetching page 2/3... FAILED - skipping' in out
+    assert 'Failed pages (1): 2' in out
+
+
+@pytest.mark.etl
+def test_scrape_data_sequential(survey_page_html):
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html) as mock_fetch:
+        data = scrape.scrape_data(num_pages=2, start_page=5)
+    assert len(data) == 14
+    assert [c.args[0] for c in mock_fetch.call_args_list] == [5, 6]
+
+
+@pytest.mark.etl
+def test_save_and_load_data(tmp_path):
+    path = tmp_path / 'out.json'
+    scrape.save_data([{'program': 'Mathematics'}], str(path))
+    assert json.loads(path.read_text(encoding='utf-8')) == [{'program': 'Mathematics'}]
+    assert scrape.load_data(str(path)) == [{'program': 'Mathematics'}]
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_streams_and_checkpoints(survey_page_html, tmp_path):
+    out = tmp_path / 'applicant_data.jsonl'
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        written = scrape.scrape_to_jsonl(str(out), num_pages=2, start_page=3)
+    assert written == 14
+    lines = out.read_text(encoding='utf-8').splitlines()
+    assert len(lines) == 14
+    assert json.loads(lines[0])['url'] == 'https://www.thegradcafe.com/result/998643'
+    # A finished run leaves no checkpoint behind
+    assert not (tmp_path / 'applicant_data.jsonl.checkpoint').exists()
+    assert scrape.load_data(str(out)) == [json.loads(line) for line in lines]
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_checkpoints_each_page(survey_page_html, tmp_path):
+    out = tmp_path / 'applicant_data.jsonl'
+    checkpoints = []
+    with patch('src.module_2.scrape._write_checkpoint',
+               side_effect=lambda filename, checkpoint: checkpoints.append(checkpoint)), \
+            patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        scrape.scrape_to_jsonl(str(out), num_pages=2, start_page=3)
+    assert [(c['start_page'], c['next_page']) for c in checkpoints] == [(3, 4), (3, 5)]
+    assert checkpoints[-1]['offset'] == out.stat().st_size
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_rerun_after_finish_starts_over(survey_page_html, tmp_path):
+    out = tmp_path / 'stream.jsonl'
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        scrape.scrape_to_jsonl(str(out), num_pages=2)
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html) as mock_fetch:
+        assert scrape.scrape_to_jsonl(str(out), num_pages=2) == 14
+    assert [c.args[0] for c in mock_fetch.call_args_list] == [1, 2]
+    assert len(scrape.load_data(str(out))) == 14
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_rerun_after_known_ids_stop_starts_over(survey_page_html, tmp_path):
+    out = tmp_path / 'stream.jsonl'
+
+    def fake_fetch(page_num, **kwargs):
+        return survey_page_html if page_num == 1 else _KNOWN_PAGE
+
+    # Page 2 is entirely known, so paging stops there
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch):
+        assert scrape.scrape_to_jsonl(str(out), num_pages=5, known_ids={5}) == 7
+    assert not (tmp_path / 'stream.jsonl.checkpoint').exists()
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch) as mock_fetch:
+        scrape.scrape_to_jsonl(str(out), num_pages=5, known_ids={5})
+    assert mock_fetch.call_args_list[0].args[0] == 1
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_resumes_after_crash(survey_page_html, tmp_path):
+    out = tmp_path / 'stream.jsonl'
+
+    def crash_on_page_3(page_num, **kwargs):
+        if page_num == 3:
+            raise KeyboardInterrupt
+        return survey_page_html
+
+    with patch('src.module_2.scrape._fetch_page', side_effect=crash_on_page_3):
+        with pytest.raises(KeyboardInterrupt):
+            scrape.scrape_to_jsonl(str(out), num_pages=4, start_page=1)
+    # Simulate a torn write after the last checkpoint
+    with open(out, 'a', encoding='utf-8') as f:
+        f.write('{"program": "partial')
+
+    fetched = []
+
+    def record(page_num, **kwargs):
+        fetched.append(page_num)
+        return None if page_num == 4 else survey_page_html
+
+    with patch('src.module_2.scrape._fetch_page', side_effect=record):
+        written = scrape.scrape_to_jsonl(str(out), num_pages=4)
+    assert fetched == [3, 4]
+    assert written == 7
+    records = scrape.load_data(str(out))
+    assert len(records) == 21
+
+    # An explicit start page ignores the checkpoint and starts over
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        assert scrape.scrape_to_jsonl(str(out), num_pages=1, start_page=1) == 7
+    assert len(scrape.load_data(str(out))) == 7
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_ignores_bad_checkpoint(survey_page_html, tmp_path):
+    out = tmp_path / 'stream.jsonl'
+    out.write_text('')
+    (tmp_path / 'stream.jsonl.checkpoint').write_text('not json')
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html) as mock_fetch:
+        scrape.scrape_to_jsonl(str(out), num_pages=1)
+    assert mock_fetch.call_args.args[0] == 1
+
+
+@pytest.mark.etl
+def test_scrape_pages_empty_range():
+    assert list(scrape._scrape_pages(range(5, 5))) == []
+
+
+@pytest.mark.etl
+def test_load_known_ids(tmp_path):
+    index = tmp_path / 'known_ids.txt'
+    index.write_text('998643\nhttps://www.thegradcafe.com/result/998642\n\nnot-an-id\n')
+    assert scrape.load_known_ids(str(index)) == {998643, 998642}
+
+
+_KNOWN_PAGE = (
+    '<table><tbody><tr><td>U</td><td><div>P</div></td><td>d</td><td><div>s</div></td>'
+    '<td><a href="/result/5">x</a></td></tr></tbody></table>'
+)
+
+
+@pytest.mark.etl
+@pytest.mark.parametrize('workers', [1, 3])
+def test_scrape_data_stops_at_first_known_page(survey_page_html, workers):
+    fetched = []
+
+    def fake_fetch(page_num, **kwargs):
+        fetched.append(page_num)
+        return survey_page_html if page_num == 1 else _KNOWN_PAGE
+
+    # Page 1 has one new result; page 2 onwards is entirely known
+    known = {998642, 998640, 998639, 998638, 5}
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch):
+        data = scrape.scrape_data(num_pages=50, workers=workers, known_ids=known)
+    urls = [e['url'] for e in data]
+    assert urls == ['https://www.thegradcafe.com/result/998643', '', '']
+    # Paging stopped right after page 2 (plus whatever was already in flight)
+    assert sorted(fetched)[:2] == [1, 2]
+    assert len(fetched) <= 2 + workers
+
+
+@pytest.mark.etl
+def test_scrape_stats_after_known_ids_stop(survey_page_html, tmp_path):
+    first = scrape._Response(200, 'OK', {}, survey_page_html.encode('utf-8'))
+    known_page = scrape._Response(200, 'OK', {}, _KNOWN_PAGE.encode('utf-8'))
+    session = MagicMock()
+    session.get.side_effect = lambda url, **kwargs: first if url.endswith('=1') else known_page
+    stats_file = tmp_path / 'stats.json'
+    with patch('src.module_2.scrape._HTTPSession', return_value=session):
+        data = scrape.scrape_data(num_pages=50, workers=3, known_ids={5},
+                                  stats_out=str(stats_file))
+    assert len(data) == 7
+    stats = json.loads(stats_file.read_text())
+    # The stopping page counts as done; pages still in flight are not failures
+    assert stats['pages'] == 2 and stats['failed_pages'] == 0
+    assert stats['entries'] == 7
+
+
+@pytest.mark.etl
+def test_scrape_stops_when_page_fully_known(tmp_path):
+    fetched = []
+
+    def fake_fetch(page_num, **kwargs):
+        fetched.append(page_num)
+        return _KNOWN_PAGE
+
+    out = tmp_path / 'new.jsonl'
+    with patch('src.module_2.scrape._fetch_page', side_effect=fake_fetch):
+        assert scrape.scrape_to_jsonl(str(out), num_pages=50, start_page=1, known_ids={5}) == 0
+    assert fetched == [1]
+    assert out.read_text() == ''
+
+
+_EDGE_CASE_PAGES = [
+    '',
+    '<html><body><p>No results</p></body></html>',
+    '<table><tr><td>no tbody</td></tr></table>',
+    # Entities, nbsp, nested markup, multi-line class attributes and a comment row
+    '<table><tbody><tr><td><div class="x\n tw-font-medium">Univ&eacute;rsit&eacute;&nbsp;Laval</div></td>'
+    '<td><div><span>Biology <em>(Cell)</em></span><span> MSc </span><span>extra</span></div></td>'
+    '<td> Jan&nbsp;1, 2026 </td><td><p>no div</p></td><td><a href="/results/1">x</a></td></tr>'
+    '<tr><td><div class="tw-px-2">Winter 2027</div><div class="tw-rounded">GRE AW3</div>'
+    '<div class="other">GPA 4.0</div><div class="tw-px-2">  </div></td></tr>'
+    '<tr><td><p class="tw-text-gray-500\ttw-text-sm">multi <b>line</b>\n comment</p></td></tr>'
+    '<tr><td>a</td><td>b</td><td>c</td></tr>'
+    '<tr><td><a href="/result/42">x</a></td><td></td><td></td><td></td></tr></tbody></table>',
+    # Script, style and template text is not part of get_text()
+    '<table><tbody><tr><td><div class="tw-font-medium">MIT<script>var u = 1;</script></div></td>'
+    '<td><div><span>CS<style>.a{}</style><!-- c --></span><span>PhD<template>t</template></span>'
+    '</div></td><td>Jan 1<script>x</script>, 2026</td>'
+    '<td><div><b>Accepted</b><style>b{}</style> on 1 Feb</div></td>'
+    '<td><a href="/result/7">x</a></td></tr>'
+    '<tr><td><p class="tw-text-gray-500 tw-text-sm">ok<script>alert(1)</script> <i>then</i></p></td></tr>'
+    '</tbody></table>',
+    # An XML declaration (with an encoding) before already decoded text
+    '\n<?xml version="1.0" encoding="iso-8859-1"?>\n<table><tbody><tr>'
+    '<td><div class="tw-font-medium">Universit\u00e9 Laval</div></td><td><div><span>Biologie</span>'
+    '<span>MSc</span></div></td><td>Jan 1, 2026</td><td><div>Accepted</div></td>'
+    '<td><a href="/result/8">x</a></td></tr></tbody></table>',
+]
+
+
+@pytest.mark.etl
+@pytest.mark.filterwarnings('ignore::bs4.XMLParsedAsHTMLWarning')
+@pytest.mark.parametrize('html', _EDGE_CASE_PAGES)
+def test_parser_backends_identical_on_edge_cases(html):
+    expected = scrape._parse_page(html, 'bs4')
+    actual = scrape._parse_page(html, 'lxml')
+    assert actual == expected
+    assert [list(e.to_dict().items()) for e in actual] == \
+        [list(e.to_dict().items()) for e in expected]
+
+
+@pytest.mark.etl
+def test_parser_backends_identical_on_saved_pages(survey_page_html):
+    expected = scrape._parse_page(survey_page_html, 'bs4')
+    actual = scrape._parse_page(survey_page_html, 'lxml')
+    assert actual == expected
+    assert [list(e.to_dict().items()) for e in actual] == \
+        [list(e.to_dict().items()) for e in expected]
+    assert scrape._parse_page(survey_page_html) == expected
+
+
+@pytest.mark.etl
+def test_parse_page_unknown_backend():
+    with pytest.raises(ValueError, match='Unknown parser backend'):
+        scrape._parse_page('<html></html>', 'html5lib')
+
+
+@pytest.mark.etl
+def test_scrape_data_uses_requested_parser(survey_page_html):
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html), \
+         patch.dict(scrape.PARSER_BACKENDS, {'fake': lambda html: [{'url': ''}]}):
+        assert scrape.scrape_data(num_pages=2, parser='fake') == [{'url': ''}, {'url': ''}]
+
+
+@pytest.mark.etl
+def test_parse_pages_process_pool_matches_inline(survey_page_html):
+    fetched = [(1, survey_page_html), (2, None), (3, '<html></html>'),
+               (4, survey_page_html), (5, survey_page_html)]
+    inline = list(scrape._parse_pages(iter(fetched)))
+    pooled = list(scrape._parse_pages(iter(fetched), parse_workers=2))
+    assert pooled == inline
+    assert [p for p, _ in pooled] == [1, 2, 3, 4, 5]
+    assert pooled[1] == (2, None)
+
+
+@pytest.mark.etl
+def test_parse_pages_backpressure_bounds_queue(survey_page_html):
+    pulled = []
+
+    def source():
+        for page_num in range(1, 9):
+            pulled.append(page_num)
+            yield page_num, survey_page_html
+
+    gen = scrape._parse_pages(source(), parse_workers=1)
+    assert next(gen)[0] == 1
+    # One parser process: at most two pages of HTML are queued at a time
+    assert len(pulled) == 2
+    gen.close()
+
+
+@pytest.mark.etl
+def test_scrape_data_pipeline_mode(survey_page_html):
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        inline = scrape.scrape_data(num_pages=3, workers=2)
+        pooled = scrape.scrape_data(num_pages=3, workers=2, parse_workers=2)
+    assert pooled == inline
+    assert len(pooled) == 21
+
+
+@pytest.mark.etl
+def test_scrape_to_jsonl_pipeline_mode(survey_page_html, tmp_path):
+    out = tmp_path / 'piped.jsonl'
+    with patch('src.module_2.scrape._fetch_page', return_value=survey_page_html):
+        assert scrape.scrape_to_jsonl(str(out), num_pages=2, start_page=1, parse_workers=1) == 14
+
+
+@pytest.mark.etl
+def test_page_cache_revalidates_with_etag(survey_server, monkeypatch, tmp_path):
+    monkeypatch.setattr(scrape, 'BASE_URL', f'{survey_server}/cached/')
+    cache = scrape._PageCache(str(tmp_path), ttl=3600)
+    session = scrape._HTTPSession()
+    try:
+        html = scrape._fetch_page(2, session=session, cache=cache)
+        assert html == '<p>/cached/?page=2</p>'
+        meta = cache.lookup(2)
+        assert meta['etag'] == '"v1"'
+        assert meta['last_modified'] == 'Wed, 01 Jan 2025 00:00:00 GMT'
+
+        # Fresh: served from disk without touching the network
+        assert scrape._fetch_page(2, session=session, cache=cache) == html
+        assert len(_SurveyHandler.requests) == 1
+
+        # Stale: conditional request, 304 refreshes the timestamp
+        cache.ttl = 0
+        assert scrape._fetch_page(2, session=session, cache=cache) == html
+        assert len(_SurveyHandler.requests) == 2
+        sent = _SurveyHandler.requests[1][1]
+        assert sent['If-None-Match'] == '"v1"'
+        assert sent['If-Modified-Since'] == 'Wed, 01 Jan 2025 00:00:00 GMT'
+        assert cache.lookup(2)['fetched_at'] >= meta['fetched_at']
+    finally:
+        session.close()
+
+
+@pytest.mark.etl
+def test_page_cache_shares_identical_blobs(tmp_path):
+    cache = scrape._PageCache(str(tmp_path))
+    cache.store(1, '<p>same</p>')
+    cache.store(2, '<p>same</p>')
+    cache.store(3, '<p>other</p>')
+    assert len(list((tmp_path / 'objects').iterdir())) == 2
+    assert cache.read(cache.lookup(2)) == '<p>same</p>'
+    assert not list((tmp_path / 'pages').glob('*.tmp'))
+
+
+@pytest.mark.etl
+def test_page_cache_ignores_broken_entries(tmp_path):
+    cache = scrape._PageCache(str(tmp_path))
+    assert cache.lookup(1) is None
+    (tmp_path / 'pages' / '1.json').write_text('{not json')
+    assert cache.lookup(1) is None
+    cache.store(2, '<p>x</p>')
+    for blob in (tmp_path / 'objects').iterdir():
+        blob.unlink()
+    assert cache.lookup(2) is None
+
+
+@pytest.mark.etl
+def test_page_cache_offline_reparse(survey_page_html, tmp_path):
+    cache = scrape._PageCache(str(tmp_path), ttl=0)
+    cache.store(1, survey_page_html)
+    offline = scrape._PageCache(str(tmp_path), offline=True)
+    session = MagicMock()
+    with patch('src.module_2.scrape.time.sleep'):
+        assert scrape._fetch_page(1, session=session, cache=offline) == survey_page_html
+        assert scrape._fetch_page(2, session=session, cache=offline) is None
+    session.get.assert_not_called()
+
+    with patch('src.module_2.scrape._HTTPSession', return_value=session):
+        data = scrape.scrape_data(num_pages=1, delay=0, cache=offline)
+    assert len(data) == 7
+    session.get.assert_not_called()
+
+
+@pytest.mark.etl
+def test_page_cache_stores_through_scrape_to_jsonl(survey_page_html, tmp_path):
+    response = scrape._Response(200, 'OK', {}, survey_page_html.encode('utf-8'))
+    session = MagicMock()
+    session.get.return_value = response
+    cache = scrape._PageCache(str(tmp_path / 'cache'))
+    with patch('src.module_2.scrape._HTTPSession', return_value=session):
+        written = scrape.scrape_to_jsonl(str(tmp_path / 'out.jsonl'), num_pages=2,
+                                         cache=cache)
+    assert written == 14
+    assert cache.lookup(1)['etag'] is None
+    assert len(list((tmp_path / 'cache' / 'objects').iterdir())) == 1
+
+
+@pytest.mark.etl
+def test_scrape_stats_summary_and_progress():
+    stream = io.StringIO()
+    stats = scrape._ScrapeStats(workers=2, parse_workers=0, progress_every=0.001, stream=stream)
+    assert stats.summary()['fetch_s']['count'] == 0
+    stats.record_request(1, 0.4, 1000)
+    stats.record_request(1, 0.2, 1200, retry=True)
+    stats.record_parse(1, 0.05)
+    stats.record_entries(1, 20)
+    stats.record_cache_hit(2)
+    stats.record_parse(2, 0.01)
+    stats.record_entries(2, 20)
+    stats.record_request(3, 0.1, 0)
+    stats.record_entries(3, None)
+
+    summary = stats.summary()
+    assert summary['pages'] == 2 and summary['failed_pages'] == 1
+    assert summary['entries'] == 40
+    assert summary['requests'] == 3 and summary['retries'] == 1
+    assert summary['cache_hits'] == 1 and summary['bytes'] == 2200
+    assert summary['fetch_s']['count'] == 2
+    assert summary['fetch_s']['max'] == pytest.approx(0.6)
+    assert summary['parse_s']['p50'] == pytest.approx(0.01)
+    assert summary['bottleneck'] == 'fetch'
+    assert [p['page'] for p in summary['per_page']] == [1, 2, 3]
+    json.dumps(summary)
+
+    time.sleep(0.002)
+    stats.maybe_report()
+    stats.maybe_report()
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 1 and lines[0].startswith('[progress] 2 pages (1 failed), 40 entries')
+
+    quiet = scrape._ScrapeStats()
+    quiet.record_parse(1, 1.0)
+    quiet.maybe_report()
+    assert quiet.summary()['bottleneck'] == 'parse'
+
+
+@pytest.mark.etl
+def test_scrape_data_writes_stats(survey_page_html, tmp_path, capsys):
+    response = scrape._Response(200, 'OK', {}, survey_page_html.encode('utf-8'))
+    session = MagicMock()
+    session.get.side_effect = [OSError('blip'), response, response]
+    stats_file = tmp_path / 'stats.json'
+    with patch('src.module_2.scrape._HTTPSession', return_value=session), \
+         patch('src.module_2.scrape.time.sleep'):
+        data = scrape.scrape_data(num_pages=2, delay=0, stats_out=str(stats_file),
+                                  progress_every=1e-9)
+    assert len(data) == 14
+    stats = json.loads(stats_file.read_text())
+    assert stats['pages'] == 2 and stats['entries'] == 14
+    assert stats['requests'] == 3 and stats['retries'] == 1
+    assert stats['bytes'] == 2 * len(response.body)
+    assert stats['per_page'][0]['retries'] == 1
+    assert stats['per_page'][1]['parse_s'] > 0
+    captured = capsys.readouterr()
+    assert 'Throughput:' in captured.out
+    assert '[progress]' in captured.err